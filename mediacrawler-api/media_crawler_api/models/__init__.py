@@ -16,6 +16,7 @@ from .request import (
     SearchRequest,
     CookieCreateRequest,
     CookieUpdateRequest,
+    KeyRotationRequest,
 )
 
 __all__ = [
@@ -30,4 +31,5 @@ __all__ = [
     "SearchRequest",
     "CookieCreateRequest",
     "CookieUpdateRequest",
+    "KeyRotationRequest",
 ]
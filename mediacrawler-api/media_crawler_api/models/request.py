@@ -60,6 +60,16 @@ class NoteDetailRequest(BaseModel):
         le=200,
         description="评论获取数量上限"
     )
+    concurrency: Optional[int] = Field(
+        None,
+        ge=1,
+        le=20,
+        description="本次批量请求的并发数，不指定则使用服务端配置"
+    )
+    multi_cookie: bool = Field(
+        default=False,
+        description="是否将批量请求分摊到多个Cookie (指定 cookie_name 时无效)"
+    )
 
     @validator('note_ids')
     def validate_note_ids(cls, v):
@@ -76,7 +86,8 @@ class NoteDetailRequest(BaseModel):
                 "note_ids": ["6707e0ec000000001e0318cc", "6707e0ec000000001e0318cd"],
                 "cookie_name": None,
                 "get_comments": True,
-                "comments_limit": 50
+                "comments_limit": 50,
+                "multi_cookie": False
             }
         }
 
@@ -234,9 +245,15 @@ class CookieUpdateRequest(BaseModel):
         }
 
 
+class StreamFormat(str, Enum):
+    """流式响应格式"""
+    NDJSON = "ndjson"   # 每行一个 JSON
+    SSE = "sse"         # Server-Sent Events
+
+
 class CrawlTaskRequest(BaseModel):
     """
-    采集任务请求 (用于手动触发)
+    采集任务请求 (用于手动触发，也用于 /api/search/crawl 多页采集)
     """
     keyword: str = Field(
         ...,
@@ -260,6 +277,34 @@ class CrawlTaskRequest(BaseModel):
         default=True,
         description="是否保存到飞书"
     )
+    cookie_name: Optional[str] = Field(
+        None,
+        description="指定使用的Cookie名称"
+    )
+    page_size: int = Field(
+        default=20,
+        ge=1,
+        le=50,
+        description="每页数量"
+    )
+    sort_type: SortType = Field(
+        default=SortType.GENERAL,
+        description="排序方式"
+    )
+    note_type: NoteType = Field(
+        default=NoteType.ALL,
+        description="笔记类型过滤"
+    )
+    concurrency: int = Field(
+        default=3,
+        ge=1,
+        le=5,
+        description="同时请求的页数"
+    )
+    stream_format: StreamFormat = Field(
+        default=StreamFormat.NDJSON,
+        description="流式响应格式 (ndjson/sse)，请求头 Accept: text/event-stream 时使用 sse"
+    )
 
 
 class ValidateCookieRequest(BaseModel):
@@ -274,3 +319,25 @@ class ValidateCookieRequest(BaseModel):
         default=Platform.XHS,
         description="平台"
     )
+
+
+class KeyRotationRequest(BaseModel):
+    """
+    批量密钥轮换请求
+    """
+    chunk_size: int = Field(
+        default=100,
+        ge=1,
+        le=1000,
+        description="每批处理的Cookie数量"
+    )
+    workers: int = Field(
+        default=4,
+        ge=1,
+        le=16,
+        description="并行加解密的工作线程数"
+    )
+    restart: bool = Field(
+        default=False,
+        description="忽略断点，从头开始"
+    )
@@ -205,10 +205,22 @@ class ResponseMeta(BaseModel):
         None,
         description="使用的Cookie名称 (脱敏后)"
     )
+    cookies_used: Optional[List[str]] = Field(
+        None,
+        description="批量请求使用的全部Cookie名称 (多Cookie分摊时)"
+    )
     retry_count: int = Field(
         default=0,
         description="内部重试次数"
     )
+    cache_status: Optional[str] = Field(
+        None,
+        description="结果来源: hit=缓存命中, coalesced=合并了并发的相同请求, miss=实际请求后端"
+    )
+    cache_age_ms: Optional[int] = Field(
+        None,
+        description="结果生成至今的时间(毫秒)"
+    )
 
     class Config:
         json_encoders = {
@@ -355,7 +367,9 @@ def create_success_response(
     data: Dict[str, Any],
     request_id: str,
     latency_ms: int,
-    cookie_used: Optional[str] = None
+    cookie_used: Optional[str] = None,
+    cache_status: Optional[str] = None,
+    cache_age_ms: Optional[int] = None
 ) -> APIResponse:
     """创建成功响应"""
     return APIResponse(
@@ -365,7 +379,9 @@ def create_success_response(
         meta=ResponseMeta(
             request_id=request_id,
             latency_ms=latency_ms,
-            cookie_used=cookie_used
+            cookie_used=cookie_used,
+            cache_status=cache_status,
+            cache_age_ms=cache_age_ms
         )
     )
 
@@ -396,7 +412,8 @@ def create_batch_response(
     request_id: str,
     latency_ms: int,
     data: Optional[Dict] = None,
-    cookie_used: Optional[str] = None
+    cookie_used: Optional[str] = None,
+    cookies_used: Optional[List[str]] = None
 ) -> BatchResponse:
     """创建批量响应"""
     succeeded = sum(1 for item in items if item.success)
@@ -424,6 +441,7 @@ def create_batch_response(
         meta=ResponseMeta(
             request_id=request_id,
             latency_ms=latency_ms,
-            cookie_used=cookie_used
+            cookie_used=cookie_used,
+            cookies_used=cookies_used
         )
     )
@@ -5,9 +5,11 @@
 from .crawler import router as crawler_router
 from .health import router as health_router
 from .cookie import router as cookie_router
+from .admin import router as admin_router
 
 __all__ = [
     "crawler_router",
     "health_router",
     "cookie_router",
+    "admin_router",
 ]
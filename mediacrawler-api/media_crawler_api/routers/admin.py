@@ -0,0 +1,113 @@
+"""
+管理路由
+
+提供运维管理端点:
+- POST /api/admin/keys/rotate: 启动批量密钥轮换
+- GET /api/admin/keys/rotate: 查询轮换进度
+- POST /api/admin/keys/rotate/cancel: 取消轮换 (保留断点)
+
+请求需携带请求头 X-Admin-Token 且与 ADMIN_API_TOKEN 一致；
+未设置 ADMIN_API_TOKEN 时所有管理端点返回 403。
+"""
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from typing import Optional
+import hmac
+import os
+import time
+
+from ..models.response import APIResponse, ErrorCode, create_success_response, create_error_response
+from ..models.request import KeyRotationRequest
+from ..services.rotation import KeyRotationJob, get_key_rotation_job
+from ..utils.logging import get_logger
+from .crawler import get_request_id
+
+
+def verify_admin_token(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    """校验管理令牌 (未设置 ADMIN_API_TOKEN 时拒绝所有请求)"""
+    expected = os.environ.get("ADMIN_API_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=403, detail="管理接口未启用: 未设置 ADMIN_API_TOKEN")
+    if not hmac.compare_digest(x_admin_token or "", expected):
+        raise HTTPException(status_code=401, detail="无效的管理令牌")
+
+
+router = APIRouter(
+    prefix="/api/admin",
+    tags=["admin"],
+    dependencies=[Depends(verify_admin_token)]
+)
+logger = get_logger(__name__)
+
+
+@router.post("/keys/rotate", response_model=APIResponse, summary="启动批量密钥轮换")
+async def start_key_rotation(
+    request: Request,
+    body: Optional[KeyRotationRequest] = None,
+    job: KeyRotationJob = Depends(get_key_rotation_job)
+) -> APIResponse:
+    """
+    启动批量密钥轮换
+
+    将仍使用旧密钥 ID 的 Cookie 重新加密为当前 COOKIE_KEY_ID。
+    任务在后台运行，通过 GET /api/admin/keys/rotate 查询进度；
+    上次任务被取消或失败时默认从断点继续，restart=true 从头开始。
+    """
+    request_id = get_request_id(request)
+    start_time = time.time()
+    body = body or KeyRotationRequest()
+
+    try:
+        status = await job.start(
+            chunk_size=body.chunk_size,
+            workers=body.workers,
+            restart=body.restart
+        )
+    except RuntimeError as e:
+        return create_error_response(
+            error_code=ErrorCode.INVALID_INPUT,
+            message=str(e),
+            request_id=request_id,
+            latency_ms=int((time.time() - start_time) * 1000),
+            details=job.get_status()
+        )
+
+    logger.info(f"启动密钥轮换: chunk_size={body.chunk_size}, workers={body.workers}")
+
+    return create_success_response(
+        data=status,
+        request_id=request_id,
+        latency_ms=int((time.time() - start_time) * 1000)
+    )
+
+
+@router.get("/keys/rotate", response_model=APIResponse, summary="查询密钥轮换进度")
+async def get_key_rotation_status(
+    request: Request,
+    job: KeyRotationJob = Depends(get_key_rotation_job)
+) -> APIResponse:
+    """查询批量密钥轮换的状态和进度"""
+    request_id = get_request_id(request)
+    return create_success_response(
+        data=job.get_status(),
+        request_id=request_id,
+        latency_ms=0
+    )
+
+
+@router.post("/keys/rotate/cancel", response_model=APIResponse, summary="取消密钥轮换")
+async def cancel_key_rotation(
+    request: Request,
+    job: KeyRotationJob = Depends(get_key_rotation_job)
+) -> APIResponse:
+    """取消批量密钥轮换，当前批次完成后停止，断点保留"""
+    request_id = get_request_id(request)
+    start_time = time.time()
+
+    status = await job.cancel()
+
+    return create_success_response(
+        data=status,
+        request_id=request_id,
+        latency_ms=int((time.time() - start_time) * 1000)
+    )
@@ -3,11 +3,19 @@
 
 提供小红书内容采集相关的 API 端点:
 - /api/search: 搜索笔记
+- /api/search/crawl: 多页采集 (流式返回)
 - /api/note/detail: 获取笔记详情 (支持批量)
+- /api/note/{note_id}/comments/stream: 流式获取评论 (NDJSON)
 """
 
-from fastapi import APIRouter, Depends, Request, HTTPException
-from typing import Optional
+from fastapi import APIRouter, Depends, Request, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from contextlib import AsyncExitStack
+from typing import Optional, AsyncIterator, Union, Tuple, Dict, Any, Callable
+import asyncio
+import functools
+import json
 import time
 import uuid
 
@@ -16,10 +24,14 @@ from ..models.response import (
     ResponseMeta, BatchItemResult, ERROR_CONFIG,
     create_success_response, create_error_response, create_batch_response
 )
-from ..models.request import NoteDetailRequest, SearchRequest
+from ..models.request import (
+    NoteDetailRequest, SearchRequest, CrawlTaskRequest, StreamFormat
+)
 from ..services.crawler import CrawlerService, get_crawler_service
-from ..services.cookie import CookieManager, get_cookie_manager
+from ..services.cookie import CookieManager, get_cookie_manager, Cookie, CookieExhaustedError
+from ..services.batch import BatchExecutor, get_batch_executor
 from ..utils.logging import get_logger, set_request_id
+from ..utils.metrics import observe_api_request
 
 router = APIRouter(prefix="/api", tags=["crawler"])
 logger = get_logger(__name__)
@@ -38,7 +50,88 @@ def get_request_id(request: Request) -> str:
     return request_id
 
 
+def instrumented(route: str) -> Callable:
+    """
+    路由指标装饰器
+
+    按响应的 success 和 error.code 记录请求数和延迟。
+    需放在 @router 装饰器下方，functools.wraps 保留原签名供 FastAPI 解析参数。
+
+    Args:
+        route: 指标中的路由名
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            response = None
+            try:
+                response = await func(*args, **kwargs)
+                return response
+            finally:
+                # 未返回响应 (异常逃逸) 时记为 UNKNOWN
+                error = getattr(response, "error", None)
+                if response is None:
+                    error_code = "UNKNOWN"
+                else:
+                    error_code = error.code.value if error is not None else ""
+                observe_api_request(
+                    route,
+                    success=bool(getattr(response, "success", False)),
+                    error_code=error_code,
+                    seconds=time.perf_counter() - start
+                )
+        return wrapper
+    return decorator
+
+
+async def _search_page(
+    crawler: CrawlerService,
+    cookie_mgr: CookieManager,
+    body: Union[SearchRequest, CrawlTaskRequest],
+    page: int,
+    use_cache: bool = True
+) -> Tuple[Dict[str, Any], str, int]:
+    """
+    搜索单页 (经过搜索缓存和并发合并)
+
+    Returns:
+        ({"result": 搜索结果, "cookie_used": Cookie 名称}, 结果来源, 结果年龄毫秒)
+
+    Raises:
+        CookieExhaustedError: 无可用 Cookie
+    """
+    async def _do_search() -> Dict[str, Any]:
+        # 租用 Cookie，退出时自动结算使用统计
+        async with cookie_mgr.lease(
+            platform=body.platform.value,
+            cookie_name=body.cookie_name
+        ) as lease:
+            result = await crawler.search(
+                platform=body.platform.value,
+                keyword=body.keyword,
+                cookie=lease.cookie,
+                page=page,
+                page_size=body.page_size,
+                sort_type=body.sort_type.value,
+                note_type=body.note_type.value
+            )
+
+        return {"result": result, "cookie_used": lease.name}
+
+    cache_key = crawler.search_cache.make_key(
+        platform=body.platform,
+        keyword=body.keyword,
+        page=page,
+        page_size=body.page_size,
+        sort_type=body.sort_type,
+        note_type=body.note_type
+    )
+    return await crawler.search_cache.fetch(cache_key, _do_search, use_cache=use_cache)
+
+
 @router.post("/search", response_model=APIResponse, summary="搜索笔记")
+@instrumented("search")
 async def search_notes(
     request: Request,
     body: SearchRequest,
@@ -57,6 +150,12 @@ async def search_notes(
     - sort_type: 排序方式 (general/time_descending/popularity_descending)
     - note_type: 笔记类型 (0=全部, 1=视频, 2=图文)
 
+    **缓存与合并:**
+    - 相同参数的重复请求在短时间内直接返回缓存，不消耗 Cookie 额度
+    - 相同参数的并发请求合并为一次后端调用
+    - meta.cache_status 标识结果来源 (hit/coalesced/miss)，meta.cache_age_ms 为结果年龄
+    - 请求头 Cache-Control: no-cache 可绕过缓存读取
+
     **响应说明:**
     - success=true: data 包含搜索结果列表
     - success=false: error 包含错误详情
@@ -67,37 +166,20 @@ async def search_notes(
     logger.info(f"开始搜索: keyword={body.keyword}, page={body.page}")
 
     try:
-        # 获取 Cookie
-        cookie = await cookie_mgr.acquire(
-            platform=body.platform.value,
-            cookie_name=body.cookie_name
-        )
-
-        if not cookie:
-            latency_ms = int((time.time() - start_time) * 1000)
-            return create_error_response(
-                error_code=ErrorCode.COOKIE_EXHAUSTED,
-                message="无可用 Cookie，请添加新账号",
-                request_id=request_id,
-                latency_ms=latency_ms
-            )
-
-        # 执行搜索
-        result = await crawler.search(
-            platform=body.platform.value,
-            keyword=body.keyword,
-            cookie=cookie,
+        # 相同参数的请求: 优先读缓存，否则合并到同一次后端调用
+        searched, cache_status, cache_age_ms = await _search_page(
+            crawler,
+            cookie_mgr,
+            body,
             page=body.page,
-            page_size=body.page_size,
-            sort_type=body.sort_type.value,
-            note_type=body.note_type.value
+            use_cache=not _cache_bypassed(request)
         )
-
-        # 更新 Cookie 使用统计
-        await cookie_mgr.mark_used(cookie.name, success_count=1)
+        result = searched["result"]
 
         latency_ms = int((time.time() - start_time) * 1000)
-        logger.info(f"搜索完成: 找到 {len(result.get('items', []))} 条结果")
+        logger.info(
+            f"搜索完成: 找到 {len(result.get('items', []))} 条结果, cache={cache_status}"
+        )
 
         return create_success_response(
             data={
@@ -111,7 +193,18 @@ async def search_notes(
             },
             request_id=request_id,
             latency_ms=latency_ms,
-            cookie_used=cookie.name
+            cookie_used=searched["cookie_used"] if cache_status == "miss" else None,
+            cache_status=cache_status,
+            cache_age_ms=cache_age_ms
+        )
+
+    except CookieExhaustedError as e:
+        latency_ms = int((time.time() - start_time) * 1000)
+        return create_error_response(
+            error_code=ErrorCode.COOKIE_EXHAUSTED,
+            message=str(e),
+            request_id=request_id,
+            latency_ms=latency_ms
         )
 
     except TimeoutError as e:
@@ -135,12 +228,206 @@ async def search_notes(
         )
 
 
+# 搜索页码上限 (与 SearchRequest.page 一致)
+MAX_SEARCH_PAGE = 100
+
+
+def _format_stream_event(event_type: str, payload: Dict[str, Any], fmt: StreamFormat) -> str:
+    """格式化流式事件 (NDJSON 一行一个对象，SSE 使用 event/data 字段)"""
+    if fmt == StreamFormat.SSE:
+        data = json.dumps(payload, ensure_ascii=False)
+        return f"event: {event_type}\ndata: {data}\n\n"
+    return json.dumps({"type": event_type, **payload}, ensure_ascii=False) + "\n"
+
+
+@router.post("/search/crawl", response_model=None, summary="多页采集 (流式)")
+async def crawl_search(
+    request: Request,
+    body: CrawlTaskRequest,
+    crawler: CrawlerService = Depends(get_crawler_service),
+    cookie_mgr: CookieManager = Depends(get_cookie_manager)
+) -> StreamingResponse:
+    """
+    按关键词多页采集笔记，页面完成即流式返回
+
+    以 concurrency 控制同时请求的页数，遇到 has_more=false 或采集满
+    max_notes 后停止，跨页按 note_id 去重。每页经过搜索缓存和并发合并。
+
+    **输出事件:**
+    - note: {"page": 页码, "data": 笔记}
+    - error: {"page": 页码, "error": {...}}，出错后停止继续翻页
+    - end: {"count": 笔记数, "pages": 完成页数, "request_id": "..."}
+
+    **格式:** stream_format=ndjson (默认) 或 sse；请求头 Accept: text/event-stream 时使用 sse。
+    """
+    request_id = get_request_id(request)
+    start_time = time.time()
+
+    fmt = body.stream_format
+    if "text/event-stream" in request.headers.get("Accept", ""):
+        fmt = StreamFormat.SSE
+    use_cache = not _cache_bypassed(request)
+
+    logger.info(f"开始多页采集: keyword={body.keyword}, max_notes={body.max_notes}")
+
+    async def _events() -> AsyncIterator[str]:
+        set_request_id(request_id)
+        seen = set()
+        pending: Dict[asyncio.Task, int] = {}
+        next_page = 1
+        pages_done = 0
+        stop = False
+
+        try:
+            while pending or (not stop and next_page <= MAX_SEARCH_PAGE):
+                # 补足并发窗口
+                while not stop and len(pending) < body.concurrency and next_page <= MAX_SEARCH_PAGE:
+                    task = asyncio.create_task(
+                        _search_page(crawler, cookie_mgr, body, page=next_page, use_cache=use_cache)
+                    )
+                    pending[task] = next_page
+                    next_page += 1
+
+                if not pending:
+                    break
+
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    page = pending.pop(task)
+                    try:
+                        searched, cache_status, _ = task.result()
+                    except Exception as e:
+                        stop = True
+                        code = (
+                            ErrorCode.COOKIE_EXHAUSTED
+                            if isinstance(e, CookieExhaustedError)
+                            else ErrorCode.PLATFORM_ERROR
+                        )
+                        logger.warning(f"采集页失败: page={page}, {e}")
+                        yield _format_stream_event("error", {
+                            "page": page,
+                            "error": ErrorDetail.from_code(code, f"搜索失败: {str(e)}").dict()
+                        }, fmt)
+                        continue
+
+                    pages_done += 1
+                    result = searched["result"]
+
+                    for item in result.get("items", []):
+                        if len(seen) >= body.max_notes:
+                            break
+                        note_id = item.get("note_id")
+                        if not note_id or note_id in seen:
+                            continue
+                        seen.add(note_id)
+                        yield _format_stream_event("note", {"page": page, "data": item}, fmt)
+
+                    if not result.get("has_more", False) or len(seen) >= body.max_notes:
+                        stop = True
+
+                if stop:
+                    for task in pending:
+                        task.cancel()
+                    pending.clear()
+
+            yield _format_stream_event("end", {
+                "count": len(seen),
+                "pages": pages_done,
+                "request_id": request_id,
+                "latency_ms": int((time.time() - start_time) * 1000)
+            }, fmt)
+            logger.info(f"多页采集完成: count={len(seen)}, pages={pages_done}")
+
+        finally:
+            for task in pending:
+                task.cancel()
+
+    media_type = "text/event-stream" if fmt == StreamFormat.SSE else "application/x-ndjson"
+    return StreamingResponse(
+        _events(),
+        media_type=media_type,
+        headers={"X-Request-ID": request_id, "Cache-Control": "no-cache"}
+    )
+
+
+def _cache_bypassed(request: Request) -> bool:
+    """请求头 Cache-Control: no-cache / no-store 时绕过缓存"""
+    cache_control = request.headers.get("Cache-Control", "").lower()
+    return "no-cache" in cache_control or "no-store" in cache_control
+
+
+async def _fetch_note_item(
+    crawler: CrawlerService,
+    body: NoteDetailRequest,
+    note_id: str,
+    cookie: Cookie
+) -> BatchItemResult:
+    """获取单条笔记详情，并将异常转换为批量单项结果"""
+    try:
+        detail = await crawler.get_note_detail(
+            platform=body.platform.value,
+            note_id=note_id,
+            cookie=cookie,
+            get_comments=body.get_comments,
+            comments_limit=body.comments_limit,
+            timeout=15  # 单条超时 15 秒
+        )
+
+        return BatchItemResult(
+            id=note_id,
+            success=True,
+            data=detail,
+            error=None
+        )
+
+    except TimeoutError as e:
+        logger.warning(f"笔记超时: {note_id}")
+        return BatchItemResult(
+            id=note_id,
+            success=False,
+            data=None,
+            error=ErrorDetail.from_code(
+                ErrorCode.TIMEOUT_ERROR,
+                f"获取笔记超时: {str(e)}",
+                {"timeout_seconds": 15}
+            )
+        )
+
+    except ValueError as e:
+        # 解析错误
+        logger.warning(f"笔记解析失败: {note_id}")
+        return BatchItemResult(
+            id=note_id,
+            success=False,
+            data=None,
+            error=ErrorDetail.from_code(
+                ErrorCode.PARSE_ERROR,
+                f"笔记内容解析失败: {str(e)}"
+            )
+        )
+
+    except Exception as e:
+        logger.error(f"获取笔记失败: {note_id}, {e}")
+        return BatchItemResult(
+            id=note_id,
+            success=False,
+            data=None,
+            error=ErrorDetail.from_code(
+                ErrorCode.PLATFORM_ERROR,
+                f"获取笔记失败: {str(e)}"
+            )
+        )
+
+
 @router.post("/note/detail", response_model=BatchResponse, summary="获取笔记详情")
+@instrumented("note_detail")
 async def get_note_detail(
     request: Request,
     body: NoteDetailRequest,
     crawler: CrawlerService = Depends(get_crawler_service),
-    cookie_mgr: CookieManager = Depends(get_cookie_manager)
+    cookie_mgr: CookieManager = Depends(get_cookie_manager),
+    batch_executor: BatchExecutor = Depends(get_batch_executor)
 ) -> BatchResponse:
     """
     获取笔记详情 (支持批量)
@@ -149,6 +436,9 @@ async def get_note_detail(
 
     **特性:**
     - 支持批量请求 (最多20条)
+    - 有界并发执行: 批量耗时接近最慢的单条，结果保持输入顺序
+    - 多 Cookie 分摊 (multi_cookie=true): 按优先级和剩余额度将笔记分配到多个账号
+    - 结果缓存: 缓存命中的笔记不消耗 Cookie 额度，请求头 Cache-Control: no-cache 可绕过缓存
     - 支持部分失败: 即使部分笔记获取失败，成功的结果也会返回
     - 返回结构化的成功/失败信息
 
@@ -164,113 +454,128 @@ async def get_note_detail(
     items = []
     succeeded = 0
     failed = 0
-    used_cookie = None
+    used_cookies = []
 
     try:
-        # 获取 Cookie
-        cookie = await cookie_mgr.acquire(
-            platform=body.platform.value,
-            cookie_name=body.cookie_name
-        )
+        platform = body.platform.value
+
+        # 先查缓存，命中的笔记不消耗 Cookie 额度
+        cached = {}
+        if _cache_bypassed(request):
+            crawler.note_cache.record_bypass()
+        else:
+            for note_id in body.note_ids:
+                detail = await crawler.get_cached_note_detail(
+                    platform, note_id, body.get_comments, body.comments_limit
+                )
+                if detail is not None:
+                    cached[note_id] = detail
+        pending_ids = [note_id for note_id in body.note_ids if note_id not in cached]
+
+        async with AsyncExitStack() as stack:
+            # 租用 Cookie: 多 Cookie 模式按优先级和剩余额度分摊，否则整批使用同一个，
+            # 租约在获取时预留额度，退出时按记录的成功/失败数结算
+            leases = []
+            if pending_ids and body.multi_cookie and not body.cookie_name:
+                group = await stack.enter_async_context(
+                    cookie_mgr.lease_many(platform=platform, item_count=len(pending_ids))
+                )
+                leases = group.leases
+            elif pending_ids:
+                try:
+                    leases = [await stack.enter_async_context(
+                        cookie_mgr.lease(
+                            platform=platform,
+                            cookie_name=body.cookie_name,
+                            quota=len(pending_ids)
+                        )
+                    )]
+                except CookieExhaustedError:
+                    leases = []
+
+            if pending_ids and not leases and not cached:
+                latency_ms = int((time.time() - start_time) * 1000)
+                return BatchResponse(
+                    success=False,
+                    data={"platform": platform},
+                    items=[],
+                    summary={"total": len(body.note_ids), "succeeded": 0, "failed": len(body.note_ids)},
+                    error=ErrorDetail.from_code(
+                        ErrorCode.COOKIE_EXHAUSTED,
+                        "无可用 Cookie，请添加新账号"
+                    ),
+                    meta=ResponseMeta(
+                        request_id=request_id,
+                        latency_ms=latency_ms,
+                        cookie_used=None
+                    )
+                )
+
+            used_cookies = [lease.name for lease in leases]
+
+            # 按预留额度将笔记依次划分给各租约
+            assignments = []
+            for lease in leases:
+                offset = len(assignments)
+                assignments.extend(
+                    (note_id, lease) for note_id in pending_ids[offset:offset + lease.quota]
+                )
+            unassigned = pending_ids[len(assignments):]
+
+            # 有界并发获取笔记详情
+            fetched = await batch_executor.run(
+                assignments,
+                lambda pair: _fetch_note_item(crawler, body, pair[0], pair[1].cookie),
+                cookie_of=lambda pair: pair[1].name,
+                concurrency=body.concurrency
+            )
 
-        if not cookie:
-            latency_ms = int((time.time() - start_time) * 1000)
-            return BatchResponse(
+            # 记录各租约的成功/失败数 (缓存命中不计入)，退出上下文时结算
+            for item, (_, lease) in zip(fetched, assignments):
+                if item.success:
+                    lease.record_success()
+                else:
+                    lease.record_error()
+
+        results = {item.id: item for item in fetched}
+        for note_id, detail in cached.items():
+            results[note_id] = BatchItemResult(
+                id=note_id,
+                success=True,
+                data=detail,
+                error=None
+            )
+        # 剩余额度不足以覆盖的笔记
+        for note_id in unassigned:
+            results[note_id] = BatchItemResult(
+                id=note_id,
                 success=False,
-                data={"platform": body.platform.value},
-                items=[],
-                summary={"total": len(body.note_ids), "succeeded": 0, "failed": len(body.note_ids)},
+                data=None,
                 error=ErrorDetail.from_code(
                     ErrorCode.COOKIE_EXHAUSTED,
-                    "无可用 Cookie，请添加新账号"
-                ),
-                meta=ResponseMeta(
-                    request_id=request_id,
-                    latency_ms=latency_ms,
-                    cookie_used=None
+                    "Cookie 剩余额度不足，未处理此笔记"
                 )
             )
 
-        used_cookie = cookie.name
-
-        # 逐个获取笔记详情
-        for note_id in body.note_ids:
-            try:
-                detail = await crawler.get_note_detail(
-                    platform=body.platform.value,
-                    note_id=note_id,
-                    cookie=cookie,
-                    get_comments=body.get_comments,
-                    comments_limit=body.comments_limit,
-                    timeout=15  # 单条超时 15 秒
-                )
-
-                items.append(BatchItemResult(
-                    id=note_id,
-                    success=True,
-                    data=detail,
-                    error=None
-                ))
-                succeeded += 1
-
-            except TimeoutError as e:
-                logger.warning(f"笔记超时: {note_id}")
-                items.append(BatchItemResult(
-                    id=note_id,
-                    success=False,
-                    data=None,
-                    error=ErrorDetail.from_code(
-                        ErrorCode.TIMEOUT_ERROR,
-                        f"获取笔记超时: {str(e)}",
-                        {"timeout_seconds": 15}
-                    )
-                ))
-                failed += 1
-
-            except ValueError as e:
-                # 解析错误
-                logger.warning(f"笔记解析失败: {note_id}")
-                items.append(BatchItemResult(
-                    id=note_id,
-                    success=False,
-                    data=None,
-                    error=ErrorDetail.from_code(
-                        ErrorCode.PARSE_ERROR,
-                        f"笔记内容解析失败: {str(e)}"
-                    )
-                ))
-                failed += 1
-
-            except Exception as e:
-                logger.error(f"获取笔记失败: {note_id}, {e}")
-                items.append(BatchItemResult(
-                    id=note_id,
-                    success=False,
-                    data=None,
-                    error=ErrorDetail.from_code(
-                        ErrorCode.PLATFORM_ERROR,
-                        f"获取笔记失败: {str(e)}"
-                    )
-                ))
-                failed += 1
-
-        # 更新 Cookie 使用统计
-        await cookie_mgr.mark_used(
-            cookie.name,
-            success_count=succeeded,
-            error_count=failed
-        )
+        # 结果保持输入顺序
+        items = [results[note_id] for note_id in body.note_ids]
+        succeeded = sum(1 for item in items if item.success)
+        failed = len(items) - succeeded
 
         latency_ms = int((time.time() - start_time) * 1000)
-        logger.info(f"笔记详情获取完成: 成功={succeeded}, 失败={failed}")
+        logger.info(
+            f"笔记详情获取完成: 成功={succeeded}, 失败={failed}, "
+            f"缓存命中={len(cached)}, cookies={used_cookies}"
+        )
 
         # 构建响应
         return create_batch_response(
             items=items,
             request_id=request_id,
             latency_ms=latency_ms,
-            data={"platform": body.platform.value},
-            cookie_used=used_cookie
+            data={"platform": platform, "cache_hits": len(cached)},
+            cookie_used=used_cookies[0] if len(used_cookies) == 1 else None,
+            cookies_used=used_cookies
         )
 
     except Exception as e:
@@ -289,12 +594,14 @@ async def get_note_detail(
             meta=ResponseMeta(
                 request_id=request_id,
                 latency_ms=latency_ms,
-                cookie_used=used_cookie
+                cookie_used=used_cookies[0] if len(used_cookies) == 1 else None,
+                cookies_used=used_cookies or None
             )
         )
 
 
 @router.get("/note/{note_id}", response_model=APIResponse, summary="获取单条笔记详情")
+@instrumented("note")
 async def get_single_note_detail(
     request: Request,
     note_id: str,
@@ -314,6 +621,8 @@ async def get_single_note_detail(
     - platform: 平台 (默认 xhs)
     - get_comments: 是否获取评论
     - comments_limit: 评论数量限制
+
+    请求头 Cache-Control: no-cache 可绕过缓存。
     """
     request_id = get_request_id(request)
     start_time = time.time()
@@ -321,26 +630,28 @@ async def get_single_note_detail(
     logger.info(f"获取单条笔记: {note_id}")
 
     try:
-        cookie = await cookie_mgr.acquire(platform=platform)
-
-        if not cookie:
-            latency_ms = int((time.time() - start_time) * 1000)
-            return create_error_response(
-                error_code=ErrorCode.COOKIE_EXHAUSTED,
-                message="无可用 Cookie",
-                request_id=request_id,
-                latency_ms=latency_ms
+        if _cache_bypassed(request):
+            crawler.note_cache.record_bypass()
+        else:
+            detail = await crawler.get_cached_note_detail(
+                platform, note_id, get_comments, comments_limit
             )
+            if detail is not None:
+                latency_ms = int((time.time() - start_time) * 1000)
+                return create_success_response(
+                    data=detail,
+                    request_id=request_id,
+                    latency_ms=latency_ms
+                )
 
-        detail = await crawler.get_note_detail(
-            platform=platform,
-            note_id=note_id,
-            cookie=cookie,
-            get_comments=get_comments,
-            comments_limit=comments_limit
-        )
-
-        await cookie_mgr.mark_used(cookie.name, success_count=1)
+        async with cookie_mgr.lease(platform=platform) as lease:
+            detail = await crawler.get_note_detail(
+                platform=platform,
+                note_id=note_id,
+                cookie=lease.cookie,
+                get_comments=get_comments,
+                comments_limit=comments_limit
+            )
 
         latency_ms = int((time.time() - start_time) * 1000)
 
@@ -348,7 +659,16 @@ async def get_single_note_detail(
             data=detail,
             request_id=request_id,
             latency_ms=latency_ms,
-            cookie_used=cookie.name
+            cookie_used=lease.name
+        )
+
+    except CookieExhaustedError:
+        latency_ms = int((time.time() - start_time) * 1000)
+        return create_error_response(
+            error_code=ErrorCode.COOKIE_EXHAUSTED,
+            message="无可用 Cookie",
+            request_id=request_id,
+            latency_ms=latency_ms
         )
 
     except Exception as e:
@@ -360,3 +680,101 @@ async def get_single_note_detail(
             request_id=request_id,
             latency_ms=latency_ms
         )
+
+
+@router.get(
+    "/note/{note_id}/comments/stream",
+    response_model=None,
+    summary="流式获取笔记评论"
+)
+async def stream_note_comments(
+    request: Request,
+    note_id: str,
+    platform: str = "xhs",
+    cookie_name: Optional[str] = None,
+    comments_limit: int = Query(default=200, ge=1, le=1000),
+    expand_sub_comments: bool = False,
+    crawler: CrawlerService = Depends(get_crawler_service),
+    cookie_mgr: CookieManager = Depends(get_cookie_manager)
+) -> Union[StreamingResponse, APIResponse]:
+    """
+    流式获取笔记评论 (NDJSON)
+
+    按游标逐页拉取评论，每解析出一条即输出一行 JSON，
+    n8n 可在整个评论串加载完成前开始处理。
+
+    **输出行格式:**
+    - {"type": "comment", "data": {...}}: 单条评论
+    - {"type": "end", "count": N, "request_id": "..."}: 正常结束
+    - {"type": "error", "error": {...}, "count": N}: 中途失败 (已输出的评论有效)
+
+    **参数:**
+    - comments_limit: 评论数量上限 (1-1000)
+    - expand_sub_comments: 是否展开子评论
+    """
+    request_id = get_request_id(request)
+    start_time = time.time()
+
+    logger.info(f"流式获取评论: note_id={note_id}, limit={comments_limit}")
+
+    # 租约需跨越整个流式响应，手动获取并在生成器结束时释放
+    lease = cookie_mgr.lease(platform=platform, cookie_name=cookie_name)
+    try:
+        cookie = (await lease.start()).cookie
+    except CookieExhaustedError:
+        latency_ms = int((time.time() - start_time) * 1000)
+        return create_error_response(
+            error_code=ErrorCode.COOKIE_EXHAUSTED,
+            message="无可用 Cookie",
+            request_id=request_id,
+            latency_ms=latency_ms
+        )
+
+    async def _ndjson_lines() -> AsyncIterator[str]:
+        set_request_id(request_id)
+        count = 0
+
+        try:
+            async for comment in crawler.iter_comments(
+                note_id,
+                cookie,
+                limit=comments_limit,
+                expand_sub_comments=expand_sub_comments
+            ):
+                count += 1
+                yield json.dumps({"type": "comment", "data": comment}, ensure_ascii=False) + "\n"
+
+            yield json.dumps({
+                "type": "end",
+                "count": count,
+                "request_id": request_id,
+                "cookie_used": cookie.name,
+                "latency_ms": int((time.time() - start_time) * 1000)
+            }, ensure_ascii=False) + "\n"
+
+            lease.record_success()
+
+        except Exception as e:
+            lease.record_error()
+            logger.error(f"流式获取评论失败: {note_id}, {e}")
+            error = ErrorDetail.from_code(
+                ErrorCode.PLATFORM_ERROR,
+                f"获取评论失败: {str(e)}"
+            )
+            yield json.dumps({
+                "type": "error",
+                "error": error.dict(),
+                "count": count,
+                "request_id": request_id
+            }, ensure_ascii=False) + "\n"
+
+        finally:
+            await lease.release()
+
+    # 客户端在流开始前断开时生成器不会执行，由后台任务兜底释放 (release 可重复调用)
+    return StreamingResponse(
+        _ndjson_lines(),
+        media_type="application/x-ndjson",
+        headers={"X-Request-ID": request_id},
+        background=BackgroundTask(lease.release)
+    )
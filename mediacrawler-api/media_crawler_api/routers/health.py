@@ -5,16 +5,23 @@
 - /health: 详细健康检查 (用于监控)
 - /ready: 就绪检查 (用于负载均衡)
 - /live: 存活检查 (用于 Kubernetes)
+- /metrics: 服务指标 (默认 JSON，Accept 为 text/plain 或 OpenMetrics 时输出 Prometheus 文本格式)
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import PlainTextResponse
 from datetime import datetime, timedelta
-from typing import Dict, Any
-import psutil
+from typing import Dict, Any, Optional, Union
 import os
 
 from ..services.cookie import CookieManager, get_cookie_manager
-from ..utils.logging import get_logger
+from ..services.crawler import CrawlerService, get_crawler_service
+from ..utils.alerting import get_alert_dispatcher
+from ..utils.crypto import cookie_encryption, decrypted_cookie_cache
+from ..utils.logging import get_logger, get_logging_stats
+from ..utils.metrics import PROMETHEUS_CONTENT_TYPE, metrics_registry, render_prometheus
+from ..utils.resources import get_resource_sampler
+from ..utils.sliding_window import WINDOWS, get_request_window
 
 router = APIRouter(tags=["health"])
 logger = get_logger(__name__)
@@ -22,21 +29,50 @@ logger = get_logger(__name__)
 # 服务启动时间
 _start_time = datetime.utcnow()
 
-# 请求统计 (简单内存计数器，生产环境建议使用 Prometheus)
-_stats = {
-    "total_requests": 0,
-    "success_count": 0,
-    "error_count": 0,
-}
-
+# /health 和 /metrics 汇总成功率使用的窗口
+SUMMARY_WINDOW = "5m"
+
+# 抓取 /metrics 时从各组件状态刷新的 Gauge
+_cookie_gauge = metrics_registry.gauge(
+    "mediacrawler_cookies", "按状态统计的 Cookie 数量", ("status",)
+)
+_cookie_usage_gauge = metrics_registry.gauge(
+    "mediacrawler_cookie_daily_usage_rate", "Cookie 今日额度使用率"
+)
+_memory_gauge = metrics_registry.gauge(
+    "mediacrawler_process_memory_bytes", "进程常驻内存 (字节)"
+)
+_cpu_gauge = metrics_registry.gauge(
+    "mediacrawler_cpu_percent", "CPU 使用率", ("scope",)
+)
+_fd_gauge = metrics_registry.gauge(
+    "mediacrawler_open_fds", "进程打开的文件描述符数"
+)
+_pool_gauge = metrics_registry.gauge(
+    "mediacrawler_connection_pool", "后端连接池连接数", ("state",)
+)
+_window_success_gauge = metrics_registry.gauge(
+    "mediacrawler_api_window_success_rate", "滑动窗口内的 API 成功率", ("window",)
+)
+_window_latency_gauge = metrics_registry.gauge(
+    "mediacrawler_api_window_latency_ms", "滑动窗口内的 API 延迟百分位 (毫秒)", ("window", "quantile")
+)
+_uptime_gauge = metrics_registry.gauge(
+    "mediacrawler_uptime_seconds", "服务运行时间 (秒)"
+)
+
+
+def wants_prometheus(request: Request, format: Optional[str] = None) -> bool:
+    """
+    判断 /metrics 是否输出 Prometheus 文本格式
 
-def increment_request_count(success: bool = True):
-    """增加请求计数"""
-    _stats["total_requests"] += 1
-    if success:
-        _stats["success_count"] += 1
-    else:
-        _stats["error_count"] += 1
+    Prometheus 抓取时的 Accept 包含 text/plain 或 application/openmetrics-text；
+    curl 默认的 */* 和浏览器请求仍返回 JSON，保持现有 jq 用法不变。
+    """
+    if format:
+        return format.lower() == "prometheus"
+    accept = request.headers.get("accept", "").lower()
+    return "text/plain" in accept or "application/openmetrics-text" in accept
 
 
 def get_uptime_seconds() -> int:
@@ -44,12 +80,9 @@ def get_uptime_seconds() -> int:
     return int((datetime.utcnow() - _start_time).total_seconds())
 
 
-def get_success_rate() -> float:
-    """获取请求成功率"""
-    total = _stats["total_requests"]
-    if total == 0:
-        return 1.0
-    return _stats["success_count"] / total
+def get_success_rate(window: str = SUMMARY_WINDOW) -> float:
+    """获取最近窗口内的请求成功率 (无请求时为 1.0)"""
+    return get_request_window().snapshot(WINDOWS[window])["success_rate"]
 
 
 async def check_cookie_store(cookie_mgr: CookieManager) -> Dict[str, Any]:
@@ -60,7 +93,8 @@ async def check_cookie_store(cookie_mgr: CookieManager) -> Dict[str, Any]:
             return {
                 "status": "ok",
                 "active_count": stats.get("active_count", 0),
-                "total_count": stats.get("total_count", 0)
+                "total_count": stats.get("total_count", 0),
+                "storage": cookie_mgr.get_store_stats()
             }
         else:
             return {
@@ -75,57 +109,67 @@ async def check_cookie_store(cookie_mgr: CookieManager) -> Dict[str, Any]:
         }
 
 
-def check_memory() -> Dict[str, Any]:
-    """检查内存使用"""
-    try:
-        process = psutil.Process()
-        memory_info = process.memory_info()
-        memory_mb = memory_info.rss / 1024 / 1024
+def check_memory(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """检查内存使用 (读取资源采样快照)"""
+    if not snapshot:
+        return {"status": "unknown", "message": "资源采样尚未完成"}
 
-        # 获取系统内存
-        system_memory = psutil.virtual_memory()
+    memory_mb = snapshot["memory_rss_bytes"] / 1024 / 1024
 
-        status = "ok"
-        if memory_mb > 1024:  # 超过 1GB
-            status = "warning"
-        if memory_mb > 2048:  # 超过 2GB
-            status = "critical"
+    status = "ok"
+    if memory_mb > 1024:  # 超过 1GB
+        status = "warning"
+    if memory_mb > 2048:  # 超过 2GB
+        status = "critical"
 
-        return {
-            "status": status,
-            "process_mb": round(memory_mb, 2),
-            "system_percent": system_memory.percent
-        }
-    except Exception as e:
-        return {
-            "status": "unknown",
-            "message": str(e)
-        }
+    return {
+        "status": status,
+        "process_mb": round(memory_mb, 2),
+        "system_percent": snapshot["memory_system_percent"]
+    }
 
 
-def check_cpu() -> Dict[str, Any]:
-    """检查 CPU 使用"""
-    try:
-        process = psutil.Process()
-        cpu_percent = process.cpu_percent(interval=0.1)
-        system_cpu = psutil.cpu_percent(interval=0.1)
+def check_cpu(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """检查 CPU 使用 (读取资源采样快照，为距上次采样的平均值)"""
+    if not snapshot:
+        return {"status": "unknown", "message": "资源采样尚未完成"}
+
+    system_cpu = snapshot["cpu_system_percent"]
+
+    status = "ok"
+    if system_cpu > 80:
+        status = "warning"
+    if system_cpu > 95:
+        status = "critical"
+
+    return {
+        "status": status,
+        "process_percent": snapshot["cpu_process_percent"],
+        "system_percent": system_cpu,
+        "sample_age_seconds": snapshot["age_seconds"]
+    }
+
+
+def check_fds(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """检查打开的文件描述符数 (相对 RLIMIT_NOFILE 软限制)"""
+    open_fds = snapshot.get("open_fds")
+    if open_fds is None:
+        return {"status": "unknown", "message": "无法读取文件描述符数"}
 
-        status = "ok"
-        if system_cpu > 80:
+    fd_limit = snapshot.get("fd_limit")
+    status = "ok"
+    if fd_limit:
+        usage = open_fds / fd_limit
+        if usage > 0.8:
             status = "warning"
-        if system_cpu > 95:
+        if usage > 0.95:
             status = "critical"
 
-        return {
-            "status": status,
-            "process_percent": round(cpu_percent, 2),
-            "system_percent": round(system_cpu, 2)
-        }
-    except Exception as e:
-        return {
-            "status": "unknown",
-            "message": str(e)
-        }
+    return {
+        "status": status,
+        "open": open_fds,
+        "limit": fd_limit
+    }
 
 
 @router.get("/health", summary="健康检查")
@@ -142,17 +186,22 @@ async def health_check(
     - cookie_store: Cookie 存储状态
     - memory: 内存使用情况
     - cpu: CPU 使用情况
+    - fds: 打开的文件描述符数
+
+    资源类检查读取后台采样的最近快照 (间隔见 RESOURCE_SAMPLE_INTERVAL)，不阻塞请求。
 
     **状态说明:**
     - healthy: 所有组件正常
     - degraded: 部分组件异常，但服务可用
     - unhealthy: 服务不可用
     """
+    snapshot = get_resource_sampler().snapshot()
     checks = {
         "api": {"status": "ok"},
         "cookie_store": await check_cookie_store(cookie_mgr),
-        "memory": check_memory(),
-        "cpu": check_cpu(),
+        "memory": check_memory(snapshot),
+        "cpu": check_cpu(snapshot),
+        "fds": check_fds(snapshot),
     }
 
     # 判断整体状态
@@ -165,14 +214,18 @@ async def health_check(
     else:
         overall_status = "degraded"
 
+    recent = get_request_window().snapshot(WINDOWS[SUMMARY_WINDOW])
+
     return {
         "status": overall_status,
         "timestamp": datetime.utcnow().isoformat(),
         "checks": checks,
         "uptime_seconds": get_uptime_seconds(),
         "metrics": {
-            "total_requests": _stats["total_requests"],
-            "success_rate": round(get_success_rate(), 4),
+            "window": SUMMARY_WINDOW,
+            "total_requests": recent["total"],
+            "success_rate": recent["success_rate"],
+            "latency_p95_ms": recent["latency_ms"]["p95"],
             "active_cookies": checks["cookie_store"].get("active_count", 0),
         },
         "version": os.environ.get("APP_VERSION", "3.1.0")
@@ -193,6 +246,16 @@ async def readiness_check(
     - ready=false: 服务暂时无法处理请求
     """
     try:
+        # 密钥预派生未完成时不接收流量，避免请求阻塞在 PBKDF2 上
+        key_status = cookie_encryption.get_key_status()
+        if key_status["state"] in ("loading", "failed"):
+            return {
+                "ready": False,
+                "reason": "keys_loading" if key_status["state"] == "loading" else "keys_failed",
+                "message": "加密密钥预派生未完成",
+                "keys": key_status
+            }
+
         stats = await cookie_mgr.get_stats()
         active_count = stats.get("active_count", 0)
 
@@ -205,7 +268,11 @@ async def readiness_check(
 
         return {
             "ready": True,
-            "active_cookies": active_count
+            "active_cookies": active_count,
+            "keys": {
+                "state": key_status["state"],
+                "loaded": len(key_status["loaded"])
+            }
         }
     except Exception as e:
         return {
@@ -230,28 +297,64 @@ async def liveness_check() -> Dict[str, Any]:
     }
 
 
-@router.get("/metrics", summary="获取指标")
+@router.get("/metrics", response_model=None, summary="获取指标")
 async def get_metrics(
-    cookie_mgr: CookieManager = Depends(get_cookie_manager)
-) -> Dict[str, Any]:
+    request: Request,
+    format: Optional[str] = Query(None, description="输出格式: json / prometheus，默认按 Accept 协商"),
+    cookie_mgr: CookieManager = Depends(get_cookie_manager),
+    crawler: CrawlerService = Depends(get_crawler_service)
+) -> Union[Dict[str, Any], PlainTextResponse]:
     """
     获取服务指标
 
     返回用于监控和告警的关键指标。
+
+    **输出格式:**
+    - 默认返回 JSON
+    - Accept 包含 text/plain 或 application/openmetrics-text (Prometheus 抓取)，
+      或 format=prometheus 时返回 Prometheus 文本格式，
+      包含各路由和后端调用的请求数、延迟直方图
     """
     cookie_stats = await cookie_mgr.get_stats()
-    memory = check_memory()
-    cpu = check_cpu()
+    resources = get_resource_sampler().snapshot()
+    windows = get_request_window().get_stats()
+
+    if wants_prometheus(request, format):
+        _cookie_gauge.labels("active").set(cookie_stats.get("active_count", 0))
+        _cookie_gauge.labels("cooling").set(cookie_stats.get("cooling_count", 0))
+        _cookie_gauge.labels("invalid").set(cookie_stats.get("invalid_count", 0))
+        _cookie_usage_gauge.set(cookie_stats.get("daily_usage_rate", 0))
+        _memory_gauge.set(resources.get("memory_rss_bytes", 0))
+        _cpu_gauge.labels("process").set(resources.get("cpu_process_percent", 0))
+        _cpu_gauge.labels("system").set(resources.get("cpu_system_percent", 0))
+        if resources.get("open_fds") is not None:
+            _fd_gauge.set(resources["open_fds"])
+
+        pool_stats = crawler.get_pool_stats()
+        _pool_gauge.labels("in_use").set(pool_stats.get("in_use", 0))
+        if pool_stats.get("available") is not None:
+            _pool_gauge.labels("available").set(pool_stats["available"])
+        _pool_gauge.labels("waiting").set(pool_stats.get("waiting", 0))
+
+        for name, window in windows.items():
+            _window_success_gauge.labels(name).set(window["success_rate"])
+            for quantile in ("p50", "p95", "p99"):
+                _window_latency_gauge.labels(name, quantile).set(window["latency_ms"][quantile])
+        _uptime_gauge.set(get_uptime_seconds())
+
+        return PlainTextResponse(render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
 
     return {
         "timestamp": datetime.utcnow().isoformat(),
 
-        # 请求指标
+        # 请求指标 (汇总字段取 SUMMARY_WINDOW 窗口，windows 为各窗口明细)
         "requests": {
-            "total": _stats["total_requests"],
-            "success": _stats["success_count"],
-            "error": _stats["error_count"],
-            "success_rate": round(get_success_rate(), 4)
+            "window": SUMMARY_WINDOW,
+            "total": windows[SUMMARY_WINDOW]["total"],
+            "success": windows[SUMMARY_WINDOW]["success"],
+            "error": windows[SUMMARY_WINDOW]["error"],
+            "success_rate": windows[SUMMARY_WINDOW]["success_rate"],
+            "windows": windows
         },
 
         # Cookie 指标
@@ -265,12 +368,28 @@ async def get_metrics(
 
         # 资源指标
         "resources": {
-            "memory_mb": memory.get("process_mb", 0),
-            "memory_system_percent": memory.get("system_percent", 0),
-            "cpu_process_percent": cpu.get("process_percent", 0),
-            "cpu_system_percent": cpu.get("system_percent", 0)
+            "memory_mb": round(resources.get("memory_rss_bytes", 0) / 1024 / 1024, 2),
+            "memory_system_percent": resources.get("memory_system_percent", 0),
+            "cpu_process_percent": resources.get("cpu_process_percent", 0),
+            "cpu_system_percent": resources.get("cpu_system_percent", 0),
+            "open_fds": resources.get("open_fds"),
+            "sample_age_seconds": resources.get("age_seconds")
         },
 
+        # 连接池指标
+        "connection_pool": crawler.get_pool_stats(),
+
+        # 缓存指标
+        "note_cache": crawler.note_cache.get_stats(),
+        "search_cache": crawler.search_cache.get_stats(),
+        "cookie_plaintext_cache": decrypted_cookie_cache.get_stats(),
+
+        # 日志管道指标
+        "logging": get_logging_stats(),
+
+        # 告警发送指标
+        "alerts": get_alert_dispatcher().get_stats(),
+
         # 运行时间
         "uptime_seconds": get_uptime_seconds()
     }
@@ -2,13 +2,38 @@
 服务层模块
 """
 
-from .crawler import CrawlerService, get_crawler_service
-from .cookie import CookieManager, get_cookie_manager, Cookie
+from .crawler import (
+    CrawlerService,
+    get_crawler_service,
+    init_crawler_service,
+    close_crawler_service,
+)
+from .cookie import (
+    CookieManager,
+    get_cookie_manager,
+    init_cookie_manager,
+    close_cookie_manager,
+    Cookie,
+    CookieLease,
+    CookieExhaustedError,
+)
+from .batch import BatchExecutor, get_batch_executor
+from .rotation import KeyRotationJob, get_key_rotation_job
 
 __all__ = [
     "CrawlerService",
     "get_crawler_service",
+    "init_crawler_service",
+    "close_crawler_service",
     "CookieManager",
     "get_cookie_manager",
+    "init_cookie_manager",
+    "close_cookie_manager",
     "Cookie",
+    "CookieLease",
+    "CookieExhaustedError",
+    "BatchExecutor",
+    "get_batch_executor",
+    "KeyRotationJob",
+    "get_key_rotation_job",
 ]
@@ -0,0 +1,136 @@
+"""
+批量执行服务
+
+为批量接口 (如 /api/note/detail) 提供有界并发执行:
+- 单请求并发上限: 单个批量请求内同时执行的任务数
+- 全局并发上限: 所有请求共享，保护 MediaCrawler 后端
+- 单 Cookie 并发上限: 避免同一账号被并发请求打满触发风控
+
+结果按输入顺序返回，批量耗时接近最慢的单项而不是所有单项之和。
+"""
+
+from typing import Optional, Dict, List, Callable, Awaitable, TypeVar
+import asyncio
+import os
+
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class BatchExecutor:
+    """
+    批量任务执行器
+
+    信号量获取顺序: 单请求 -> 单 Cookie -> 全局，
+    避免任务在等待 Cookie 名额时占用全局名额。
+    """
+
+    # 默认并发配置
+    DEFAULT_CONCURRENCY = {
+        "per_request": 5,
+        "global": 20,
+        "per_cookie": 3,
+    }
+
+    # 并发配置对应的环境变量
+    CONCURRENCY_ENV_VARS = {
+        "per_request": "BATCH_CONCURRENCY_PER_REQUEST",
+        "global": "BATCH_CONCURRENCY_GLOBAL",
+        "per_cookie": "BATCH_CONCURRENCY_PER_COOKIE",
+    }
+
+    def __init__(self, concurrency: Optional[Dict[str, int]] = None):
+        """
+        初始化批量执行器
+
+        Args:
+            concurrency: 并发配置，覆盖默认值和环境变量
+        """
+        self.concurrency = dict(self.DEFAULT_CONCURRENCY)
+        for key, env_var in self.CONCURRENCY_ENV_VARS.items():
+            if os.environ.get(env_var):
+                self.concurrency[key] = int(os.environ[env_var])
+        self.concurrency.update(concurrency or {})
+
+        self._global_semaphore = asyncio.Semaphore(self.concurrency["global"])
+        self._cookie_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _get_cookie_semaphore(self, cookie_name: str) -> asyncio.Semaphore:
+        """获取 Cookie 对应的信号量"""
+        semaphore = self._cookie_semaphores.get(cookie_name)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.concurrency["per_cookie"])
+            self._cookie_semaphores[cookie_name] = semaphore
+        return semaphore
+
+    async def run(
+        self,
+        items: List[T],
+        worker: Callable[[T], Awaitable[R]],
+        cookie_name: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        cookie_of: Optional[Callable[[T], str]] = None
+    ) -> List[R]:
+        """
+        并发执行批量任务
+
+        Args:
+            items: 任务输入列表
+            worker: 单项处理函数，应自行捕获异常并返回结果对象
+            cookie_name: 使用的 Cookie 名称 (用于单 Cookie 并发控制)
+            concurrency: 本次请求的并发上限，不超过 per_request 配置
+            cookie_of: 返回单项所用 Cookie 名称的函数 (多 Cookie 批量时使用，
+                优先于 cookie_name)
+
+        Returns:
+            与输入顺序一致的结果列表
+        """
+        limit = self.concurrency["per_request"]
+        if concurrency:
+            limit = min(concurrency, limit)
+
+        request_semaphore = asyncio.Semaphore(limit)
+
+        async def _run_one(item: T) -> R:
+            name = cookie_of(item) if cookie_of else cookie_name
+            cookie_semaphore = self._get_cookie_semaphore(name) if name else None
+
+            async with request_semaphore:
+                if cookie_semaphore is None:
+                    async with self._global_semaphore:
+                        return await worker(item)
+                async with cookie_semaphore:
+                    async with self._global_semaphore:
+                        return await worker(item)
+
+        logger.debug(f"批量执行: items={len(items)}, concurrency={limit}")
+
+        # gather 保证结果顺序与输入一致
+        return list(await asyncio.gather(*(_run_one(item) for item in items)))
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取并发配置"""
+        return dict(self.concurrency)
+
+
+# ============ 依赖注入 ============
+
+_batch_executor: Optional[BatchExecutor] = None
+
+
+def get_batch_executor() -> BatchExecutor:
+    """获取批量执行器实例 (单例)"""
+    global _batch_executor
+    if _batch_executor is None:
+        _batch_executor = BatchExecutor()
+    return _batch_executor
+
+
+def reset_batch_executor() -> None:
+    """重置批量执行器 (用于测试)"""
+    global _batch_executor
+    _batch_executor = None
@@ -0,0 +1,587 @@
+"""
+缓存服务
+
+为爬虫结果提供进程内缓存，减少重复请求对 Cookie 额度的消耗:
+- CacheBackend: 缓存后端接口
+- MemoryCacheBackend: 内存 LRU 后端 (按条目数和估算字节数限制)
+- RedisCacheBackend: Redis 兼容后端 (可选，需安装 redis 或传入兼容客户端)
+- NoteDetailCache: 笔记详情缓存，按字段组设置不同 TTL
+- SingleFlight: 相同请求的并发调用合并 (single-flight)
+- SearchResultCache: 搜索结果短 TTL 缓存 + 并发合并
+
+字段组:
+    static:   标题/正文/图片/视频/标签/作者等，几乎不变，长 TTL
+    interact: 点赞/收藏/评论/分享数，变化快，短 TTL
+    comments: 评论列表，中等 TTL
+"""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple, Callable, Awaitable
+import asyncio
+import hashlib
+import json
+import os
+import time
+
+from ..utils.logging import get_logger
+from ..utils.metrics import observe_cache_lookup
+
+logger = get_logger(__name__)
+
+
+class CacheBackend(ABC):
+    """
+    缓存后端接口
+
+    值必须可 JSON 序列化，ttl 单位为秒。
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        """读取缓存，不存在或已过期时返回 None"""
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        """写入缓存"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """删除缓存"""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """清空缓存"""
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    内存 LRU 缓存后端
+
+    同时按条目数和估算字节数 (JSON 序列化长度) 限制内存占用，
+    超限时淘汰最久未访问的条目。过期条目在访问时惰性删除。
+    """
+
+    def __init__(self, max_entries: int = 5000, max_bytes: int = 64 * 1024 * 1024):
+        """
+        初始化内存缓存
+
+        Args:
+            max_entries: 最大条目数
+            max_bytes: 最大估算字节数
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> (过期时间, 估算字节数, 值)
+        self._data: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._evictions = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+
+        expires_at, _, value = entry
+        if time.monotonic() >= expires_at:
+            self._remove(key)
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        size = len(json.dumps(value, ensure_ascii=False, default=str))
+        if size > self.max_bytes:
+            return
+
+        self._remove(key)
+        self._data[key] = (time.monotonic() + ttl, size, value)
+        self._bytes += size
+
+        while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+            oldest_key = next(iter(self._data))
+            self._remove(oldest_key)
+            self._evictions += 1
+
+    async def delete(self, key: str) -> None:
+        self._remove(key)
+
+    async def clear(self) -> None:
+        self._data.clear()
+        self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "evictions": self._evictions,
+        }
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Redis 兼容缓存后端
+
+    client 需提供异步的 get / set(key, value, ex=秒) / delete 方法，
+    例如 redis.asyncio.Redis；测试时可传入实现相同方法的本地替身。
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        url: Optional[str] = None,
+        prefix: str = "mediacrawler:"
+    ):
+        """
+        初始化 Redis 缓存
+
+        Args:
+            client: Redis 兼容客户端
+            url: Redis 连接地址 (未传 client 时使用，需要安装 redis)
+            prefix: 键前缀
+        """
+        if client is None:
+            try:
+                import redis.asyncio as redis_asyncio
+            except ImportError:
+                raise RuntimeError("使用 Redis 缓存需要安装 redis: pip install redis")
+            client = redis_asyncio.from_url(url or "redis://localhost:6379/0")
+
+        self._client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self._client.get(self.prefix + key)
+        if raw is None:
+            return None
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await self._client.set(
+            self.prefix + key,
+            json.dumps(value, ensure_ascii=False, default=str),
+            ex=max(int(ttl), 1)
+        )
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(self.prefix + key)
+
+    async def clear(self) -> None:
+        # 共享后端不做全量清理，依赖 TTL 过期
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": "redis", "prefix": self.prefix}
+
+
+def create_cache_backend(prefix: str = "CACHE") -> CacheBackend:
+    """
+    根据环境变量创建缓存后端
+
+    环境变量 (以 prefix=NOTE_CACHE 为例):
+    - NOTE_CACHE_BACKEND: memory (默认) / redis
+    - NOTE_CACHE_REDIS_URL: Redis 地址
+    - NOTE_CACHE_MAX_ENTRIES: 内存缓存最大条目数
+    - NOTE_CACHE_MAX_BYTES: 内存缓存最大字节数
+    """
+    backend = os.environ.get(f"{prefix}_BACKEND", "memory").lower()
+
+    if backend == "redis":
+        return RedisCacheBackend(
+            url=os.environ.get(f"{prefix}_REDIS_URL"),
+            prefix=f"mediacrawler:{prefix.lower()}:"
+        )
+
+    return MemoryCacheBackend(
+        max_entries=int(os.environ.get(f"{prefix}_MAX_ENTRIES", 5000)),
+        max_bytes=int(os.environ.get(f"{prefix}_MAX_BYTES", 64 * 1024 * 1024))
+    )
+
+
+class NoteDetailCache:
+    """
+    笔记详情缓存
+
+    按字段组分别存储，每组使用独立 TTL。读取时只有所需字段组全部命中才算命中，
+    任一字段组过期即视为未命中并重新请求。
+    """
+
+    # 字段组定义
+    FIELD_GROUPS = {
+        "static": [
+            "note_id", "title", "desc", "type", "image_list",
+            "video_url", "tag_list", "time", "user",
+        ],
+        "interact": ["interact_info", "crawled_at"],
+        "comments": ["comments", "comment_count"],
+    }
+
+    # 默认 TTL (秒)
+    DEFAULT_TTL = {
+        "static": 24 * 3600,
+        "interact": 5 * 60,
+        "comments": 30 * 60,
+    }
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        ttl: Optional[Dict[str, float]] = None,
+        enabled: bool = True
+    ):
+        """
+        初始化笔记详情缓存
+
+        Args:
+            backend: 缓存后端，默认按环境变量创建
+            ttl: 各字段组 TTL，覆盖默认值和环境变量
+            enabled: 是否启用
+        """
+        self.backend = backend or create_cache_backend("NOTE_CACHE")
+        self.enabled = enabled
+
+        self.ttl = dict(self.DEFAULT_TTL)
+        for group in self.ttl:
+            env_value = os.environ.get(f"NOTE_CACHE_TTL_{group.upper()}")
+            if env_value:
+                self.ttl[group] = float(env_value)
+        self.ttl.update(ttl or {})
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "bypasses": 0,
+            "writes": 0,
+            "errors": 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "NoteDetailCache":
+        """根据环境变量创建 (NOTE_CACHE_ENABLED=false 可关闭缓存)"""
+        enabled = os.environ.get("NOTE_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+        return cls(enabled=enabled)
+
+    @staticmethod
+    def _key(platform: str, note_id: str, group: str) -> str:
+        return f"note:{platform}:{note_id}:{group}"
+
+    def _record_lookup(self, result: str) -> None:
+        """累加查询统计并写入 Prometheus 计数器"""
+        self._stats[result] += 1
+        observe_cache_lookup("note", result)
+
+    async def get(
+        self,
+        platform: str,
+        note_id: str,
+        get_comments: bool = True,
+        comments_limit: int = 50
+    ) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存的笔记详情
+
+        Returns:
+            与 CrawlerService.get_note_detail 结构一致的详情，未命中返回 None
+        """
+        if not self.enabled:
+            return None
+
+        with_comments = get_comments and comments_limit > 0
+
+        try:
+            static = await self.backend.get(self._key(platform, note_id, "static"))
+            interact = await self.backend.get(self._key(platform, note_id, "interact")) if static else None
+            comments = None
+            if interact and with_comments:
+                comments = await self.backend.get(self._key(platform, note_id, "comments"))
+                # 缓存的评论数量不足且评论串未取完时视为未命中
+                if comments and comments["limit"] < comments_limit and len(comments["comments"]) >= comments["limit"]:
+                    comments = None
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"读取笔记缓存失败: {note_id}, {e}")
+            return None
+
+        if not static or not interact or (with_comments and not comments):
+            self._record_lookup("misses")
+            return None
+
+        self._record_lookup("hits")
+
+        detail = {**static, **interact, "comments": []}
+        if with_comments:
+            detail["comments"] = comments["comments"][:comments_limit]
+            detail["comment_count"] = len(detail["comments"])
+        return detail
+
+    async def put(
+        self,
+        platform: str,
+        note_id: str,
+        detail: Dict[str, Any],
+        comments_limit: int = 50
+    ) -> None:
+        """
+        写入笔记详情
+
+        只有成功获取了评论 (详情中包含 comment_count) 时才写入评论字段组。
+        """
+        if not self.enabled:
+            return
+
+        groups = {
+            "static": {k: detail.get(k) for k in self.FIELD_GROUPS["static"]},
+            "interact": {k: detail.get(k) for k in self.FIELD_GROUPS["interact"]},
+        }
+        if "comment_count" in detail:
+            groups["comments"] = {
+                "limit": comments_limit,
+                "comments": detail.get("comments", []),
+            }
+
+        try:
+            for group, value in groups.items():
+                await self.backend.set(
+                    self._key(platform, note_id, group),
+                    value,
+                    self.ttl[group]
+                )
+            self._stats["writes"] += 1
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"写入笔记缓存失败: {note_id}, {e}")
+
+    async def invalidate(self, platform: str, note_id: str) -> None:
+        """删除笔记的全部缓存"""
+        for group in self.FIELD_GROUPS:
+            await self.backend.delete(self._key(platform, note_id, group))
+
+    def record_bypass(self) -> None:
+        """记录一次 no-cache 绕过"""
+        self._stats["bypasses"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计"""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            "enabled": self.enabled,
+            **self._stats,
+            "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            "ttl_seconds": dict(self.ttl),
+            **self.backend.get_stats(),
+        }
+
+
+class _Flight:
+    """一次执行中的调用及其等待者数"""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    并发请求合并
+
+    同一个键同时只执行一次调用，其余并发调用等待并共享同一结果 (或异常)。
+
+    调用在 SingleFlight 自己持有的任务中执行，发起者与跟随者都通过 shield 等待:
+    任一等待者被取消 (如客户端断开) 不影响其他等待者；
+    所有等待者都已取消时才取消底层调用。
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, _Flight] = {}
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """
+        执行或加入正在执行的调用
+
+        Returns:
+            (结果, 是否共享了其他调用的结果)
+        """
+        flight = self._inflight.get(key)
+        shared = flight is not None
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._inflight[key] = flight
+            flight.task.add_done_callback(lambda task: self._finish(key, flight))
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task), shared
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # 已无等待者: 取消底层调用，后续相同请求重新发起
+                self._discard(key, flight)
+                flight.task.cancel()
+
+    def _discard(self, key: str, flight: _Flight) -> None:
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+
+    def _finish(self, key: str, flight: _Flight) -> None:
+        self._discard(key, flight)
+        # 没有等待者时避免 "exception was never retrieved" 警告
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+    def inflight_count(self) -> int:
+        """当前执行中的调用数"""
+        return len(self._inflight)
+
+
+class SearchResultCache:
+    """
+    搜索结果缓存
+
+    以规范化后的搜索参数为键，短 TTL 缓存结果；未命中时通过 SingleFlight
+    合并相同参数的并发请求，只有一次请求会实际调用后端并消耗 Cookie。
+
+    来源 (cache_status):
+        hit:       命中缓存
+        coalesced: 共享了并发中的同一请求
+        miss:      实际调用了后端
+    """
+
+    DEFAULT_TTL = 120   # 秒
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        ttl: Optional[float] = None,
+        enabled: bool = True
+    ):
+        """
+        初始化搜索结果缓存
+
+        Args:
+            backend: 缓存后端，默认按 SEARCH_CACHE_* 环境变量创建
+            ttl: 缓存时间 (秒)，默认读取 SEARCH_CACHE_TTL
+            enabled: 是否启用缓存 (并发合并始终启用)
+        """
+        self.backend = backend or create_cache_backend("SEARCH_CACHE")
+        self.ttl = ttl or float(os.environ.get("SEARCH_CACHE_TTL", self.DEFAULT_TTL))
+        self.enabled = enabled
+        self._flight = SingleFlight()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "bypasses": 0,
+            "errors": 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "SearchResultCache":
+        """根据环境变量创建 (SEARCH_CACHE_ENABLED=false 可关闭缓存)"""
+        enabled = os.environ.get("SEARCH_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+        return cls(enabled=enabled)
+
+    @staticmethod
+    def make_key(**params: Any) -> str:
+        """
+        生成规范化的缓存键
+
+        关键词去除首尾空白、合并连续空白并转小写，其余参数按名称排序。
+        """
+        normalized = {}
+        for name, value in params.items():
+            if hasattr(value, "value"):
+                value = value.value
+            if name == "keyword" and isinstance(value, str):
+                value = " ".join(value.split()).lower()
+            normalized[name] = value
+
+        raw = json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+        return "search:" + hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _record_lookup(self, result: str) -> None:
+        """累加查询统计并写入 Prometheus 计数器"""
+        self._stats[result] += 1
+        observe_cache_lookup("search", result)
+
+    async def fetch(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        use_cache: bool = True
+    ) -> Tuple[Any, str, int]:
+        """
+        读取缓存或执行搜索
+
+        Args:
+            key: make_key 生成的缓存键
+            fn: 实际执行搜索的协程函数，返回值需可 JSON 序列化
+            use_cache: 是否读取缓存 (no-cache 时为 False，结果仍会写入)
+
+        Returns:
+            (结果, 来源, 结果年龄毫秒)
+        """
+        if self.enabled and use_cache:
+            try:
+                entry = await self.backend.get(key)
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.warning(f"读取搜索缓存失败: {e}")
+                entry = None
+
+            if entry is not None:
+                self._record_lookup("hits")
+                age_ms = int((time.time() - entry["cached_at"]) * 1000)
+                return entry["result"], "hit", age_ms
+        elif not use_cache:
+            self._stats["bypasses"] += 1
+
+        async def _fetch_and_store() -> Dict[str, Any]:
+            result = await fn()
+            entry = {"result": result, "cached_at": time.time()}
+            if self.enabled:
+                try:
+                    await self.backend.set(key, entry, self.ttl)
+                except Exception as e:
+                    self._stats["errors"] += 1
+                    logger.warning(f"写入搜索缓存失败: {e}")
+            return entry
+
+        entry, shared = await self._flight.do(key, _fetch_and_store)
+        age_ms = int((time.time() - entry["cached_at"]) * 1000)
+
+        if shared:
+            self._record_lookup("coalesced")
+            return entry["result"], "coalesced", age_ms
+
+        self._record_lookup("misses")
+        return entry["result"], "miss", age_ms
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计"""
+        return {
+            "enabled": self.enabled,
+            "ttl_seconds": self.ttl,
+            "inflight": self._flight.inflight_count(),
+            **self._stats,
+            **self.backend.get_stats(),
+        }
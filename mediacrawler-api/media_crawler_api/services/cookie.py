@@ -13,20 +13,35 @@ Cookie 状态机:
     cooling -> banned (冷却期再次错误)
     active -> invalid (累计错误 >= 10 或验证失败)
     active -> banned (平台封禁检测)
+
+Cookie 租约:
+    async with manager.lease(platform="xhs", quota=1) as lease:
+        ... 使用 lease.cookie ...
+    租约在获取时预留每日额度并占用一个并发名额，退出时自动释放，
+    并按 record_success/record_error (或是否抛出异常) 更新使用统计。
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Tuple
 from enum import Enum
 import asyncio
+import heapq
+import itertools
+import os
 
-from ..utils.crypto import cookie_encryption, mask_cookie
+from .cookie_store import CookieStore, create_cookie_store
+from ..utils.crypto import cookie_encryption, decrypted_cookie_cache, mask_cookie
 from ..utils.logging import get_logger
 
 logger = get_logger(__name__)
 
 
+class CookieExhaustedError(Exception):
+    """无可用 Cookie"""
+    pass
+
+
 class CookieStatus(str, Enum):
     """Cookie 状态"""
     ACTIVE = "active"       # 活跃可用
@@ -61,10 +76,67 @@ class Cookie:
     record_id: Optional[str] = None     # 飞书记录 ID
 
     def get_decrypted_value(self) -> str:
-        """获取解密后的 Cookie 值"""
+        """获取解密后的 Cookie 值 (经过解密结果缓存)"""
         if not self.encrypted_value or not self.encryption_key_id:
             raise ValueError("Cookie 未加密或加密信息不完整")
-        return cookie_encryption.decrypt(self.encrypted_value, self.encryption_key_id)
+        return decrypted_cookie_cache.get_or_decrypt(
+            self.name, self.encrypted_value, self.encryption_key_id
+        )
+
+    async def get_decrypted_value_async(self) -> str:
+        """获取解密后的 Cookie 值 (需要派生历史密钥时不阻塞事件循环)"""
+        if self.encryption_key_id:
+            await cookie_encryption.ensure_key(self.encryption_key_id)
+        return self.get_decrypted_value()
+
+    def to_record(self) -> Dict[str, Any]:
+        """转换为存储记录 (字段名与 tbl_cookie 一致)"""
+        def _iso(value: Optional[datetime]) -> Optional[str]:
+            return value.isoformat() if value else None
+
+        return {
+            "cookie_name": self.name,
+            "platform": self.platform,
+            "cookie_encrypted": self.encrypted_value,
+            "encryption_key_id": self.encryption_key_id,
+            "status": self.status.value,
+            "priority": self.priority,
+            "daily_used": self.daily_used,
+            "daily_limit": self.daily_limit,
+            "total_used": self.total_used,
+            "consecutive_errors": self.consecutive_errors,
+            "total_errors": self.total_errors,
+            "last_used_at": _iso(self.last_used_at),
+            "last_error_at": _iso(self.last_error_at),
+            "cooling_until": _iso(self.cooling_until),
+            "created_at": _iso(self.created_at),
+            "updated_at": _iso(self.updated_at),
+        }
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "Cookie":
+        """从存储记录恢复"""
+        def _dt(value: Optional[str]) -> Optional[datetime]:
+            return datetime.fromisoformat(value) if value else None
+
+        return cls(
+            name=record["cookie_name"],
+            platform=record.get("platform") or "xhs",
+            encrypted_value=record.get("cookie_encrypted") or "",
+            encryption_key_id=record.get("encryption_key_id") or "",
+            status=CookieStatus(record.get("status") or CookieStatus.ACTIVE.value),
+            priority=int(record.get("priority") or 1),
+            daily_used=int(record.get("daily_used") or 0),
+            daily_limit=int(record.get("daily_limit") or 100),
+            total_used=int(record.get("total_used") or 0),
+            consecutive_errors=int(record.get("consecutive_errors") or 0),
+            total_errors=int(record.get("total_errors") or 0),
+            last_used_at=_dt(record.get("last_used_at")),
+            last_error_at=_dt(record.get("last_error_at")),
+            cooling_until=_dt(record.get("cooling_until")),
+            created_at=_dt(record.get("created_at")) or datetime.utcnow(),
+            updated_at=_dt(record.get("updated_at")) or datetime.utcnow(),
+        )
 
     def is_available(self) -> bool:
         """检查 Cookie 是否可用"""
@@ -88,7 +160,16 @@ class CookieManager:
     Cookie 管理器
 
     提供 Cookie 的增删改查和状态管理功能。
-    支持本地存储和飞书存储两种模式。
+    支持内存、SQLite 和飞书三种存储模式 (见 cookie_store)。
+
+    持久化采用 write-behind: 修改只标记脏数据，由后台任务定期批量写入存储，
+    acquire/lease 等热路径不等待存储 I/O。调用 start() 加载已持久化的数据，
+    close() 写入剩余修改。
+
+    索引结构 (均为惰性删除的堆，acquire 和冷却恢复为 O(log n)):
+    - _available: 按平台划分的可用堆，排序键 (-priority, daily_used + 已预留额度)
+    - _cooling: 冷却到期时间小顶堆
+    Cookie 排序相关字段变化时调用 _index() 重新入堆，旧条目通过版本号失效。
     """
 
     # 冷却配置
@@ -96,17 +177,262 @@ class CookieManager:
     MAX_CONSECUTIVE_ERRORS = 3          # 触发冷却的连续错误数
     MAX_TOTAL_ERRORS = 10               # 触发失效的累计错误数
 
-    def __init__(self, storage_type: str = "memory"):
+    # 批量分配配置
+    MAX_BATCH_COOKIES = 5               # 单个批量请求最多使用的 Cookie 数
+
+    # 租约配置
+    MAX_IN_FLIGHT_PER_COOKIE = 3        # 单个 Cookie 同时持有的租约数上限
+
+    # 持久化配置
+    FLUSH_INTERVAL_SECONDS = 5.0        # 后台写入间隔
+    FLUSH_MAX_PENDING = 200             # 脏数据超过此数量时提前写入
+
+    def __init__(
+        self,
+        storage_type: str = "memory",
+        store: Optional[CookieStore] = None
+    ):
         """
         初始化 Cookie 管理器
 
         Args:
-            storage_type: 存储类型 (memory/feishu)
+            storage_type: 存储类型 (memory/sqlite/feishu)
+            store: 存储后端，覆盖 storage_type (用于测试或自定义后端)
         """
         self.storage_type = storage_type
+        self._store = store or create_cookie_store(storage_type)
         self._cookies: Dict[str, Cookie] = {}
         self._lock = asyncio.Lock()
 
+        # write-behind 状态: 待写入和待删除的 Cookie 名称
+        self._dirty: set = set()
+        self._deleted: set = set()
+        self._flush_lock = asyncio.Lock()
+        self._flush_event: Optional[asyncio.Event] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_interval = float(
+            os.environ.get("COOKIE_STORE_FLUSH_INTERVAL", self.FLUSH_INTERVAL_SECONDS)
+        )
+        self._flush_stats = {"flushes": 0, "records_written": 0, "errors": 0}
+
+        # 启动时后台预派生加密密钥
+        self._key_preload_task: Optional[asyncio.Task] = None
+
+        # 可用堆: platform -> [(-priority, daily_used, version, name)]
+        self._available: Dict[str, List[Tuple[int, int, int, str]]] = {}
+        # 冷却堆: [(cooling_until, version, name)]
+        self._cooling: List[Tuple[datetime, int, str]] = []
+        # 每个 Cookie 的最新版本号，堆中版本号不一致的条目视为失效
+        self._versions: Dict[str, int] = {}
+        self._version_counter = itertools.count()
+
+        # 租约状态: 持有中的租约数、已预留未结算的额度
+        self._in_flight: Dict[str, int] = {}
+        self._reserved: Dict[str, int] = {}
+
+    # ============ 持久化 ============
+
+    async def start(self) -> None:
+        """
+        加载已持久化的 Cookie 并启动后台写入任务 (应用启动时调用)
+
+        同时在后台并行预派生全部加密密钥，进度见 /ready。
+        """
+        if self._key_preload_task is None:
+            self._key_preload_task = asyncio.create_task(self._preload_keys())
+
+        await self._store.start()
+        records = await self._store.load_all()
+
+        async with self._lock:
+            for record in records:
+                cookie = Cookie.from_record(record)
+                if cookie.name not in self._cookies:
+                    self._cookies[cookie.name] = cookie
+            self._rebuild_index()
+
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_event = asyncio.Event()
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+        logger.info(f"Cookie 存储已加载: storage={self.storage_type}, count={len(records)}")
+
+    async def _preload_keys(self) -> None:
+        """预派生加密密钥，失败只记录日志 (状态见 cookie_encryption.get_key_status)"""
+        try:
+            status = await cookie_encryption.preload_keys()
+            logger.info(
+                f"加密密钥预派生完成: loaded={len(status['loaded'])}, "
+                f"failed={len(status['failed'])}, duration_ms={status['duration_ms']}"
+            )
+        except Exception as e:
+            logger.error(f"加密密钥预派生失败: {e}")
+
+    async def close(self) -> None:
+        """停止后台写入并写入剩余修改 (应用关闭时调用)"""
+        if self._key_preload_task is not None and not self._key_preload_task.done():
+            self._key_preload_task.cancel()
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+
+        await self.flush()
+        await self._store.close()
+
+        # 清除内存中的明文
+        decrypted_cookie_cache.clear()
+
+    def _mark_dirty(self, name: str) -> None:
+        """标记 Cookie 待写入 (调用方需持有 _lock)"""
+        self._dirty.add(name)
+        self._deleted.discard(name)
+        if len(self._dirty) >= self.FLUSH_MAX_PENDING and self._flush_event is not None:
+            self._flush_event.set()
+
+    async def _flush_loop(self) -> None:
+        """后台定期写入"""
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """
+        将待写入的修改批量写入存储
+
+        写入失败时修改重新标记为待写入，下次重试。
+
+        Returns:
+            写入的记录数
+        """
+        async with self._flush_lock:
+            async with self._lock:
+                records = [
+                    replace(self._cookies[name]).to_record()
+                    for name in self._dirty if name in self._cookies
+                ]
+                deleted = list(self._deleted)
+                self._dirty.clear()
+                self._deleted.clear()
+
+            if not records and not deleted:
+                return 0
+
+            try:
+                await self._store.save_many(records)
+                await self._store.delete_many(deleted)
+            except Exception as e:
+                self._flush_stats["errors"] += 1
+                logger.error(f"Cookie 存储写入失败，稍后重试: {e}")
+                async with self._lock:
+                    for record in records:
+                        if record["cookie_name"] not in self._deleted:
+                            self._dirty.add(record["cookie_name"])
+                    for name in deleted:
+                        if name not in self._cookies:
+                            self._deleted.add(name)
+                return 0
+
+            self._flush_stats["flushes"] += 1
+            self._flush_stats["records_written"] += len(records)
+            return len(records)
+
+    def get_store_stats(self) -> Dict[str, Any]:
+        """获取持久化统计"""
+        return {
+            "storage_type": self.storage_type,
+            "pending": len(self._dirty) + len(self._deleted),
+            **self._flush_stats,
+        }
+
+    # ============ 索引维护 ============
+
+    def _index(self, cookie: Cookie) -> None:
+        """
+        重新索引 Cookie
+
+        使该 Cookie 的旧堆条目失效，并按当前状态重新入堆。
+        """
+        version = next(self._version_counter)
+        self._versions[cookie.name] = version
+
+        if self._is_leasable(cookie):
+            heap = self._available.setdefault(cookie.platform, [])
+            load = cookie.daily_used + self._reserved.get(cookie.name, 0)
+            heapq.heappush(heap, (-cookie.priority, load, version, cookie.name))
+            # 失效条目过多时重建，避免堆无限增长
+            if len(heap) > 4 * len(self._cookies) + 64:
+                self._rebuild_platform_heap(cookie.platform)
+
+        elif cookie.status == CookieStatus.COOLING:
+            heapq.heappush(
+                self._cooling,
+                (cookie.cooling_until or datetime.min, version, cookie.name)
+            )
+
+    def _rebuild_platform_heap(self, platform: str) -> None:
+        """只保留有效条目重建平台可用堆"""
+        heap = [
+            entry for entry in self._available.get(platform, [])
+            if self._is_entry_valid(entry)
+        ]
+        heapq.heapify(heap)
+        self._available[platform] = heap
+
+    def _rebuild_index(self) -> None:
+        """重建全部索引 (批量修改 Cookie 字段后调用)"""
+        self._available.clear()
+        self._cooling.clear()
+        self._versions.clear()
+        for cookie in self._cookies.values():
+            self._index(cookie)
+
+    def _remaining(self, cookie: Cookie) -> int:
+        """扣除已预留额度后的剩余每日额度"""
+        return cookie.daily_limit - cookie.daily_used - self._reserved.get(cookie.name, 0)
+
+    def _is_leasable(self, cookie: Cookie) -> bool:
+        """检查 Cookie 是否可分配 (可用、有剩余额度且未达并发上限)"""
+        return (
+            cookie.is_available()
+            and self._remaining(cookie) > 0
+            and self._in_flight.get(cookie.name, 0) < self.MAX_IN_FLIGHT_PER_COOKIE
+        )
+
+    def _is_entry_valid(self, entry: Tuple[int, int, int, str]) -> bool:
+        """检查可用堆条目是否仍然有效"""
+        _, _, version, name = entry
+        cookie = self._cookies.get(name)
+        return (
+            cookie is not None
+            and self._versions.get(name) == version
+            and self._is_leasable(cookie)
+        )
+
+    def _top_candidates(self, platform: str, limit: int) -> List[Cookie]:
+        """取堆中前 limit 个可分配的 Cookie (不移除)"""
+        heap = self._available.get(platform, [])
+        top_entries = []
+        while heap and len(top_entries) < limit:
+            self._pop_stale(heap)
+            if heap:
+                top_entries.append(heapq.heappop(heap))
+        for entry in top_entries:
+            heapq.heappush(heap, entry)
+        return [self._cookies[entry[3]] for entry in top_entries]
+
+    def _pop_stale(self, heap: List[Tuple[int, int, int, str]]) -> None:
+        """弹出堆顶的失效条目"""
+        while heap and not self._is_entry_valid(heap[0]):
+            heapq.heappop(heap)
+
     async def add(
         self,
         name: str,
@@ -147,6 +473,8 @@ class CookieManager:
             )
 
             self._cookies[name] = cookie
+            self._index(cookie)
+            self._mark_dirty(name)
             logger.info(f"添加 Cookie: {name}, platform={platform}")
 
             return cookie
@@ -173,25 +501,47 @@ class CookieManager:
             if cookie_name:
                 # 指定了 Cookie 名称
                 cookie = self._cookies.get(cookie_name)
-                if cookie and cookie.is_available() and cookie.platform == platform:
+                if cookie and self._is_leasable(cookie) and cookie.platform == platform:
                     return cookie
                 return None
 
-            # 按优先级和使用次数排序，选择最优的
-            candidates = [
-                c for c in self._cookies.values()
-                if c.platform == platform and c.is_available()
-            ]
+            # 堆顶即最优：优先级高 > 使用次数少
+            candidates = self._top_candidates(platform, 1)
 
             if not candidates:
                 logger.warning(f"无可用 Cookie: platform={platform}")
                 return None
 
-            # 排序：优先级高 > 使用次数少
-            candidates.sort(key=lambda c: (-c.priority, c.daily_used))
-
             return candidates[0]
 
+    @staticmethod
+    def _allocate_quotas(
+        cookies: List[Cookie],
+        remaining: List[int],
+        item_count: int
+    ) -> List[int]:
+        """按 优先级 x 剩余额度 加权分配任务数 (最大余数法)"""
+        weights = [max(c.priority, 1) * r for c, r in zip(cookies, remaining)]
+        total_weight = sum(weights)
+        target = min(item_count, sum(remaining))
+
+        quotas = [0] * len(cookies)
+        if total_weight <= 0 or target <= 0:
+            return quotas
+
+        shares = [target * w / total_weight for w in weights]
+        quotas = [min(int(share), r) for share, r in zip(shares, remaining)]
+
+        # 剩余任务逐个分配给欠分配最多且仍有额度的 Cookie
+        while sum(quotas) < target:
+            index = max(
+                (i for i in range(len(cookies)) if quotas[i] < remaining[i]),
+                key=lambda i: shares[i] - quotas[i]
+            )
+            quotas[index] += 1
+
+        return quotas
+
     async def mark_used(
         self,
         name: str,
@@ -211,28 +561,173 @@ class CookieManager:
             if not cookie:
                 return
 
-            cookie.daily_used += success_count + error_count
-            cookie.total_used += success_count + error_count
-            cookie.last_used_at = datetime.utcnow()
-            cookie.updated_at = datetime.utcnow()
+            await self._apply_usage(cookie, success_count, error_count)
+            self._index(cookie)
+            self._mark_dirty(name)
+
+    async def _apply_usage(
+        self,
+        cookie: Cookie,
+        success_count: int,
+        error_count: int
+    ) -> None:
+        """累加使用统计并检查状态转换 (调用方需持有 _lock)"""
+        cookie.daily_used += success_count + error_count
+        cookie.total_used += success_count + error_count
+        cookie.last_used_at = datetime.utcnow()
+        cookie.updated_at = datetime.utcnow()
+
+        if error_count > 0:
+            cookie.consecutive_errors += error_count
+            cookie.total_errors += error_count
+            cookie.last_error_at = datetime.utcnow()
+
+            # 检查是否需要进入冷却
+            if cookie.consecutive_errors >= self.MAX_CONSECUTIVE_ERRORS:
+                await self._start_cooling(cookie)
 
-            if error_count > 0:
-                cookie.consecutive_errors += error_count
-                cookie.total_errors += error_count
-                cookie.last_error_at = datetime.utcnow()
+            # 检查是否需要标记失效
+            if cookie.total_errors >= self.MAX_TOTAL_ERRORS:
+                cookie.status = CookieStatus.INVALID
+                logger.warning(f"Cookie 已失效: {cookie.name}")
 
-                # 检查是否需要进入冷却
-                if cookie.consecutive_errors >= self.MAX_CONSECUTIVE_ERRORS:
-                    await self._start_cooling(cookie)
+        elif success_count > 0:
+            # 成功则重置连续错误计数
+            cookie.consecutive_errors = 0
 
-                # 检查是否需要标记失效
-                if cookie.total_errors >= self.MAX_TOTAL_ERRORS:
-                    cookie.status = CookieStatus.INVALID
-                    logger.warning(f"Cookie 已失效: {name}")
+    # ============ 租约 ============
+
+    def lease(
+        self,
+        platform: str = "xhs",
+        cookie_name: Optional[str] = None,
+        quota: int = 1
+    ) -> "CookieLease":
+        """
+        租用一个 Cookie
+
+        进入上下文时预留额度，无可用 Cookie 时抛出 CookieExhaustedError。
+
+        Args:
+            platform: 平台
+            cookie_name: 指定 Cookie 名称
+            quota: 需要预留的额度 (剩余额度不足时按剩余额度预留，见 lease.quota)
+
+        Returns:
+            Cookie 租约 (异步上下文管理器)
+        """
+        return CookieLease(self, platform=platform, cookie_name=cookie_name, quota=quota)
 
+    def lease_many(
+        self,
+        platform: str = "xhs",
+        item_count: int = 1,
+        max_cookies: Optional[int] = None
+    ) -> "CookieLeaseGroup":
+        """
+        为批量任务租用多个 Cookie
+
+        按优先级和剩余每日额度加权，将 item_count 个任务分摊到多个可用 Cookie，
+        每个 Cookie 分到的数量不超过其剩余额度，各持有一个租约。
+
+        Args:
+            platform: 平台
+            item_count: 任务数量
+            max_cookies: 最多使用的 Cookie 数
+
+        Returns:
+            租约组 (异步上下文管理器)
+        """
+        return CookieLeaseGroup(
+            self,
+            platform=platform,
+            item_count=item_count,
+            max_cookies=max_cookies or self.MAX_BATCH_COOKIES
+        )
+
+    def _hold(self, cookie: Cookie, quota: int) -> None:
+        """占用并发名额并预留额度 (调用方需持有 _lock)"""
+        self._in_flight[cookie.name] = self._in_flight.get(cookie.name, 0) + 1
+        self._reserved[cookie.name] = self._reserved.get(cookie.name, 0) + quota
+        self._index(cookie)
+
+    async def _reserve(
+        self,
+        platform: str,
+        cookie_name: Optional[str],
+        quota: int
+    ) -> Optional[Tuple[Cookie, int]]:
+        """选择 Cookie 并预留额度，返回 (Cookie, 实际预留额度)"""
+        async with self._lock:
+            await self._check_cooling_recovery()
+
+            if cookie_name:
+                cookie = self._cookies.get(cookie_name)
+                if not cookie or cookie.platform != platform or not self._is_leasable(cookie):
+                    return None
             else:
-                # 成功则重置连续错误计数
-                cookie.consecutive_errors = 0
+                candidates = self._top_candidates(platform, 1)
+                if not candidates:
+                    logger.warning(f"无可用 Cookie: platform={platform}")
+                    return None
+                cookie = candidates[0]
+
+            reserved = min(quota, self._remaining(cookie))
+            self._hold(cookie, reserved)
+            return cookie, reserved
+
+    async def _reserve_many(
+        self,
+        platform: str,
+        item_count: int,
+        max_cookies: int
+    ) -> List[Tuple[Cookie, int]]:
+        """批量分配并预留额度，返回 [(Cookie, 预留额度)]"""
+        async with self._lock:
+            await self._check_cooling_recovery()
+
+            candidates = self._top_candidates(platform, max_cookies)
+            if not candidates:
+                logger.warning(f"无可用 Cookie: platform={platform}")
+                return []
+
+            quotas = self._allocate_quotas(
+                candidates, [self._remaining(c) for c in candidates], item_count
+            )
+            allocations = [(c, q) for c, q in zip(candidates, quotas) if q > 0]
+            for cookie, quota in allocations:
+                self._hold(cookie, quota)
+            return allocations
+
+    async def _release(
+        self,
+        name: str,
+        reserved: int,
+        success_count: int,
+        error_count: int
+    ) -> None:
+        """释放租约: 归还并发名额和未使用的预留额度，并结算使用统计"""
+        async with self._lock:
+            in_flight = self._in_flight.get(name, 0) - 1
+            if in_flight > 0:
+                self._in_flight[name] = in_flight
+            else:
+                self._in_flight.pop(name, None)
+
+            left = self._reserved.get(name, 0) - reserved
+            if left > 0:
+                self._reserved[name] = left
+            else:
+                self._reserved.pop(name, None)
+
+            cookie = self._cookies.get(name)
+            if not cookie:
+                return
+
+            if success_count or error_count:
+                await self._apply_usage(cookie, success_count, error_count)
+                self._mark_dirty(name)
+            self._index(cookie)
 
     async def _start_cooling(self, cookie: Cookie) -> None:
         """开始冷却"""
@@ -243,14 +738,124 @@ class CookieManager:
         logger.info(f"Cookie 进入冷却: {cookie.name}, until={cookie.cooling_until}")
 
     async def _check_cooling_recovery(self) -> None:
-        """检查并恢复冷却结束的 Cookie"""
-        for cookie in self._cookies.values():
+        """检查并恢复冷却结束的 Cookie (只处理冷却堆顶已到期的条目)"""
+        now = datetime.utcnow()
+        while self._cooling and self._cooling[0][0] < now:
+            _, version, name = heapq.heappop(self._cooling)
+            cookie = self._cookies.get(name)
+            if cookie is None or self._versions.get(name) != version:
+                continue
+
             if cookie.is_cooling_expired():
                 cookie.status = CookieStatus.ACTIVE
                 cookie.cooling_until = None
                 cookie.consecutive_errors = 0
+                self._index(cookie)
+                self._mark_dirty(name)
                 logger.info(f"Cookie 冷却结束: {cookie.name}")
 
+    async def update(
+        self,
+        name: str,
+        cookie_value: Optional[str] = None,
+        priority: Optional[int] = None,
+        daily_limit: Optional[int] = None
+    ) -> Optional[Cookie]:
+        """
+        更新 Cookie 值或配置
+
+        Args:
+            name: Cookie 名称
+            cookie_value: 新的 Cookie 值 (明文，将被加密)
+            priority: 优先级
+            daily_limit: 每日限额
+
+        Returns:
+            更新后的 Cookie，不存在时返回 None
+        """
+        encrypted = cookie_encryption.encrypt(cookie_value) if cookie_value else None
+
+        async with self._lock:
+            cookie = self._cookies.get(name)
+            if not cookie:
+                return None
+
+            if encrypted:
+                cookie.encrypted_value, cookie.encryption_key_id = encrypted
+                decrypted_cookie_cache.invalidate(name)
+            if priority is not None:
+                cookie.priority = priority
+            if daily_limit is not None:
+                cookie.daily_limit = daily_limit
+            cookie.updated_at = datetime.utcnow()
+
+            self._index(cookie)
+            self._mark_dirty(name)
+
+        logger.info(f"更新 Cookie: {name}")
+        return cookie
+
+    async def list_for_rotation(
+        self,
+        target_key_id: str,
+        after: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Tuple[str, str, str]]:
+        """
+        按名称顺序列出待轮换 (密钥 ID 不是 target_key_id) 的 Cookie
+
+        只在持有锁期间复制密文，不做解密。
+
+        Args:
+            target_key_id: 目标密钥 ID
+            after: 只返回名称大于此值的 Cookie (断点续传)
+            limit: 最多返回数量
+
+        Returns:
+            [(名称, 密文, 密钥 ID)]
+        """
+        async with self._lock:
+            names = sorted(
+                name for name, cookie in self._cookies.items()
+                if cookie.encryption_key_id != target_key_id
+                and cookie.encrypted_value
+                and (after is None or name > after)
+            )
+            return [
+                (name, self._cookies[name].encrypted_value, self._cookies[name].encryption_key_id)
+                for name in names[:limit]
+            ]
+
+    async def replace_encrypted(
+        self,
+        updates: List[Tuple[str, str, str, str]]
+    ) -> int:
+        """
+        批量替换密文 (密钥轮换结果写回)
+
+        只有当前密文仍等于轮换时读取的旧密文才会替换，
+        避免覆盖轮换期间被更新的 Cookie。
+
+        Args:
+            updates: [(名称, 旧密文, 新密文, 新密钥 ID)]
+
+        Returns:
+            实际替换的数量
+        """
+        replaced = 0
+        async with self._lock:
+            for name, old_encrypted, new_encrypted, new_key_id in updates:
+                cookie = self._cookies.get(name)
+                if not cookie or cookie.encrypted_value != old_encrypted:
+                    continue
+                cookie.encrypted_value = new_encrypted
+                cookie.encryption_key_id = new_key_id
+                cookie.updated_at = datetime.utcnow()
+                decrypted_cookie_cache.invalidate(name)
+                self._mark_dirty(name)
+                replaced += 1
+        return replaced
+
     async def update_status(
         self,
         name: str,
@@ -279,6 +884,9 @@ class CookieManager:
                     minutes=self.COOLING_DURATION_MINUTES
                 )
 
+            self._index(cookie)
+            self._mark_dirty(name)
+
             logger.info(
                 f"Cookie 状态更新: {name}, {old_status} -> {status}, reason={reason}"
             )
@@ -314,6 +922,12 @@ class CookieManager:
         async with self._lock:
             if name in self._cookies:
                 del self._cookies[name]
+                self._versions.pop(name, None)
+                self._in_flight.pop(name, None)
+                self._reserved.pop(name, None)
+                self._dirty.discard(name)
+                self._deleted.add(name)
+                decrypted_cookie_cache.invalidate(name)
                 logger.info(f"删除 Cookie: {name}")
                 return True
             return False
@@ -345,6 +959,8 @@ class CookieManager:
             "cooling_count": cooling_count,
             "invalid_count": invalid_count,
             "banned_count": banned_count,
+            "in_flight": sum(self._in_flight.get(c.name, 0) for c in cookies),
+            "reserved": sum(self._reserved.get(c.name, 0) for c in cookies),
             "daily_usage_rate": (
                 total_daily_used / total_daily_limit if total_daily_limit > 0 else 0
             )
@@ -355,6 +971,131 @@ class CookieManager:
         async with self._lock:
             for cookie in self._cookies.values():
                 cookie.daily_used = 0
+                self._mark_dirty(cookie.name)
+            self._rebuild_index()
+
+
+class CookieLease:
+    """
+    Cookie 租约
+
+    持有期间占用 Cookie 的一个并发名额和 quota 份每日额度。
+    退出时自动释放；未显式记录结果时，正常退出记 1 次成功，
+    异常退出记 1 次失败，任务被取消则不计入使用统计。
+
+    流式响应等无法使用 async with 的场景可手动调用 start()/release()，
+    release() 可重复调用。
+    """
+
+    def __init__(
+        self,
+        manager: CookieManager,
+        platform: str = "xhs",
+        cookie_name: Optional[str] = None,
+        quota: int = 1
+    ):
+        self._manager = manager
+        self.platform = platform
+        self.cookie_name = cookie_name
+        self.requested_quota = quota
+        self.cookie: Optional[Cookie] = None
+        self.quota = 0
+        self.success_count = 0
+        self.error_count = 0
+        self._released = True
+
+    @property
+    def name(self) -> Optional[str]:
+        """租用的 Cookie 名称"""
+        return self.cookie.name if self.cookie else None
+
+    def _hold(self, cookie: Cookie, quota: int) -> None:
+        """标记已持有 (由管理器完成预留后调用)"""
+        self.cookie = cookie
+        self.quota = quota
+        self._released = False
+
+    async def start(self) -> "CookieLease":
+        """
+        获取 Cookie 并预留额度
+
+        Raises:
+            CookieExhaustedError: 无可用 Cookie
+        """
+        reserved = await self._manager._reserve(
+            self.platform, self.cookie_name, self.requested_quota
+        )
+        if reserved is None:
+            raise CookieExhaustedError("无可用 Cookie，请添加新账号")
+        self._hold(*reserved)
+        return self
+
+    def record_success(self, count: int = 1) -> None:
+        """记录成功次数"""
+        self.success_count += count
+
+    def record_error(self, count: int = 1) -> None:
+        """记录失败次数"""
+        self.error_count += count
+
+    async def release(self) -> None:
+        """释放租约并结算使用统计"""
+        if self._released or self.cookie is None:
+            return
+        self._released = True
+        await self._manager._release(
+            self.cookie.name, self.quota, self.success_count, self.error_count
+        )
+
+    async def __aenter__(self) -> "CookieLease":
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if not self.success_count and not self.error_count:
+            if exc_type is None:
+                self.record_success()
+            elif not issubclass(exc_type, asyncio.CancelledError):
+                self.record_error()
+        # 释放不应被外层取消打断，否则并发名额和预留额度会泄漏
+        await asyncio.shield(self.release())
+
+
+class CookieLeaseGroup:
+    """
+    批量租约组
+
+    按 lease_many 的规则一次性为多个 Cookie 预留额度，leases 中每个租约
+    对应一个 Cookie。调用方需对每个租约 record_success/record_error，
+    退出时统一释放 (未记录的租约不计入使用统计)。
+    无可用 Cookie 时 leases 为空列表，不抛出异常。
+    """
+
+    def __init__(
+        self,
+        manager: CookieManager,
+        platform: str = "xhs",
+        item_count: int = 1,
+        max_cookies: int = CookieManager.MAX_BATCH_COOKIES
+    ):
+        self._manager = manager
+        self.platform = platform
+        self.item_count = item_count
+        self.max_cookies = max_cookies
+        self.leases: List[CookieLease] = []
+
+    async def __aenter__(self) -> "CookieLeaseGroup":
+        allocations = await self._manager._reserve_many(
+            self.platform, self.item_count, self.max_cookies
+        )
+        for cookie, quota in allocations:
+            lease = CookieLease(self._manager, platform=self.platform, quota=quota)
+            lease._hold(cookie, quota)
+            self.leases.append(lease)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        for lease in self.leases:
+            await asyncio.shield(lease.release())
 
 
 # ============ 依赖注入 ============
@@ -363,13 +1104,28 @@ _cookie_manager: Optional[CookieManager] = None
 
 
 def get_cookie_manager() -> CookieManager:
-    """获取 Cookie 管理器实例 (单例)"""
+    """获取 Cookie 管理器实例 (单例，存储类型由 COOKIE_STORAGE_TYPE 指定)"""
     global _cookie_manager
     if _cookie_manager is None:
-        _cookie_manager = CookieManager()
+        _cookie_manager = CookieManager(
+            storage_type=os.environ.get("COOKIE_STORAGE_TYPE", "memory")
+        )
     return _cookie_manager
 
 
+async def init_cookie_manager() -> CookieManager:
+    """加载持久化的 Cookie 并启动后台写入 (应用启动时调用)"""
+    manager = get_cookie_manager()
+    await manager.start()
+    return manager
+
+
+async def close_cookie_manager() -> None:
+    """写入剩余修改并关闭存储 (应用关闭时调用)"""
+    if _cookie_manager is not None:
+        await _cookie_manager.close()
+
+
 def reset_cookie_manager() -> None:
     """重置 Cookie 管理器 (用于测试)"""
     global _cookie_manager
@@ -0,0 +1,448 @@
+"""
+Cookie 持久化存储
+
+为 CookieManager 提供可插拔的存储后端，保证重启后使用计数和冷却状态不丢失:
+- CookieStore: 存储后端接口
+- MemoryCookieStore: 不持久化 (默认)
+- SQLiteCookieStore: 本地 SQLite 文件
+- FeishuCookieStore: 飞书多维表格 tbl_cookie (base_url 可指向本地替身用于测试)
+
+后端只处理记录字典 (字段名与 tbl_cookie 表结构一致，时间为 ISO 字符串)，
+与 Cookie 对象之间的转换见 Cookie.to_record / Cookie.from_record。
+CookieManager 以 write-behind 方式批量写入，获取 Cookie 不会等待存储 I/O。
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List
+import asyncio
+import os
+import random
+import sqlite3
+import time
+
+import aiohttp
+
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+# tbl_cookie 字段 (见 docs/AI_READY_SPEC_v3.1.md)
+COOKIE_FIELDS = [
+    "cookie_name",
+    "platform",
+    "cookie_encrypted",
+    "encryption_key_id",
+    "status",
+    "priority",
+    "daily_used",
+    "daily_limit",
+    "total_used",
+    "consecutive_errors",
+    "total_errors",
+    "last_used_at",
+    "last_error_at",
+    "cooling_until",
+    "created_at",
+    "updated_at",
+]
+
+DATETIME_FIELDS = {"last_used_at", "last_error_at", "cooling_until", "created_at", "updated_at"}
+
+
+def _to_timestamp_ms(value: str) -> int:
+    """ISO 时间 (UTC，无时区) -> 毫秒时间戳"""
+    return int(datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _from_timestamp_ms(value: Any) -> str:
+    """毫秒时间戳 -> ISO 时间 (UTC，无时区)"""
+    return datetime.fromtimestamp(int(value) / 1000, tz=timezone.utc).replace(tzinfo=None).isoformat()
+
+
+class CookieStoreError(Exception):
+    """Cookie 存储错误"""
+    pass
+
+
+class CookieStore(ABC):
+    """
+    Cookie 存储后端接口
+
+    记录以 cookie_name 为唯一键，save_many 为批量 upsert。
+    """
+
+    async def start(self) -> None:
+        """建立连接 / 初始化表结构"""
+        pass
+
+    @abstractmethod
+    async def load_all(self) -> List[Dict[str, Any]]:
+        """加载全部记录"""
+
+    @abstractmethod
+    async def save_many(self, records: List[Dict[str, Any]]) -> None:
+        """批量 upsert"""
+
+    @abstractmethod
+    async def delete_many(self, names: List[str]) -> None:
+        """按 cookie_name 批量删除"""
+
+    async def close(self) -> None:
+        """释放连接"""
+        pass
+
+
+class MemoryCookieStore(CookieStore):
+    """内存存储 (不持久化，重启后数据丢失)"""
+
+    async def load_all(self) -> List[Dict[str, Any]]:
+        return []
+
+    async def save_many(self, records: List[Dict[str, Any]]) -> None:
+        pass
+
+    async def delete_many(self, names: List[str]) -> None:
+        pass
+
+
+class SQLiteCookieStore(CookieStore):
+    """
+    SQLite 存储
+
+    sqlite3 为同步接口，所有操作在线程池中执行，并用锁串行化对同一连接的访问。
+    """
+
+    def __init__(self, path: str = "data/cookies.db"):
+        """
+        初始化 SQLite 存储
+
+        Args:
+            path: 数据库文件路径 (":memory:" 仅用于测试)
+        """
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = asyncio.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory and self.path != ":memory:":
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        columns = ", ".join(
+            f"{name} TEXT PRIMARY KEY" if name == "cookie_name" else f"{name}"
+            for name in COOKIE_FIELDS
+        )
+        conn.execute(f"CREATE TABLE IF NOT EXISTS tbl_cookie ({columns})")
+        conn.commit()
+        return conn
+
+    async def _run(self, fn, *args):
+        async with self._lock:
+            if self._conn is None:
+                self._conn = await asyncio.to_thread(self._connect)
+            return await asyncio.to_thread(fn, self._conn, *args)
+
+    async def start(self) -> None:
+        await self._run(lambda conn: None)
+
+    async def load_all(self) -> List[Dict[str, Any]]:
+        def _load(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+            cursor = conn.execute(f"SELECT {', '.join(COOKIE_FIELDS)} FROM tbl_cookie")
+            return [dict(zip(COOKIE_FIELDS, row)) for row in cursor.fetchall()]
+
+        return await self._run(_load)
+
+    async def save_many(self, records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+
+        placeholders = ", ".join("?" for _ in COOKIE_FIELDS)
+        updates = ", ".join(
+            f"{name}=excluded.{name}" for name in COOKIE_FIELDS if name != "cookie_name"
+        )
+        sql = (
+            f"INSERT INTO tbl_cookie ({', '.join(COOKIE_FIELDS)}) VALUES ({placeholders}) "
+            f"ON CONFLICT(cookie_name) DO UPDATE SET {updates}"
+        )
+        rows = [[record.get(name) for name in COOKIE_FIELDS] for record in records]
+
+        def _save(conn: sqlite3.Connection) -> None:
+            with conn:
+                conn.executemany(sql, rows)
+
+        await self._run(_save)
+
+    async def delete_many(self, names: List[str]) -> None:
+        if not names:
+            return
+
+        def _delete(conn: sqlite3.Connection) -> None:
+            with conn:
+                conn.executemany(
+                    "DELETE FROM tbl_cookie WHERE cookie_name = ?",
+                    [(name,) for name in names]
+                )
+
+        await self._run(_delete)
+
+    async def close(self) -> None:
+        async with self._lock:
+            if self._conn is not None:
+                conn, self._conn = self._conn, None
+                await asyncio.to_thread(conn.close)
+
+
+class FeishuCookieStore(CookieStore):
+    """
+    飞书多维表格存储
+
+    使用 bitable 批量接口 (每批最多 500 条)。记录 ID 在加载和创建时缓存，
+    用于区分新增与更新。时间字段在飞书中以毫秒时间戳存储。
+    限流 (HTTP 429 / 99991400 等) 和网络错误按带抖动的指数退避重试。
+    """
+
+    BATCH_SIZE = 500
+    PAGE_SIZE = 500
+
+    # 可重试的飞书错误码: 频率限制 / 多维表格限流 / 写冲突
+    RETRYABLE_CODES = {99991400, 1254290, 1254291}
+    RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+    MAX_RETRIES = 4
+    RETRY_BASE_DELAY = 0.5      # 首次重试基准等待 (秒)
+    RETRY_MAX_DELAY = 10.0      # 单次重试最长等待 (秒)
+
+    def __init__(
+        self,
+        app_id: str,
+        app_secret: str,
+        app_token: str,
+        table_id: str,
+        base_url: str = "https://open.feishu.cn/open-apis",
+        timeout: float = 15.0
+    ):
+        """
+        初始化飞书存储
+
+        Args:
+            app_id: 飞书应用 ID
+            app_secret: 飞书应用密钥
+            app_token: 多维表格 app_token
+            table_id: tbl_cookie 表 ID
+            base_url: 开放平台地址 (测试时可指向本地替身)
+            timeout: 请求超时 (秒)
+        """
+        self.app_id = app_id
+        self.app_secret = app_secret
+        self.app_token = app_token
+        self.table_id = table_id
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._token: Optional[str] = None
+        self._token_expires_at = 0.0
+        self._record_ids: Dict[str, str] = {}
+
+    @property
+    def _records_url(self) -> str:
+        return f"{self.base_url}/bitable/v1/apps/{self.app_token}/tables/{self.table_id}/records"
+
+    async def start(self) -> None:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+
+    async def _get_token(self) -> str:
+        """获取 tenant_access_token (提前 60 秒刷新)"""
+        if self._token and time.time() < self._token_expires_at - 60:
+            return self._token
+
+        data = await self._request(
+            "POST",
+            f"{self.base_url}/auth/v3/tenant_access_token/internal",
+            json={"app_id": self.app_id, "app_secret": self.app_secret},
+            auth=False
+        )
+        self._token = data["tenant_access_token"]
+        self._token_expires_at = time.time() + data.get("expire", 7200)
+        return self._token
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        auth: bool = True,
+        **kwargs: Any
+    ) -> Dict[str, Any]:
+        await self.start()
+        attempt = 0
+
+        while True:
+            status = None
+            retry_after = None
+            try:
+                headers = {"Authorization": f"Bearer {await self._get_token()}"} if auth else {}
+                async with self._session.request(method, url, headers=headers, **kwargs) as resp:
+                    status = resp.status
+                    retry_after = resp.headers.get("Retry-After") or resp.headers.get("x-ogw-ratelimit-reset")
+                    try:
+                        data = await resp.json(content_type=None)
+                    except ValueError:
+                        data = {}
+                error = None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                data, error = {}, e
+
+            code = data.get("code")
+            if error is None and status == 200 and code == 0:
+                return data
+
+            retryable = (
+                error is not None
+                or status in self.RETRYABLE_STATUS
+                or code in self.RETRYABLE_CODES
+            )
+            if not retryable or attempt >= self.MAX_RETRIES:
+                if error is not None:
+                    raise CookieStoreError(f"飞书接口请求失败: {error}") from error
+                raise CookieStoreError(
+                    f"飞书接口错误: HTTP {status}, code={code}, msg={data.get('msg')}"
+                )
+
+            delay = self._retry_delay(attempt, retry_after)
+            attempt += 1
+            logger.warning(
+                f"飞书接口限流或暂时失败，{delay:.2f}s 后重试 ({attempt}/{self.MAX_RETRIES}): "
+                f"HTTP {status}, code={code}{f', {error}' if error else ''}"
+            )
+            await asyncio.sleep(delay)
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """重试等待: 优先使用服务端给出的等待时间，否则指数退避 + 抖动"""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.RETRY_MAX_DELAY)
+            except ValueError:
+                pass
+        ceiling = min(self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * (2 ** attempt))
+        return random.uniform(ceiling / 2, ceiling)
+
+    @staticmethod
+    def _to_fields(record: Dict[str, Any]) -> Dict[str, Any]:
+        fields = {}
+        for name in COOKIE_FIELDS:
+            value = record.get(name)
+            if name in DATETIME_FIELDS:
+                value = _to_timestamp_ms(value) if value else None
+            fields[name] = value
+        return fields
+
+    @staticmethod
+    def _from_fields(fields: Dict[str, Any]) -> Dict[str, Any]:
+        record = {}
+        for name in COOKIE_FIELDS:
+            value = fields.get(name)
+            if name in DATETIME_FIELDS and value is not None:
+                value = _from_timestamp_ms(value)
+            record[name] = value
+        return record
+
+    async def load_all(self) -> List[Dict[str, Any]]:
+        records = []
+        page_token = None
+
+        while True:
+            params = {"page_size": self.PAGE_SIZE}
+            if page_token:
+                params["page_token"] = page_token
+
+            data = (await self._request("GET", self._records_url, params=params)).get("data", {})
+            for item in data.get("items") or []:
+                record = self._from_fields(item.get("fields", {}))
+                if not record.get("cookie_name"):
+                    continue
+                self._record_ids[record["cookie_name"]] = item["record_id"]
+                records.append(record)
+
+            page_token = data.get("page_token")
+            if not data.get("has_more") or not page_token:
+                break
+
+        return records
+
+    async def save_many(self, records: List[Dict[str, Any]]) -> None:
+        creates = [r for r in records if r["cookie_name"] not in self._record_ids]
+        updates = [r for r in records if r["cookie_name"] in self._record_ids]
+
+        for i in range(0, len(updates), self.BATCH_SIZE):
+            chunk = updates[i:i + self.BATCH_SIZE]
+            await self._request("POST", f"{self._records_url}/batch_update", json={
+                "records": [
+                    {"record_id": self._record_ids[r["cookie_name"]], "fields": self._to_fields(r)}
+                    for r in chunk
+                ]
+            })
+
+        for i in range(0, len(creates), self.BATCH_SIZE):
+            chunk = creates[i:i + self.BATCH_SIZE]
+            data = await self._request("POST", f"{self._records_url}/batch_create", json={
+                "records": [{"fields": self._to_fields(r)} for r in chunk]
+            })
+            # 返回记录顺序与请求一致
+            for record, item in zip(chunk, data.get("data", {}).get("records") or []):
+                self._record_ids[record["cookie_name"]] = item["record_id"]
+
+    async def delete_many(self, names: List[str]) -> None:
+        names = [n for n in names if n in self._record_ids]
+
+        for i in range(0, len(names), self.BATCH_SIZE):
+            chunk = names[i:i + self.BATCH_SIZE]
+            await self._request("POST", f"{self._records_url}/batch_delete", json={
+                "records": [self._record_ids[n] for n in chunk]
+            })
+            # 删除成功后才移除记录 ID，失败时 CookieManager 重新排队的删除仍能找到记录
+            for name in chunk:
+                self._record_ids.pop(name, None)
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+def create_cookie_store(storage_type: str = "memory") -> CookieStore:
+    """
+    根据存储类型和环境变量创建存储后端
+
+    环境变量:
+    - COOKIE_STORE_SQLITE_PATH: SQLite 文件路径 (默认 data/cookies.db)
+    - FEISHU_APP_ID / FEISHU_APP_SECRET / FEISHU_APP_TOKEN / FEISHU_COOKIE_TABLE_ID
+    - FEISHU_BASE_URL: 飞书开放平台地址 (默认 https://open.feishu.cn/open-apis)
+    """
+    storage_type = (storage_type or "memory").lower()
+
+    if storage_type == "sqlite":
+        return SQLiteCookieStore(os.environ.get("COOKIE_STORE_SQLITE_PATH", "data/cookies.db"))
+
+    if storage_type == "feishu":
+        app_id = os.environ.get("FEISHU_APP_ID", "")
+        app_secret = os.environ.get("FEISHU_APP_SECRET", "")
+        if not app_id or not app_secret:
+            raise CookieStoreError("使用飞书存储需要设置 FEISHU_APP_ID 和 FEISHU_APP_SECRET")
+        return FeishuCookieStore(
+            app_id=app_id,
+            app_secret=app_secret,
+            app_token=os.environ.get("FEISHU_APP_TOKEN", ""),
+            table_id=os.environ.get("FEISHU_COOKIE_TABLE_ID", ""),
+            base_url=os.environ.get("FEISHU_BASE_URL", "https://open.feishu.cn/open-apis")
+        )
+
+    if storage_type != "memory":
+        raise CookieStoreError(f"不支持的存储类型: {storage_type}")
+
+    return MemoryCookieStore()
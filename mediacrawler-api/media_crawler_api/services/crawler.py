@@ -9,13 +9,18 @@
 此服务封装了底层爬虫实现，提供统一的接口。
 """
 
-from typing import Optional, Dict, Any, List
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
 import asyncio
+import os
+import time
 import aiohttp
 from datetime import datetime
 
 from .cookie import Cookie
+from .cache import NoteDetailCache, SearchResultCache
 from ..utils.logging import get_logger
+from ..utils.metrics import observe_backend_call
 
 logger = get_logger(__name__)
 
@@ -54,19 +59,229 @@ class CrawlerService:
         "comments": 15,
     }
 
-    def __init__(self, base_url: Optional[str] = None):
+    # 评论分页配置
+    COMMENTS_PAGE_SIZE = 20             # 每页评论数
+    SUB_COMMENTS_LIMIT = 20             # 每条评论最多展开的子评论数
+    SUB_COMMENTS_CONCURRENCY = 3        # 子评论展开并发数
+
+    # 后端 HTTP 状态码对应的错误码 (指标标签用，未列出的非 200 状态记为 PLATFORM_ERROR)
+    BACKEND_HTTP_ERROR_CODES = {
+        404: "NOT_FOUND",
+        429: "RATE_LIMITED",
+    }
+
+    # 默认连接池配置
+    DEFAULT_POOL = {
+        "limit": 100,               # 连接池总连接数上限
+        "limit_per_host": 30,       # 单主机连接数上限
+        "keepalive_timeout": 30,    # 空闲连接保活时间 (秒)
+        "dns_cache_ttl": 300,       # DNS 缓存时间 (秒)
+    }
+
+    # 连接池配置对应的环境变量
+    POOL_ENV_VARS = {
+        "limit": "MEDIACRAWLER_POOL_LIMIT",
+        "limit_per_host": "MEDIACRAWLER_POOL_LIMIT_PER_HOST",
+        "keepalive_timeout": "MEDIACRAWLER_KEEPALIVE_TIMEOUT",
+        "dns_cache_ttl": "MEDIACRAWLER_DNS_CACHE_TTL",
+    }
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        pool_config: Optional[Dict[str, int]] = None,
+        note_cache: Optional[NoteDetailCache] = None,
+        search_cache: Optional[SearchResultCache] = None
+    ):
         """
         初始化爬虫服务
 
         Args:
             base_url: MediaCrawler API 基础 URL
+            pool_config: 连接池配置，覆盖默认值和环境变量
+            note_cache: 笔记详情缓存，默认按环境变量创建
+            search_cache: 搜索结果缓存，默认按环境变量创建
         """
-        import os
         self.base_url = base_url or os.environ.get(
             "MEDIACRAWLER_BASE_URL",
             "http://localhost:8080"
         )
 
+        self.pool_config = dict(self.DEFAULT_POOL)
+        for key, env_var in self.POOL_ENV_VARS.items():
+            if os.environ.get(env_var):
+                self.pool_config[key] = int(os.environ[env_var])
+        self.pool_config.update(pool_config or {})
+
+        self.note_cache = note_cache or NoteDetailCache.from_env()
+        self.search_cache = search_cache or SearchResultCache.from_env()
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._pool_counters = {
+            "waits": 0,                 # 因连接池满而排队的次数
+            "waiting": 0,               # 当前排队中的请求数
+            "in_flight": 0,             # 进行中的请求数 (含排队中的请求)
+            "connections_created": 0,   # 新建连接数
+            "connections_reused": 0,    # 复用连接数
+        }
+
+    # ============ 连接池生命周期 ============
+
+    async def start(self) -> None:
+        """创建共享连接池 (应用启动时调用)"""
+        self._get_session()
+        logger.info(
+            f"连接池已创建: limit={self.pool_config['limit']}, "
+            f"limit_per_host={self.pool_config['limit_per_host']}"
+        )
+
+    async def close(self) -> None:
+        """关闭共享连接池 (应用关闭时调用)"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+            logger.info("连接池已关闭")
+        self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        获取共享 Session
+
+        未调用 start() 时按需创建，保证所有请求复用同一个连接池。
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_config["limit"],
+                limit_per_host=self.pool_config["limit_per_host"],
+                keepalive_timeout=self.pool_config["keepalive_timeout"],
+                ttl_dns_cache=self.pool_config["dns_cache_ttl"],
+                use_dns_cache=True,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                trace_configs=[self._create_trace_config()]
+            )
+        return self._session
+
+    def _create_trace_config(self) -> aiohttp.TraceConfig:
+        """
+        创建连接池统计用的 TraceConfig
+
+        请求被取消时 aiohttp 不发送 connection_queued_end，
+        因此排队状态记录在每个请求的 trace 上下文中，请求结束或异常时统一归还。
+        """
+        counters = self._pool_counters
+
+        async def on_request_start(session, ctx, params):
+            ctx.queued = False
+            counters["in_flight"] += 1
+
+        async def on_request_done(session, ctx, params):
+            if ctx.queued:
+                ctx.queued = False
+                counters["waiting"] -= 1
+            counters["in_flight"] -= 1
+
+        async def on_queued_start(session, ctx, params):
+            ctx.queued = True
+            counters["waits"] += 1
+            counters["waiting"] += 1
+
+        async def on_queued_end(session, ctx, params):
+            if ctx.queued:
+                ctx.queued = False
+                counters["waiting"] -= 1
+
+        async def on_create_end(session, ctx, params):
+            counters["connections_created"] += 1
+
+        async def on_reuse(session, ctx, params):
+            counters["connections_reused"] += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_done)
+        trace_config.on_request_exception.append(on_request_done)
+        trace_config.on_connection_queued_start.append(on_queued_start)
+        trace_config.on_connection_queued_end.append(on_queued_end)
+        trace_config.on_connection_create_end.append(on_create_end)
+        trace_config.on_connection_reuseconn.append(on_reuse)
+        return trace_config
+
+    # ============ 后端调用指标 ============
+
+    @asynccontextmanager
+    async def _track_backend(self, operation: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        记录一次后端调用的状态和延迟
+
+        yield 的字典用于回填 HTTP 状态码 (call["status"] = resp.status)，
+        被取消的调用不计入指标。
+
+        Args:
+            operation: 调用类型
+        """
+        call: Dict[str, Any] = {"status": None}
+        start = time.perf_counter()
+        try:
+            yield call
+        except asyncio.CancelledError:
+            raise
+        except BaseException as e:
+            status, error_code = self._classify_backend_call(call["status"], e)
+            observe_backend_call(operation, status, error_code, time.perf_counter() - start)
+            raise
+        else:
+            status, error_code = self._classify_backend_call(call["status"], None)
+            observe_backend_call(operation, status, error_code, time.perf_counter() - start)
+
+    def _classify_backend_call(
+        self,
+        http_status: Optional[int],
+        error: Optional[BaseException]
+    ) -> Tuple[str, str]:
+        """
+        归类后端调用结果
+
+        Returns:
+            (状态标签, 错误码)，成功时错误码为空字符串
+        """
+        if isinstance(error, asyncio.TimeoutError):
+            return "timeout", "TIMEOUT_ERROR"
+        if http_status is None:
+            if isinstance(error, aiohttp.ClientError):
+                return "network_error", "NETWORK_ERROR"
+            return "error", "PLATFORM_ERROR"
+        if http_status == 200:
+            # 响应正常但解析失败
+            return "200", "" if error is None else "PARSE_ERROR"
+        return str(http_status), self.BACKEND_HTTP_ERROR_CODES.get(http_status, "PLATFORM_ERROR")
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """
+        获取连接池统计
+
+        连接数由请求 trace 事件统计 (aiohttp 未公开连接池内部计数)。
+
+        Returns:
+            in_use: 占用连接的请求数 (进行中且不在排队的请求，收到响应头前每个占用一个连接)
+            available: 连接池剩余可用连接数 (limit - in_use)
+            waiting: 当前排队中的请求数
+            waits: 累计排队次数
+        """
+        connector = self._session.connector if self._session else None
+        active = connector is not None and not connector.closed
+        limit = connector.limit if active else self.pool_config["limit"]
+        in_use = max(self._pool_counters["in_flight"] - self._pool_counters["waiting"], 0)
+
+        return {
+            "active": active,
+            "limit": limit,
+            "limit_per_host": connector.limit_per_host if active else self.pool_config["limit_per_host"],
+            "in_use": in_use,
+            "available": max(limit - in_use, 0) if limit else None,
+            **self._pool_counters,
+        }
+
     async def search(
         self,
         platform: str,
@@ -99,31 +314,32 @@ class CrawlerService:
         logger.info(f"搜索笔记: keyword={keyword}, page={page}")
 
         try:
-            cookie_value = cookie.get_decrypted_value()
-
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}/api/xhs/search",
-                    json={
-                        "keyword": keyword,
-                        "page": page,
-                        "page_size": page_size,
-                        "sort_type": sort_type,
-                        "note_type": note_type
-                    },
-                    headers={
-                        "Cookie": cookie_value,
-                        "Content-Type": "application/json"
-                    },
-                    timeout=aiohttp.ClientTimeout(total=timeout)
-                ) as resp:
-                    if resp.status != 200:
-                        raise PlatformError(f"搜索失败: HTTP {resp.status}")
+            cookie_value = await cookie.get_decrypted_value_async()
+            session = self._get_session()
+
+            async with self._track_backend("search") as call, session.post(
+                f"{self.base_url}/api/xhs/search",
+                json={
+                    "keyword": keyword,
+                    "page": page,
+                    "page_size": page_size,
+                    "sort_type": sort_type,
+                    "note_type": note_type
+                },
+                headers={
+                    "Cookie": cookie_value,
+                    "Content-Type": "application/json"
+                },
+                timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as resp:
+                call["status"] = resp.status
+                if resp.status != 200:
+                    raise PlatformError(f"搜索失败: HTTP {resp.status}")
 
-                    data = await resp.json()
+                data = await resp.json()
 
-                    # 处理响应
-                    return self._parse_search_result(data)
+                # 处理响应
+                return self._parse_search_result(data)
 
         except asyncio.TimeoutError:
             raise TimeoutError(f"搜索超时: {timeout}秒")
@@ -162,41 +378,42 @@ class CrawlerService:
         logger.info(f"获取笔记详情: note_id={note_id}")
 
         try:
-            cookie_value = cookie.get_decrypted_value()
-
-            async with aiohttp.ClientSession() as session:
-                # 获取笔记详情
-                async with session.get(
-                    f"{self.base_url}/api/xhs/note/{note_id}",
-                    headers={
-                        "Cookie": cookie_value
-                    },
-                    timeout=aiohttp.ClientTimeout(total=timeout)
-                ) as resp:
-                    if resp.status == 404:
-                        raise ParseError(f"笔记不存在: {note_id}")
-                    if resp.status != 200:
-                        raise PlatformError(f"获取笔记失败: HTTP {resp.status}")
-
-                    data = await resp.json()
-                    result = self._parse_note_detail(data)
-
-                # 获取评论
-                if get_comments and comments_limit > 0:
-                    try:
-                        comments = await self._get_comments(
-                            session,
-                            note_id,
-                            cookie_value,
-                            limit=comments_limit
-                        )
-                        result["comments"] = comments
-                        result["comment_count"] = len(comments)
-                    except Exception as e:
-                        logger.warning(f"获取评论失败: {e}")
-                        result["comments"] = []
+            cookie_value = await cookie.get_decrypted_value_async()
+            session = self._get_session()
+
+            # 评论请求不依赖详情结果，与详情请求并发执行，各自使用独立的超时
+            comments_task = None
+            if get_comments and comments_limit > 0:
+                comments_task = asyncio.create_task(
+                    self._get_comments(
+                        session,
+                        note_id,
+                        cookie_value,
+                        limit=comments_limit
+                    )
+                )
+
+            # 获取笔记详情
+            try:
+                result = await self._fetch_note(session, note_id, cookie_value, timeout)
+            except BaseException:
+                if comments_task is not None:
+                    comments_task.cancel()
+                raise
 
-                return result
+            # 获取评论 (失败或超时降级为空列表)
+            if comments_task is not None:
+                try:
+                    comments = await comments_task
+                    result["comments"] = comments
+                    result["comment_count"] = len(comments)
+                except Exception as e:
+                    logger.warning(f"获取评论失败: {e}")
+                    result["comments"] = []
+
+            await self.note_cache.put(platform, note_id, result, comments_limit)
+
+            return result
 
         except asyncio.TimeoutError:
             raise TimeoutError(f"获取笔记超时: {timeout}秒")
@@ -207,6 +424,45 @@ class CrawlerService:
                 raise
             raise CrawlerError(f"获取笔记失败: {e}")
 
+    async def get_cached_note_detail(
+        self,
+        platform: str,
+        note_id: str,
+        get_comments: bool = True,
+        comments_limit: int = 50
+    ) -> Optional[Dict[str, Any]]:
+        """
+        从缓存读取笔记详情 (不消耗 Cookie)
+
+        Returns:
+            缓存的笔记详情，未命中返回 None
+        """
+        return await self.note_cache.get(platform, note_id, get_comments, comments_limit)
+
+    async def _fetch_note(
+        self,
+        session: aiohttp.ClientSession,
+        note_id: str,
+        cookie_value: str,
+        timeout: int
+    ) -> Dict[str, Any]:
+        """请求并解析笔记详情"""
+        async with self._track_backend("note") as call, session.get(
+            f"{self.base_url}/api/xhs/note/{note_id}",
+            headers={
+                "Cookie": cookie_value
+            },
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as resp:
+            call["status"] = resp.status
+            if resp.status == 404:
+                raise ParseError(f"笔记不存在: {note_id}")
+            if resp.status != 200:
+                raise PlatformError(f"获取笔记失败: HTTP {resp.status}")
+
+            data = await resp.json()
+            return self._parse_note_detail(data)
+
     async def _get_comments(
         self,
         session: aiohttp.ClientSession,
@@ -214,20 +470,183 @@ class CrawlerService:
         cookie_value: str,
         limit: int = 50
     ) -> List[Dict[str, Any]]:
-        """获取笔记评论"""
-        timeout = self.DEFAULT_TIMEOUT["comments"]
+        """
+        获取笔记评论
+
+        在评论超时预算内分页拉取，超时时返回已获取的部分。
+        """
+        comments: List[Dict[str, Any]] = []
+
+        async def _collect() -> None:
+            async for comment in self._iter_comments(
+                session, note_id, cookie_value, limit=limit
+            ):
+                comments.append(comment)
+
+        try:
+            await asyncio.wait_for(_collect(), timeout=self.DEFAULT_TIMEOUT["comments"])
+        except asyncio.TimeoutError:
+            if not comments:
+                raise
+            logger.warning(f"获取评论超时，返回已获取的 {len(comments)} 条: note_id={note_id}")
+
+        return comments
+
+    async def iter_comments(
+        self,
+        note_id: str,
+        cookie: Cookie,
+        limit: int = 50,
+        expand_sub_comments: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        流式获取笔记评论
+
+        按游标逐页惰性拉取，解析后逐条产出，达到 limit 后停止。
+
+        Args:
+            note_id: 笔记 ID
+            cookie: Cookie 对象
+            limit: 评论数量上限
+            expand_sub_comments: 是否展开子评论 (有界并发)
+
+        Yields:
+            解析后的评论
+        """
+        cookie_value = await cookie.get_decrypted_value_async()
+        session = self._get_session()
+
+        async for comment in self._iter_comments(
+            session,
+            note_id,
+            cookie_value,
+            limit=limit,
+            expand_sub_comments=expand_sub_comments
+        ):
+            yield comment
+
+    async def _iter_comments(
+        self,
+        session: aiohttp.ClientSession,
+        note_id: str,
+        cookie_value: str,
+        limit: int = 50,
+        expand_sub_comments: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """按游标分页遍历评论"""
+        cursor = ""
+        yielded = 0
+
+        while yielded < limit:
+            page_size = min(self.COMMENTS_PAGE_SIZE, limit - yielded)
+            raw_comments, cursor, has_more = await self._fetch_comment_page(
+                session,
+                f"{self.base_url}/api/xhs/note/{note_id}/comments",
+                cookie_value,
+                cursor=cursor,
+                limit=page_size
+            )
+            raw_comments = raw_comments[:limit - yielded]
+
+            comments = [self._parse_comment(c) for c in raw_comments]
+            if expand_sub_comments:
+                await self._expand_sub_comments(
+                    session, note_id, cookie_value, raw_comments, comments
+                )
+
+            for comment in comments:
+                yield comment
+                yielded += 1
+
+            if not has_more or not cursor or not raw_comments:
+                break
+
+    async def _fetch_comment_page(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        cookie_value: str,
+        cursor: str = "",
+        limit: int = 20,
+        operation: str = "comments"
+    ) -> Tuple[List[Dict[str, Any]], str, bool]:
+        """
+        获取一页评论
+
+        Args:
+            operation: 指标中的调用类型 (comments / sub_comments)
+
+        Returns:
+            (原始评论列表, 下一页游标, 是否还有更多)
+        """
+        params: Dict[str, Any] = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
 
-        async with session.get(
-            f"{self.base_url}/api/xhs/note/{note_id}/comments",
-            params={"limit": limit},
+        async with self._track_backend(operation) as call, session.get(
+            url,
+            params=params,
             headers={"Cookie": cookie_value},
-            timeout=aiohttp.ClientTimeout(total=timeout)
+            timeout=aiohttp.ClientTimeout(total=self.DEFAULT_TIMEOUT["comments"])
         ) as resp:
+            call["status"] = resp.status
             if resp.status != 200:
-                return []
+                logger.warning(f"获取评论失败: HTTP {resp.status}, cursor={cursor}")
+                return [], "", False
 
             data = await resp.json()
-            return self._parse_comments(data)
+
+        if "data" in data:
+            data = data["data"]
+
+        next_cursor = data.get("cursor") or ""
+        return data.get("comments", []), str(next_cursor), bool(data.get("has_more", False))
+
+    async def _expand_sub_comments(
+        self,
+        session: aiohttp.ClientSession,
+        note_id: str,
+        cookie_value: str,
+        raw_comments: List[Dict[str, Any]],
+        comments: List[Dict[str, Any]]
+    ) -> None:
+        """展开子评论 (有界并发，失败时保留已内联的子评论)"""
+        semaphore = asyncio.Semaphore(self.SUB_COMMENTS_CONCURRENCY)
+
+        async def _expand(raw: Dict[str, Any], comment: Dict[str, Any]) -> None:
+            sub_comments = [self._parse_comment(c) for c in raw.get("sub_comments", [])]
+            seen = {c["comment_id"] for c in sub_comments}
+            cursor = raw.get("sub_comment_cursor") or ""
+
+            async with semaphore:
+                try:
+                    while len(sub_comments) < self.SUB_COMMENTS_LIMIT:
+                        page, cursor, has_more = await self._fetch_comment_page(
+                            session,
+                            f"{self.base_url}/api/xhs/note/{note_id}/comments/"
+                            f"{comment['comment_id']}/sub_comments",
+                            cookie_value,
+                            cursor=cursor,
+                            limit=self.SUB_COMMENTS_LIMIT - len(sub_comments),
+                            operation="sub_comments"
+                        )
+                        for c in page:
+                            parsed = self._parse_comment(c)
+                            if parsed["comment_id"] not in seen:
+                                seen.add(parsed["comment_id"])
+                                sub_comments.append(parsed)
+                        if not has_more or not cursor or not page:
+                            break
+                except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                    logger.warning(f"展开子评论失败: comment_id={comment['comment_id']}, {e}")
+
+            comment["sub_comments"] = sub_comments[:self.SUB_COMMENTS_LIMIT]
+
+        await asyncio.gather(*(
+            _expand(raw, comment)
+            for raw, comment in zip(raw_comments, comments)
+            if raw.get("sub_comment_has_more")
+        ))
 
     def _parse_search_result(self, data: Dict) -> Dict[str, Any]:
         """解析搜索结果"""
@@ -327,20 +746,22 @@ class CrawlerService:
 
         comments = data.get("comments", [])
 
-        return [
-            {
-                "comment_id": c.get("id") or c.get("comment_id"),
-                "content": c.get("content", ""),
-                "user": {
-                    "user_id": c.get("user", {}).get("user_id") or c.get("user_id"),
-                    "nickname": c.get("user", {}).get("nickname") or c.get("nickname"),
-                },
-                "liked_count": c.get("liked_count", 0),
-                "create_time": c.get("create_time"),
-                "sub_comments": c.get("sub_comments", [])
-            }
-            for c in comments
-        ]
+        return [self._parse_comment(c) for c in comments]
+
+    def _parse_comment(self, c: Dict) -> Dict[str, Any]:
+        """解析单条评论"""
+        return {
+            "comment_id": c.get("id") or c.get("comment_id"),
+            "content": c.get("content", ""),
+            "user": {
+                "user_id": c.get("user", {}).get("user_id") or c.get("user_id"),
+                "nickname": c.get("user", {}).get("nickname") or c.get("nickname"),
+            },
+            "liked_count": c.get("liked_count", 0),
+            "create_time": c.get("create_time"),
+            "sub_comment_count": c.get("sub_comment_count", 0),
+            "sub_comments": c.get("sub_comments", [])
+        }
 
     async def validate_cookie(self, cookie: Cookie) -> bool:
         """
@@ -353,15 +774,16 @@ class CrawlerService:
             是否有效
         """
         try:
-            cookie_value = cookie.get_decrypted_value()
+            cookie_value = await cookie.get_decrypted_value_async()
+            session = self._get_session()
 
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.base_url}/api/xhs/user/info",
-                    headers={"Cookie": cookie_value},
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as resp:
-                    return resp.status == 200
+            async with self._track_backend("validate_cookie") as call, session.get(
+                f"{self.base_url}/api/xhs/user/info",
+                headers={"Cookie": cookie_value},
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as resp:
+                call["status"] = resp.status
+                return resp.status == 200
 
         except Exception as e:
             logger.warning(f"Cookie 验证失败: {e}")
@@ -381,6 +803,19 @@ def get_crawler_service() -> CrawlerService:
     return _crawler_service
 
 
+async def init_crawler_service() -> CrawlerService:
+    """初始化爬虫服务并创建连接池 (应用启动时调用)"""
+    service = get_crawler_service()
+    await service.start()
+    return service
+
+
+async def close_crawler_service() -> None:
+    """关闭爬虫服务连接池 (应用关闭时调用)"""
+    if _crawler_service is not None:
+        await _crawler_service.close()
+
+
 def reset_crawler_service() -> None:
     """重置爬虫服务 (用于测试)"""
     global _crawler_service
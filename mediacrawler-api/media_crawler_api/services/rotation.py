@@ -0,0 +1,246 @@
+"""
+批量密钥轮换服务
+
+修改 COOKIE_KEY_ID 后，将 Cookie 存储中仍使用旧密钥的密文重新加密为当前密钥:
+- 按名称顺序分批处理，每批只在复制密文和写回结果时短暂持有 CookieManager 锁
+- 加解密在线程池中并行执行，不阻塞事件循环
+- 记录断点 (最后处理的 Cookie 名称)，取消或失败后再次启动从断点继续；
+  已轮换的 Cookie 密钥 ID 已是目标密钥，重启进程后也不会重复处理
+- 轮换失败的 Cookie 不阻塞断点推进，名称记录在状态的 failed_names 中；
+  存在失败记录时再次启动会从头扫描，重试仍使用旧密钥的 Cookie
+- 写回时比较旧密文，轮换期间被更新的 Cookie 不会被覆盖
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Set, Tuple
+import asyncio
+
+from .cookie import CookieManager, get_cookie_manager
+from ..utils.crypto import CookieEncryption, cookie_encryption
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class KeyRotationJob:
+    """
+    批量密钥轮换任务
+
+    同一时间只允许一个轮换任务运行，状态通过 get_status() 查询。
+    """
+
+    # 状态中保留的最近错误数
+    MAX_ERRORS_KEPT = 20
+
+    def __init__(
+        self,
+        manager: CookieManager,
+        encryption: CookieEncryption = cookie_encryption
+    ):
+        """
+        初始化轮换任务
+
+        Args:
+            manager: Cookie 管理器
+            encryption: 加密器
+        """
+        self._manager = manager
+        self._encryption = encryption
+        self._task: Optional[asyncio.Task] = None
+        self._cancel_requested = False
+        self._checkpoint: Optional[str] = None
+        # 轮换失败、待下次启动重试的 Cookie 名称
+        self._failed_names: Set[str] = set()
+        self._status: Dict[str, Any] = {
+            "state": "idle",        # idle / running / completed / cancelled / failed
+            "target_key_id": None,
+            "total": 0,
+            "processed": 0,
+            "rotated": 0,
+            "skipped": 0,
+            "failed": 0,
+            "checkpoint": None,
+            "started_at": None,
+            "finished_at": None,
+            "errors": [],
+        }
+
+    def is_running(self) -> bool:
+        """是否有轮换任务在运行"""
+        return self._task is not None and not self._task.done()
+
+    async def start(
+        self,
+        chunk_size: int = 100,
+        workers: int = 4,
+        restart: bool = False
+    ) -> Dict[str, Any]:
+        """
+        启动后台轮换任务
+
+        上次运行有轮换失败的 Cookie 时忽略断点从头扫描，已轮换的 Cookie
+        密钥 ID 已是目标密钥，不会重复处理。
+
+        Args:
+            chunk_size: 每批处理的 Cookie 数量
+            workers: 并行加解密的线程数
+            restart: 忽略断点，从头开始
+
+        Returns:
+            任务状态
+
+        Raises:
+            RuntimeError: 已有任务在运行
+        """
+        if self.is_running():
+            raise RuntimeError("密钥轮换任务正在运行")
+
+        if restart or self._failed_names:
+            if self._failed_names:
+                logger.info(f"重试上次轮换失败的 Cookie: {len(self._failed_names)} 个")
+            self._checkpoint = None
+            # 从头扫描时仍失败的 Cookie 会重新记录
+            self._failed_names.clear()
+
+        self._cancel_requested = False
+        self._status.update(
+            state="running",
+            total=0,
+            processed=0,
+            rotated=0,
+            skipped=0,
+            failed=0,
+            checkpoint=self._checkpoint,
+            started_at=datetime.utcnow().isoformat(),
+            finished_at=None,
+            errors=[],
+        )
+        self._task = asyncio.create_task(self._run(chunk_size, workers))
+        return self.get_status()
+
+    async def cancel(self) -> Dict[str, Any]:
+        """请求取消，当前批次完成后停止 (断点保留，可再次启动继续)"""
+        if self.is_running():
+            self._cancel_requested = True
+            await asyncio.shield(self._task)
+        return self.get_status()
+
+    def get_status(self) -> Dict[str, Any]:
+        """获取任务状态和进度"""
+        status = dict(self._status)
+        status["errors"] = list(self._status["errors"])
+        status["failed_names"] = sorted(self._failed_names)
+        status["progress"] = (
+            status["processed"] / status["total"] if status["total"] else
+            (1.0 if status["state"] == "completed" else 0.0)
+        )
+        return status
+
+    async def _run(self, chunk_size: int, workers: int) -> None:
+        try:
+            target_key_id = await asyncio.to_thread(lambda: self._encryption.current_key_id)
+            self._status["target_key_id"] = target_key_id
+
+            pending = await self._manager.list_for_rotation(
+                target_key_id, after=self._checkpoint, limit=2 ** 31
+            )
+            self._status["total"] = len(pending)
+            logger.info(
+                f"开始密钥轮换: target={target_key_id}, pending={len(pending)}, "
+                f"checkpoint={self._checkpoint}"
+            )
+
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="key-rotation") as executor:
+                while not self._cancel_requested:
+                    batch = await self._manager.list_for_rotation(
+                        target_key_id, after=self._checkpoint, limit=chunk_size
+                    )
+                    if not batch:
+                        break
+                    await self._rotate_batch(batch, executor)
+
+            if self._cancel_requested:
+                self._status["state"] = "cancelled"
+                logger.info(f"密钥轮换已取消: checkpoint={self._checkpoint}")
+            else:
+                self._status["state"] = "completed"
+                self._checkpoint = None
+                logger.info(
+                    f"密钥轮换完成: rotated={self._status['rotated']}, "
+                    f"failed={self._status['failed']}"
+                )
+
+        except Exception as e:
+            self._status["state"] = "failed"
+            self._record_error(None, str(e))
+            logger.error(f"密钥轮换失败: {e}", exc_info=True)
+
+        finally:
+            self._status["checkpoint"] = self._checkpoint
+            self._status["finished_at"] = datetime.utcnow().isoformat()
+
+    async def _rotate_batch(
+        self,
+        batch: List[Tuple[str, str, str]],
+        executor: ThreadPoolExecutor
+    ) -> None:
+        """轮换一批 Cookie 并写回"""
+        loop = asyncio.get_running_loop()
+
+        # 先加载所需的历史密钥 (派生在线程池中执行)
+        for key_id in {key_id for _, _, key_id in batch}:
+            try:
+                await self._encryption.ensure_key(key_id)
+            except Exception as e:
+                logger.warning(f"历史密钥加载失败: key_id={key_id}, {e}")
+
+        results = await asyncio.gather(*(
+            loop.run_in_executor(executor, self._encryption.rotate_key, encrypted, key_id)
+            for _, encrypted, key_id in batch
+        ), return_exceptions=True)
+
+        updates = []
+        for (name, encrypted, _), result in zip(batch, results):
+            if isinstance(result, BaseException):
+                self._status["failed"] += 1
+                self._failed_names.add(name)
+                self._record_error(name, str(result))
+            else:
+                new_encrypted, new_key_id = result
+                updates.append((name, encrypted, new_encrypted, new_key_id))
+
+        replaced = await self._manager.replace_encrypted(updates)
+        # 轮换结果尽快落盘，进程重启后已处理的 Cookie 不再重复轮换
+        await self._manager.flush()
+
+        self._status["rotated"] += replaced
+        self._status["skipped"] += len(updates) - replaced
+        self._status["processed"] += len(batch)
+        # 失败的 Cookie 已记入 _failed_names，断点照常推进，避免单个 Cookie 阻塞整个任务
+        self._checkpoint = batch[-1][0]
+        self._status["checkpoint"] = self._checkpoint
+
+    def _record_error(self, name: Optional[str], message: str) -> None:
+        errors = self._status["errors"]
+        errors.append({"cookie_name": name, "error": message})
+        del errors[:-self.MAX_ERRORS_KEPT]
+
+
+# ============ 依赖注入 ============
+
+_key_rotation_job: Optional[KeyRotationJob] = None
+
+
+def get_key_rotation_job() -> KeyRotationJob:
+    """获取密钥轮换任务实例 (单例)"""
+    global _key_rotation_job
+    if _key_rotation_job is None:
+        _key_rotation_job = KeyRotationJob(get_cookie_manager())
+    return _key_rotation_job
+
+
+def reset_key_rotation_job() -> None:
+    """重置密钥轮换任务 (用于测试)"""
+    global _key_rotation_job
+    _key_rotation_job = None
@@ -2,18 +2,50 @@
 工具模块
 """
 
-from .crypto import CookieEncryption, cookie_encryption
+from .crypto import CookieEncryption, cookie_encryption, decrypted_cookie_cache
 from .logging import get_logger, sanitize_log, sanitize_dict, SanitizedFormatter
-from .alerting import AlertLevel, send_alert, check_cookie_exhausted
+from .metrics import MetricsRegistry, metrics_registry, render_prometheus
+from .resources import (
+    ResourceSampler,
+    get_resource_sampler,
+    init_resource_sampler,
+    close_resource_sampler,
+)
+from .sliding_window import SlidingWindowStats, get_request_window
+from .alerting import (
+    AlertLevel,
+    AlertDispatcher,
+    send_alert,
+    check_cookie_exhausted,
+    check_api_success_rate,
+    get_alert_dispatcher,
+    init_alert_dispatcher,
+    close_alert_dispatcher,
+)
 
 __all__ = [
     "CookieEncryption",
     "cookie_encryption",
+    "decrypted_cookie_cache",
     "get_logger",
     "sanitize_log",
     "sanitize_dict",
     "SanitizedFormatter",
+    "MetricsRegistry",
+    "metrics_registry",
+    "render_prometheus",
+    "ResourceSampler",
+    "get_resource_sampler",
+    "init_resource_sampler",
+    "close_resource_sampler",
+    "SlidingWindowStats",
+    "get_request_window",
     "AlertLevel",
+    "AlertDispatcher",
     "send_alert",
     "check_cookie_exhausted",
+    "check_api_success_rate",
+    "get_alert_dispatcher",
+    "init_alert_dispatcher",
+    "close_alert_dispatcher",
 ]
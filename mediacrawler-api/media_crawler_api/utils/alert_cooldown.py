@@ -0,0 +1,362 @@
+"""
+告警冷却存储
+
+记录每个告警 (名称_级别) 的冷却截止时间，过期条目自动淘汰:
+- AlertCooldownStore: 存储接口
+- MemoryCooldownStore: 进程内存储 (默认)，过期堆淘汰并限制条目数
+- SQLiteCooldownStore: 本机 SQLite 文件，同一主机上的多个 uvicorn worker 共享冷却状态
+
+acquire() 为原子操作: 冷却不存在或已过期时写入并返回 True，
+多个 worker 同时发送同一告警时只有一个能取得冷却。
+发送路径上的操作 (is_active / acquire / set / release) 为异步接口；
+管理操作 clear / active 为同步接口，供 alerting.clear_cooldown / get_cooldown_status 直接调用。
+
+时间统一使用 Unix 时间戳 (秒)。
+"""
+
+from abc import ABC, abstractmethod
+from typing import Optional, Dict, Any, List, Tuple
+import asyncio
+import heapq
+import os
+import sqlite3
+import threading
+import time
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class AlertCooldownStore(ABC):
+    """告警冷却存储接口"""
+
+    @abstractmethod
+    async def is_active(self, key: str) -> bool:
+        """是否在冷却期内"""
+
+    @abstractmethod
+    async def acquire(self, key: str, ttl_seconds: float) -> bool:
+        """
+        尝试进入冷却
+
+        Args:
+            key: 冷却键
+            ttl_seconds: 冷却时长 (秒)
+
+        Returns:
+            不在冷却期内并已写入时返回 True，已在冷却期内返回 False
+        """
+
+    @abstractmethod
+    async def set(self, key: str, ttl_seconds: float) -> None:
+        """强制设置冷却 (覆盖现有截止时间)"""
+
+    @abstractmethod
+    async def release(self, key: str) -> None:
+        """解除冷却"""
+
+    @abstractmethod
+    def clear(self, prefix: Optional[str] = None) -> int:
+        """
+        清除冷却 (同步)
+
+        Args:
+            prefix: 键前缀，不指定则清除全部
+
+        Returns:
+            清除的条目数
+        """
+
+    @abstractmethod
+    def active(self) -> Dict[str, float]:
+        """获取冷却中的条目 {key: 截止时间戳} (同步)"""
+
+    async def close(self) -> None:
+        """关闭存储"""
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class MemoryCooldownStore(AlertCooldownStore):
+    """
+    进程内冷却存储
+
+    截止时间同时记录在字典和最小堆中，每次操作先从堆顶弹出已过期的条目，
+    字典只保留冷却中的告警，active() 为 O(冷却中告警数)。
+    超过 max_entries 时淘汰最早到期的条目。
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        """
+        初始化内存存储
+
+        Args:
+            max_entries: 最大条目数
+        """
+        self.max_entries = max_entries
+        self._until: Dict[str, float] = {}
+        # (截止时间, key)，过期或被覆盖的条目弹出时与 _until 比对
+        self._heap: List[Tuple[float, str]] = []
+        self._evictions = 0
+
+    def _evict(self, now: float) -> None:
+        heap = self._heap
+        while heap and (heap[0][0] <= now or len(self._until) > self.max_entries):
+            until, key = heapq.heappop(heap)
+            if self._until.get(key) == until:
+                del self._until[key]
+                if until > now:
+                    self._evictions += 1
+
+        # 堆中失效条目过多时重建，避免反复覆盖同一告警导致堆膨胀
+        if len(heap) > 2 * len(self._until) + 64:
+            self._rebuild_heap()
+
+    def _rebuild_heap(self) -> None:
+        """按 _until 重建堆，丢弃已被删除或覆盖的条目"""
+        self._heap = [(until, key) for key, until in self._until.items()]
+        heapq.heapify(self._heap)
+
+    def _put(self, key: str, until: float) -> None:
+        self._until[key] = until
+        heapq.heappush(self._heap, (until, key))
+
+    async def is_active(self, key: str) -> bool:
+        now = time.time()
+        self._evict(now)
+        return self._until.get(key, 0) > now
+
+    async def acquire(self, key: str, ttl_seconds: float) -> bool:
+        now = time.time()
+        self._evict(now)
+        if self._until.get(key, 0) > now:
+            return False
+        self._put(key, now + ttl_seconds)
+        self._evict(now)
+        return True
+
+    async def set(self, key: str, ttl_seconds: float) -> None:
+        now = time.time()
+        self._put(key, now + ttl_seconds)
+        self._evict(now)
+
+    async def release(self, key: str) -> None:
+        if self._until.pop(key, None) is not None:
+            self._rebuild_heap()
+
+    def clear(self, prefix: Optional[str] = None) -> int:
+        if prefix is None:
+            count = len(self._until)
+            self._until.clear()
+            self._heap.clear()
+            return count
+        keys = [k for k in self._until if k.startswith(prefix)]
+        for key in keys:
+            del self._until[key]
+        if keys:
+            self._rebuild_heap()
+        return len(keys)
+
+    def active(self) -> Dict[str, float]:
+        self._evict(time.time())
+        return dict(self._until)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "entries": len(self._until),
+            "max_entries": self.max_entries,
+            "evictions": self._evictions,
+        }
+
+
+class SQLiteCooldownStore(AlertCooldownStore):
+    """
+    SQLite 冷却存储
+
+    同一主机上的多个 worker 指向同一个文件即可共享冷却状态，
+    跨进程互斥由 SQLite 文件锁保证，acquire 为单条 UPSERT 语句。
+    sqlite3 为同步接口，异步操作在线程池中执行；对同一连接的访问由线程锁串行化，
+    同步的 clear / active 直接在调用线程中执行 (单条语句，耗时很短)。
+    """
+
+    # 过期条目清理间隔 (秒)
+    PURGE_INTERVAL = 60.0
+
+    def __init__(self, path: str = "data/alert_cooldown.db"):
+        """
+        初始化 SQLite 存储
+
+        Args:
+            path: 数据库文件路径 (":memory:" 仅用于测试)
+        """
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory and self.path != ":memory:":
+            os.makedirs(directory, exist_ok=True)
+
+        # 其他 worker 持有写锁时最多等待 5 秒
+        conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS alert_cooldown ("
+            "cooldown_key TEXT PRIMARY KEY, until REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_alert_cooldown_until ON alert_cooldown (until)"
+        )
+        conn.commit()
+        return conn
+
+    def _call(self, fn, *args):
+        with self._lock:
+            if self._conn is None:
+                self._conn = self._connect()
+            return fn(self._conn, *args)
+
+    async def _run(self, fn, *args):
+        return await asyncio.to_thread(self._call, fn, *args)
+
+    def _purge(self, conn: sqlite3.Connection, now: float) -> None:
+        """定期删除过期条目 (按 until 索引范围删除)"""
+        if now - self._last_purge >= self.PURGE_INTERVAL:
+            conn.execute("DELETE FROM alert_cooldown WHERE until <= ?", (now,))
+            self._last_purge = now
+
+    async def is_active(self, key: str) -> bool:
+        def _is_active(conn: sqlite3.Connection) -> bool:
+            row = conn.execute(
+                "SELECT 1 FROM alert_cooldown WHERE cooldown_key = ? AND until > ?",
+                (key, time.time())
+            ).fetchone()
+            return row is not None
+
+        return await self._run(_is_active)
+
+    async def acquire(self, key: str, ttl_seconds: float) -> bool:
+        def _acquire(conn: sqlite3.Connection) -> bool:
+            now = time.time()
+            with conn:
+                cursor = conn.execute(
+                    "INSERT INTO alert_cooldown (cooldown_key, until) VALUES (?, ?) "
+                    "ON CONFLICT(cooldown_key) DO UPDATE SET until = excluded.until "
+                    "WHERE alert_cooldown.until <= ?",
+                    (key, now + ttl_seconds, now)
+                )
+                self._purge(conn, now)
+            return cursor.rowcount > 0
+
+        return await self._run(_acquire)
+
+    async def set(self, key: str, ttl_seconds: float) -> None:
+        def _set(conn: sqlite3.Connection) -> None:
+            now = time.time()
+            with conn:
+                conn.execute(
+                    "INSERT INTO alert_cooldown (cooldown_key, until) VALUES (?, ?) "
+                    "ON CONFLICT(cooldown_key) DO UPDATE SET until = excluded.until",
+                    (key, now + ttl_seconds)
+                )
+                self._purge(conn, now)
+
+        await self._run(_set)
+
+    async def release(self, key: str) -> None:
+        def _release(conn: sqlite3.Connection) -> None:
+            with conn:
+                conn.execute("DELETE FROM alert_cooldown WHERE cooldown_key = ?", (key,))
+
+        await self._run(_release)
+
+    def clear(self, prefix: Optional[str] = None) -> int:
+        def _clear(conn: sqlite3.Connection) -> int:
+            with conn:
+                if prefix is None:
+                    cursor = conn.execute("DELETE FROM alert_cooldown")
+                else:
+                    # 前缀按字符串范围匹配，避免 LIKE 的通配符转义问题
+                    cursor = conn.execute(
+                        "DELETE FROM alert_cooldown WHERE cooldown_key >= ? AND cooldown_key < ?",
+                        (prefix, prefix + "\U0010ffff")
+                    )
+            return cursor.rowcount
+
+        return self._call(_clear)
+
+    def active(self) -> Dict[str, float]:
+        def _active(conn: sqlite3.Connection) -> Dict[str, float]:
+            rows = conn.execute(
+                "SELECT cooldown_key, until FROM alert_cooldown WHERE until > ?",
+                (time.time(),)
+            ).fetchall()
+            return dict(rows)
+
+        return self._call(_active)
+
+    async def close(self) -> None:
+        def _close() -> None:
+            with self._lock:
+                if self._conn is not None:
+                    conn, self._conn = self._conn, None
+                    conn.close()
+
+        await asyncio.to_thread(_close)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": "sqlite", "path": self.path}
+
+
+def create_cooldown_store(backend: Optional[str] = None) -> AlertCooldownStore:
+    """
+    根据后端类型和环境变量创建冷却存储
+
+    环境变量:
+    - ALERT_COOLDOWN_BACKEND: memory (默认) / sqlite
+    - ALERT_COOLDOWN_SQLITE_PATH: SQLite 文件路径 (默认 data/alert_cooldown.db)
+    - ALERT_COOLDOWN_MAX_ENTRIES: 内存存储最大条目数 (默认 10000)
+    """
+    backend = (backend or os.environ.get("ALERT_COOLDOWN_BACKEND", "memory")).lower()
+
+    if backend == "sqlite":
+        return SQLiteCooldownStore(
+            os.environ.get("ALERT_COOLDOWN_SQLITE_PATH", "data/alert_cooldown.db")
+        )
+
+    if backend != "memory":
+        raise ValueError(f"不支持的冷却存储类型: {backend}")
+
+    return MemoryCooldownStore(
+        max_entries=int(os.environ.get("ALERT_COOLDOWN_MAX_ENTRIES", 10000))
+    )
+
+
+# ============ 依赖注入 ============
+
+_cooldown_store: Optional[AlertCooldownStore] = None
+
+
+def get_cooldown_store() -> AlertCooldownStore:
+    """获取告警冷却存储实例 (单例，后端由 ALERT_COOLDOWN_BACKEND 决定)"""
+    global _cooldown_store
+    if _cooldown_store is None:
+        _cooldown_store = create_cooldown_store()
+    return _cooldown_store
+
+
+async def close_cooldown_store() -> None:
+    """关闭告警冷却存储 (应用关闭时调用)"""
+    if _cooldown_store is not None:
+        await _cooldown_store.close()
+
+
+def reset_cooldown_store() -> None:
+    """重置告警冷却存储 (用于测试)"""
+    global _cooldown_store
+    _cooldown_store = None
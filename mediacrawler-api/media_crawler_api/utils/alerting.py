@@ -3,18 +3,23 @@
 
 提供告警发送功能，支持:
 - 飞书 Webhook 告警
+- 后台异步发送 (有界队列、连接复用、失败退避重试)
+- 同类告警聚合为摘要卡片
 - 告警冷却 (防止重复发送)
 - 多级别告警 (P0/P1/P2)
 """
 
 import aiohttp
 import asyncio
-from typing import Dict, Any, Optional
-from datetime import datetime, timedelta
+import random
+from typing import Dict, Any, Optional, List, Set, Tuple
+from datetime import datetime
 from enum import Enum
 import os
 
+from .alert_cooldown import get_cooldown_store, close_cooldown_store
 from .logging import get_logger
+from .sliding_window import WINDOWS, get_request_window
 
 logger = get_logger(__name__)
 
@@ -33,9 +38,6 @@ COOLDOWN_MINUTES = {
     AlertLevel.P2: 60
 }
 
-# 告警冷却记录 {alert_key: cooldown_until}
-_alert_cooldown: Dict[str, datetime] = {}
-
 # 颜色映射
 LEVEL_COLORS = {
     AlertLevel.P0: "red",
@@ -49,44 +51,250 @@ def get_webhook_url() -> Optional[str]:
     return os.environ.get("FEISHU_WEBHOOK_URL")
 
 
-async def send_alert(
-    name: str,
-    level: AlertLevel,
-    message: str,
-    runbook: str,
-    context: Optional[Dict[str, Any]] = None,
-    webhook_url: Optional[str] = None,
-    skip_cooldown: bool = False
-) -> bool:
+class AlertDispatcher:
+    """
+    后台告警发送器
+
+    - send_alert 只把告警放入有界队列，调用方不等待 Webhook
+    - 同名同级别的告警在聚合窗口内合并为一张摘要卡片
+    - 复用同一个 aiohttp 连接池，失败按指数退避 (带抖动) 重试
+    - 队列满时丢弃新告警并计数
+
+    环境变量:
+    - ALERT_QUEUE_SIZE: 队列容量，默认 1000
+    - ALERT_DIGEST_WINDOW_SECONDS: 聚合窗口 (秒)，默认 10
+    - ALERT_MAX_RETRIES: 最大重试次数，默认 3
+    - ALERT_RETRY_BACKOFF_SECONDS: 首次重试等待 (秒)，默认 1
     """
-    发送告警到飞书
 
-    Args:
-        name: 告警名称
-        level: 告警级别
-        message: 告警消息
-        runbook: 处理步骤
-        context: 额外上下文信息
-        webhook_url: Webhook URL (不指定则从环境变量读取)
-        skip_cooldown: 是否跳过冷却检查
+    DEFAULT_QUEUE_SIZE = 1000
+    DEFAULT_DIGEST_WINDOW = 10.0
+    DEFAULT_MAX_RETRIES = 3
+    DEFAULT_RETRY_BACKOFF = 1.0
+
+    # 同时进行中的 Webhook 请求数上限
+    MAX_CONCURRENT_SENDS = 4
+
+    # 摘要卡片中列出的告警条数上限
+    DIGEST_MAX_ITEMS = 10
+
+    def __init__(
+        self,
+        queue_size: Optional[int] = None,
+        digest_window: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        retry_backoff: Optional[float] = None
+    ):
+        """
+        初始化告警发送器
+
+        Args:
+            queue_size: 队列容量
+            digest_window: 聚合窗口 (秒)
+            max_retries: 最大重试次数
+            retry_backoff: 首次重试等待 (秒)，之后每次翻倍
+        """
+        self.queue_size = queue_size or int(
+            os.environ.get("ALERT_QUEUE_SIZE", self.DEFAULT_QUEUE_SIZE)
+        )
+        self.digest_window = digest_window if digest_window is not None else float(
+            os.environ.get("ALERT_DIGEST_WINDOW_SECONDS", self.DEFAULT_DIGEST_WINDOW)
+        )
+        self.max_retries = max_retries if max_retries is not None else int(
+            os.environ.get("ALERT_MAX_RETRIES", self.DEFAULT_MAX_RETRIES)
+        )
+        self.retry_backoff = retry_backoff if retry_backoff is not None else float(
+            os.environ.get("ALERT_RETRY_BACKOFF_SECONDS", self.DEFAULT_RETRY_BACKOFF)
+        )
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._send_semaphore: Optional[asyncio.Semaphore] = None
+        # (name, level, webhook) -> 聚合窗口内的告警列表
+        self._pending: Dict[Tuple[str, AlertLevel, str], List[Dict[str, Any]]] = {}
+        # 聚合窗口计时中的发送任务 (窗口结束前可取消并立即发送)
+        self._timers: Dict[Tuple[str, AlertLevel, str], asyncio.Task] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._stats = {
+            "submitted": 0,
+            "dropped": 0,
+            "aggregated": 0,
+            "sent": 0,
+            "failed": 0,
+            "retries": 0,
+            "suppressed": 0,
+        }
 
-    Returns:
-        是否发送成功
-    """
-    webhook = webhook_url or get_webhook_url()
-    if not webhook:
-        logger.warning("FEISHU_WEBHOOK_URL 未配置，跳过告警发送")
+    # ============ 生命周期 ============
+
+    def start(self) -> None:
+        """启动后台任务 (需在事件循环中调用，submit 时按需自动启动)"""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._send_semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_SENDS)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """
+        停止后台任务: 处理完队列，立即发送聚合中的告警，再关闭连接池
+
+        Args:
+            timeout: 等待发送完成的最长时间 (秒)
+        """
+        if self._worker is not None and not self._worker.done():
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"告警队列未处理完: {self._queue.qsize()} 条")
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+
+        # 聚合窗口未结束的告警立即发送
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        for key in list(self._pending):
+            self._spawn(self._flush(key, delay=0))
+        if self._tasks:
+            _, still_running = await asyncio.wait(set(self._tasks), timeout=timeout)
+            for task in still_running:
+                task.cancel()
+
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """获取共享 Session (复用 Webhook 连接)"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=10)
+            )
+        return self._session
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    # ============ 提交与聚合 ============
+
+    def submit(self, alert: Dict[str, Any]) -> bool:
+        """
+        提交告警 (不等待发送)
+
+        Args:
+            alert: name / level / message / runbook / context / webhook / time
+
+        Returns:
+            是否入队 (队列满时返回 False)
+        """
+        self.start()
+        try:
+            self._queue.put_nowait(alert)
+        except asyncio.QueueFull:
+            self._stats["dropped"] += 1
+            logger.warning(f"告警队列已满，丢弃告警: {alert['name']}")
+            return False
+        self._stats["submitted"] += 1
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            alert = await self._queue.get()
+            try:
+                key = (alert["name"], alert["level"], alert["webhook"])
+                pending = self._pending.get(key)
+                if pending is not None:
+                    pending.append(alert)
+                    self._stats["aggregated"] += 1
+                else:
+                    # 窗口内的第一条告警: 开启聚合窗口，窗口结束时统一发送
+                    self._pending[key] = [alert]
+                    self._timers[key] = self._spawn(self._flush(key, delay=self.digest_window))
+            finally:
+                self._queue.task_done()
+
+    async def _flush(self, key: Tuple[str, AlertLevel, str], delay: float) -> None:
+        """聚合窗口结束后发送 (多条时合并为摘要卡片)"""
+        if delay > 0:
+            await asyncio.sleep(delay)
+            self._timers.pop(key, None)
+        alerts = self._pending.pop(key, None)
+        if not alerts:
+            return
+
+        name, level, webhook = key
+        cooldown_key = f"{name}_{level.value}"
+        cooldown_seconds = COOLDOWN_MINUTES[level] * 60
+        store = get_cooldown_store()
+
+        # 发送前先取得冷却: 共享存储下其他 worker 已发送同一告警时跳过
+        try:
+            if any(a["skip_cooldown"] for a in alerts):
+                await store.set(cooldown_key, cooldown_seconds)
+            elif not await store.acquire(cooldown_key, cooldown_seconds):
+                self._stats["suppressed"] += 1
+                logger.debug(f"告警 {name} 已由其他进程发送，跳过")
+                return
+        except Exception as e:
+            logger.warning(f"告警冷却存储不可用，直接发送: {e}")
+
+        card = _build_digest_card(alerts, self.DIGEST_MAX_ITEMS)
+
+        async with self._send_semaphore:
+            sent = await self._send_with_retry(webhook, card, name)
+
+        if sent:
+            self._stats["sent"] += 1
+            logger.info(f"告警发送成功: {name}, 合并 {len(alerts)} 条")
+        else:
+            self._stats["failed"] += 1
+            logger.error(f"告警发送失败 (已重试 {self.max_retries} 次): {name}")
+            # 发送失败时解除冷却，下一次告警可以重新发送
+            try:
+                await store.release(cooldown_key)
+            except Exception as e:
+                logger.warning(f"解除告警冷却失败: {e}")
+
+    async def _send_with_retry(self, webhook: str, card: Dict[str, Any], name: str) -> bool:
+        """发送卡片，失败按指数退避重试"""
+        for attempt in range(self.max_retries + 1):
+            if attempt > 0:
+                self._stats["retries"] += 1
+                backoff = self.retry_backoff * (2 ** (attempt - 1))
+                await asyncio.sleep(backoff * random.uniform(0.5, 1.5))
+            if await post_alert_card(self._get_session(), webhook, card, name):
+                return True
         return False
 
-    # 检查冷却
-    cooldown_key = f"{name}_{level.value}"
-    if not skip_cooldown and cooldown_key in _alert_cooldown:
-        cooldown_until = _alert_cooldown[cooldown_key]
-        if datetime.now() < cooldown_until:
-            logger.debug(f"告警 {name} 在冷却期内，跳过发送")
-            return False
+    def get_stats(self) -> Dict[str, Any]:
+        """获取发送统计"""
+        return {
+            "running": self._worker is not None and not self._worker.done(),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "pending_digests": len(self._pending),
+            **self._stats,
+            "cooldown_store": get_cooldown_store().get_stats(),
+        }
 
-    # 构建飞书卡片消息
+
+def build_alert_card(
+    name: str,
+    level: AlertLevel,
+    message: str,
+    runbook: str,
+    context: Optional[Dict[str, Any]] = None,
+    timestamp: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """构建飞书卡片消息"""
     card = {
         "msg_type": "interactive",
         "card": {
@@ -136,39 +344,138 @@ async def send_alert(
         "elements": [
             {
                 "tag": "plain_text",
-                "content": f"时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+                "content": f"时间: {(timestamp or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')}"
             }
         ]
     })
 
-    # 发送请求
+    return card
+
+
+def _build_digest_card(alerts: List[Dict[str, Any]], max_items: int) -> Dict[str, Any]:
+    """构建摘要卡片: 以最新一条为主体，附带窗口内的告警时间和首行摘要"""
+    latest = alerts[-1]
+    card = build_alert_card(
+        name=latest["name"],
+        level=latest["level"],
+        message=latest["message"],
+        runbook=latest["runbook"],
+        context=latest["context"],
+        timestamp=latest["time"]
+    )
+    if len(alerts) == 1:
+        return card
+
+    card["card"]["header"]["title"]["content"] += f" ×{len(alerts)}"
+    lines = [
+        f"- {a['time'].strftime('%H:%M:%S')} "
+        f"{next((l for l in a['message'].splitlines() if l.strip()), '')}"
+        for a in alerts[-max_items:]
+    ]
+    if len(alerts) > max_items:
+        lines.insert(0, f"- ... 更早的 {len(alerts) - max_items} 条已省略")
+    card["card"]["elements"].insert(1, {
+        "tag": "div",
+        "text": {
+            "tag": "lark_md",
+            "content": f"**合并告警** (共 {len(alerts)} 条)\n" + "\n".join(lines)
+        }
+    })
+    return card
+
+
+async def post_alert_card(
+    session: aiohttp.ClientSession,
+    webhook: str,
+    card: Dict[str, Any],
+    name: str = ""
+) -> bool:
+    """
+    发送一次卡片到飞书 Webhook (不重试)
+
+    Returns:
+        是否发送成功
+    """
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                webhook,
-                json=card,
-                timeout=aiohttp.ClientTimeout(total=10)
-            ) as resp:
-                if resp.status == 200:
-                    result = await resp.json()
-                    if result.get("code") == 0 or result.get("StatusCode") == 0:
-                        # 设置冷却
-                        cooldown_minutes = COOLDOWN_MINUTES[level]
-                        _alert_cooldown[cooldown_key] = datetime.now() + timedelta(minutes=cooldown_minutes)
-                        logger.info(f"告警发送成功: {name}")
-                        return True
-
-                logger.error(f"告警发送失败: HTTP {resp.status}")
+        async with session.post(
+            webhook,
+            json=card,
+            timeout=aiohttp.ClientTimeout(total=10)
+        ) as resp:
+            if resp.status == 200:
+                result = await resp.json(content_type=None)
+                if result.get("code") == 0 or result.get("StatusCode") == 0:
+                    return True
+                logger.warning(f"告警发送失败: {name}, code={result.get('code')}, msg={result.get('msg')}")
                 return False
 
+            logger.warning(f"告警发送失败: {name}, HTTP {resp.status}")
+            return False
+
     except asyncio.TimeoutError:
-        logger.error(f"告警发送超时: {name}")
+        logger.warning(f"告警发送超时: {name}")
         return False
     except Exception as e:
-        logger.error(f"告警发送异常: {e}")
+        logger.warning(f"告警发送异常: {name}, {e}")
         return False
 
 
+async def send_alert(
+    name: str,
+    level: AlertLevel,
+    message: str,
+    runbook: str,
+    context: Optional[Dict[str, Any]] = None,
+    webhook_url: Optional[str] = None,
+    skip_cooldown: bool = False
+) -> bool:
+    """
+    发送告警到飞书
+
+    告警交给后台 AlertDispatcher 发送，本函数不等待 Webhook 响应；
+    同名同级别告警在聚合窗口内合并为一张摘要卡片，发送成功后进入冷却。
+
+    Args:
+        name: 告警名称
+        level: 告警级别
+        message: 告警消息
+        runbook: 处理步骤
+        context: 额外上下文信息
+        webhook_url: Webhook URL (不指定则从环境变量读取)
+        skip_cooldown: 是否跳过冷却检查
+
+    Returns:
+        是否已提交 (未配置 Webhook、冷却期内或队列满时返回 False)
+    """
+    webhook = webhook_url or get_webhook_url()
+    if not webhook:
+        logger.warning("FEISHU_WEBHOOK_URL 未配置，跳过告警发送")
+        return False
+
+    # 检查冷却 (存储不可用时不阻止告警)
+    cooldown_key = f"{name}_{level.value}"
+    if not skip_cooldown:
+        try:
+            in_cooldown = await get_cooldown_store().is_active(cooldown_key)
+        except Exception as e:
+            logger.warning(f"告警冷却存储不可用: {e}")
+            in_cooldown = False
+        if in_cooldown:
+            logger.debug(f"告警 {name} 在冷却期内，跳过发送")
+            return False
+
+    return get_alert_dispatcher().submit({
+        "name": name,
+        "level": level,
+        "message": message,
+        "runbook": runbook,
+        "context": context,
+        "webhook": webhook,
+        "skip_cooldown": skip_cooldown,
+        "time": datetime.now(),
+    })
+
+
 # ============ 预定义告警函数 ============
 
 async def check_cookie_exhausted(
@@ -183,7 +490,7 @@ async def check_cookie_exhausted(
         webhook_url: Webhook URL
 
     Returns:
-        是否发送了告警
+        是否已将告警加入发送队列 (未触发、冷却期内或队列满时返回 False)
     """
     active_count = cookie_stats.get("active_count", 0)
     if active_count >= 1:
@@ -251,6 +558,40 @@ async def alert_api_success_rate_low(
     )
 
 
+async def check_api_success_rate(
+    window: str = "5m",
+    min_requests: int = 20,
+    webhook_url: Optional[str] = None
+) -> bool:
+    """
+    按滑动窗口检查 API 成功率并发送告警
+
+    读取最近窗口 (而非进程启动以来的累计值)，故障开始后一个窗口内即可触发。
+    请求数不足 min_requests 时不判断，避免低流量时个别失败误报。
+
+    Args:
+        window: 窗口 (1m / 5m / 15m)
+        min_requests: 最少请求数
+        webhook_url: Webhook URL
+
+    Returns:
+        是否已将告警加入发送队列 (请求数不足、未触发、冷却期内或队列满时返回 False)
+    """
+    stats = get_request_window().snapshot(WINDOWS[window])
+    if stats["total"] < min_requests:
+        return False
+
+    error_codes = stats["error_codes"]
+    top_error_code = max(error_codes, key=error_codes.get) if error_codes else "UNKNOWN"
+
+    return await alert_api_success_rate_low(
+        success_rate=stats["success_rate"],
+        failed_count=stats["error"],
+        top_error_code=top_error_code,
+        webhook_url=webhook_url
+    )
+
+
 async def alert_processing_backlog(
     pending_count: int,
     processing_count: int,
@@ -328,28 +669,53 @@ async def alert_lock_timeout_recovered(
 
 # ============ 告警管理 ============
 
-def clear_cooldown(alert_name: Optional[str] = None):
+_alert_dispatcher: Optional[AlertDispatcher] = None
+
+
+def get_alert_dispatcher() -> AlertDispatcher:
+    """获取告警发送器实例 (单例)"""
+    global _alert_dispatcher
+    if _alert_dispatcher is None:
+        _alert_dispatcher = AlertDispatcher()
+    return _alert_dispatcher
+
+
+async def init_alert_dispatcher() -> AlertDispatcher:
+    """启动告警发送器 (应用启动时调用)"""
+    dispatcher = get_alert_dispatcher()
+    dispatcher.start()
+    return dispatcher
+
+
+async def close_alert_dispatcher() -> None:
+    """发送剩余告警并关闭连接池 (应用关闭时调用)"""
+    if _alert_dispatcher is not None:
+        await _alert_dispatcher.close()
+    await close_cooldown_store()
+
+
+def reset_alert_dispatcher() -> None:
+    """重置告警发送器 (用于测试)"""
+    global _alert_dispatcher
+    _alert_dispatcher = None
+
+
+def clear_cooldown(alert_name: Optional[str] = None) -> int:
     """
     清除告警冷却
 
     Args:
         alert_name: 告警名称，不指定则清除所有
-    """
-    global _alert_cooldown
 
-    if alert_name:
-        keys_to_remove = [k for k in _alert_cooldown if k.startswith(alert_name)]
-        for k in keys_to_remove:
-            del _alert_cooldown[k]
-    else:
-        _alert_cooldown.clear()
+    Returns:
+        清除的条目数
+    """
+    return get_cooldown_store().clear(alert_name)
 
 
 def get_cooldown_status() -> Dict[str, str]:
-    """获取当前冷却状态"""
-    now = datetime.now()
+    """获取当前冷却状态 (只遍历冷却中的告警)"""
     return {
-        k: v.strftime('%Y-%m-%d %H:%M:%S')
-        for k, v in _alert_cooldown.items()
-        if v > now
+        k: datetime.fromtimestamp(until).strftime('%Y-%m-%d %H:%M:%S')
+        for k, until in get_cooldown_store().active().items()
     }
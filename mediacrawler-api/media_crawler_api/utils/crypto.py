@@ -8,6 +8,7 @@ Cookie 加密模块
 2. 主密钥从环境变量加载，不在代码中硬编码
 3. 支持密钥轮换 (通过 key_id 标识)
 4. 使用 PBKDF2 进行密钥派生
+5. 启动时在线程池中并行预派生全部历史密钥 (COOKIE_KEY_*)，避免请求中阻塞事件循环
 
 使用方式:
     from media_crawler_api.utils.crypto import cookie_encryption
@@ -17,11 +18,20 @@ Cookie 加密模块
 
     # 解密
     plaintext = cookie_encryption.decrypt(encrypted, key_id)
+
+    # 带缓存的解密 (热路径使用)
+    plaintext = decrypted_cookie_cache.get_or_decrypt(name, encrypted, key_id)
 """
 
 import os
+import asyncio
 import base64
-from typing import Tuple, Optional
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Optional, Dict, Any
 from cryptography.fernet import Fernet, InvalidToken
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
@@ -33,6 +43,18 @@ class CookieEncryptionError(Exception):
     pass
 
 
+def _pbkdf2_derive(master_key: str, salt: bytes, iterations: int, length: int) -> bytes:
+    """PBKDF2-SHA256 派生 Fernet 密钥 (派生期间释放 GIL，可在线程池中并行执行)"""
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=length,
+        salt=salt,
+        iterations=iterations,
+        backend=default_backend()
+    )
+    return base64.urlsafe_b64encode(kdf.derive(master_key.encode()))
+
+
 class CookieEncryption:
     """
     Cookie 加密管理器
@@ -43,16 +65,30 @@ class CookieEncryption:
     - COOKIE_MASTER_KEY: 主密钥 (必需，至少32字符)
     - COOKIE_KEY_SALT: 密钥派生盐值 (可选，默认 mediacrawler_v3)
     - COOKIE_KEY_ID: 当前密钥ID (可选，默认 key_v1)
+    - COOKIE_KEY_{KEY_ID}: 历史密钥的主密钥 (可选，如 COOKIE_KEY_KEY_V0)
     """
 
     # 密钥派生参数
     KDF_ITERATIONS = 100000
     KEY_LENGTH = 32  # 256 bits
 
+    # 以 COOKIE_KEY_ 开头但不是历史密钥的配置项
+    RESERVED_ENV_VARS = {"COOKIE_KEY_SALT", "COOKIE_KEY_ID"}
+
     def __init__(self):
         self._keys: dict = {}
         self._current_key_id: Optional[str] = None
         self._initialized = False
+        self._init_lock = threading.Lock()
+
+        # 预派生的历史密钥: 环境变量名 -> Fernet
+        self._preloaded: Dict[str, Fernet] = {}
+        self._key_status: Dict[str, Any] = {
+            "state": "pending",     # pending / loading / ready / failed
+            "loaded": [],
+            "failed": {},
+            "duration_ms": None,
+        }
 
     def initialize(self) -> None:
         """
@@ -61,9 +97,12 @@ class CookieEncryption:
         Raises:
             CookieEncryptionError: 如果主密钥未设置或无效
         """
-        if self._initialized:
-            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            self._initialize()
 
+    def _initialize(self) -> None:
         # 从环境变量加载主密钥
         master_key = os.environ.get("COOKIE_MASTER_KEY")
         if not master_key:
@@ -99,15 +138,103 @@ class CookieEncryption:
         Returns:
             派生的 Fernet 密钥 (base64 编码)
         """
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=self.KEY_LENGTH,
-            salt=salt,
-            iterations=self.KDF_ITERATIONS,
-            backend=default_backend()
+        return _pbkdf2_derive(master_key, salt, self.KDF_ITERATIONS, self.KEY_LENGTH)
+
+    @staticmethod
+    def _key_env_var(key_id: str) -> str:
+        """密钥 ID 对应的环境变量名"""
+        return f"COOKIE_KEY_{key_id.upper().replace('-', '_')}"
+
+    def _historical_masters(self) -> Dict[str, str]:
+        """收集已配置的历史主密钥: 环境变量名 -> 主密钥"""
+        return {
+            name: value
+            for name, value in os.environ.items()
+            if name.startswith("COOKIE_KEY_") and name not in self.RESERVED_ENV_VARS and value
+        }
+
+    async def preload_keys(self, max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        预派生当前密钥和全部历史密钥 (应用启动时调用)
+
+        历史密钥在线程池中并行派生 (PBKDF2 在 OpenSSL 中执行，不持有 GIL)，
+        不阻塞事件循环。结果通过 get_key_status() 查询。
+
+        Args:
+            max_workers: 并行派生的线程数 (默认 min(密钥数, CPU 数))
+
+        Returns:
+            密钥加载状态
+        """
+        start = time.monotonic()
+        self._key_status.update(state="loading", loaded=[], failed={}, duration_ms=None)
+
+        try:
+            await asyncio.to_thread(self.initialize)
+        except Exception as e:
+            self._key_status.update(state="failed", failed={"current": str(e)})
+            raise
+
+        masters = {
+            env_var: master for env_var, master in self._historical_masters().items()
+            if env_var not in self._preloaded
+        }
+
+        if masters:
+            salt = os.environ.get("COOKIE_KEY_SALT", "mediacrawler_v3").encode()
+            workers = max_workers or min(len(masters), os.cpu_count() or 1)
+            loop = asyncio.get_running_loop()
+
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="key-preload")
+            try:
+                results = await asyncio.gather(*(
+                    loop.run_in_executor(
+                        executor, _pbkdf2_derive, master, salt, self.KDF_ITERATIONS, self.KEY_LENGTH
+                    )
+                    for master in masters.values()
+                ), return_exceptions=True)
+            finally:
+                # 不等待: 预加载被取消时不在事件循环线程上阻塞，进行中的派生自行结束
+                executor.shutdown(wait=False, cancel_futures=True)
+
+            for env_var, result in zip(masters, results):
+                if isinstance(result, BaseException):
+                    self._key_status["failed"][env_var] = str(result)
+                else:
+                    self._preloaded[env_var] = Fernet(result)
+                    self._key_status["loaded"].append(env_var)
+
+        self._key_status.update(
+            state="failed" if self._key_status["failed"] else "ready",
+            duration_ms=int((time.monotonic() - start) * 1000)
         )
-        key = kdf.derive(master_key.encode())
-        return base64.urlsafe_b64encode(key)
+        return self.get_key_status()
+
+    async def ensure_key(self, key_id: str) -> None:
+        """
+        确保密钥已加载，需要派生时在线程池中执行
+
+        Raises:
+            CookieEncryptionError: 密钥未配置
+        """
+        if self._initialized and key_id in self._keys:
+            return
+        await asyncio.to_thread(self._ensure_key, key_id)
+
+    def _ensure_key(self, key_id: str) -> None:
+        if not self._initialized:
+            self.initialize()
+        if key_id not in self._keys:
+            self._load_historical_key(key_id)
+
+    def get_key_status(self) -> Dict[str, Any]:
+        """获取密钥加载状态 (用于就绪检查)"""
+        return {
+            **self._key_status,
+            "current_key_id": self._current_key_id,
+            "loaded": list(self._key_status["loaded"]),
+            "failed": dict(self._key_status["failed"]),
+        }
 
     def encrypt(self, plaintext: str) -> Tuple[str, str]:
         """
@@ -188,7 +315,13 @@ class CookieEncryption:
         """
         # 环境变量格式: COOKIE_KEY_{KEY_ID} = master_key
         # 例如: COOKIE_KEY_KEY_V0 = old_master_key
-        env_var = f"COOKIE_KEY_{key_id.upper().replace('-', '_')}"
+        env_var = self._key_env_var(key_id)
+
+        # 启动时已预派生
+        if env_var in self._preloaded:
+            self._keys[key_id] = self._preloaded[env_var]
+            return
+
         historical_master = os.environ.get(env_var)
 
         if not historical_master:
@@ -227,8 +360,128 @@ class CookieEncryption:
         return self._initialized
 
 
+class DecryptedCookieCache:
+    """
+    解密结果缓存
+
+    避免每次请求都执行 Fernet 解密 (base64 解码 + HMAC 校验 + AES 解密)。
+    按 Cookie 名称存储，命中需 key_id 和密文摘要一致，密文或密钥变化时自然失效；
+    Cookie 更新/删除/轮换时仍应显式 invalidate，及时清除内存中的明文。
+
+    明文以 bytearray 保存，淘汰和清空时先覆写为零。
+
+    环境变量配置:
+    - COOKIE_PLAINTEXT_CACHE_TTL: 缓存有效期 (秒，默认 60，0 表示关闭)
+    - COOKIE_PLAINTEXT_CACHE_MAX: 最大条目数 (默认 1024)
+    """
+
+    DEFAULT_TTL_SECONDS = 60
+    DEFAULT_MAX_ENTRIES = 1024
+
+    def __init__(
+        self,
+        encryption: CookieEncryption,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None
+    ):
+        self._encryption = encryption
+        self.ttl = float(
+            ttl if ttl is not None
+            else os.environ.get("COOKIE_PLAINTEXT_CACHE_TTL", self.DEFAULT_TTL_SECONDS)
+        )
+        self.max_entries = int(
+            max_entries if max_entries is not None
+            else os.environ.get("COOKIE_PLAINTEXT_CACHE_MAX", self.DEFAULT_MAX_ENTRIES)
+        )
+        # name -> (key_id, 密文摘要, 过期时间, 明文)；每个 Cookie 只保留最新密文的条目
+        self._entries: "OrderedDict[str, Tuple[str, str, float, bytearray]]" = OrderedDict()
+        # 解密可能在线程池中执行 (如批量密钥轮换)，使用线程锁
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    @staticmethod
+    def _digest(encrypted_value: str) -> str:
+        return hashlib.sha256(encrypted_value.encode("ascii")).hexdigest()[:32]
+
+    def get_or_decrypt(self, name: str, encrypted_value: str, key_id: str) -> str:
+        """
+        获取解密后的 Cookie，未命中时解密并写入缓存
+
+        Args:
+            name: Cookie 名称
+            encrypted_value: 加密后的值
+            key_id: 密钥 ID
+
+        Returns:
+            明文 Cookie
+
+        Raises:
+            CookieEncryptionError: 解密失败
+        """
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return self._encryption.decrypt(encrypted_value, key_id)
+
+        digest = self._digest(encrypted_value)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                entry_key_id, entry_digest, expires_at, buffer = entry
+                if entry_key_id == key_id and entry_digest == digest and expires_at > now:
+                    self._entries.move_to_end(name)
+                    self._stats["hits"] += 1
+                    return buffer.decode("utf-8")
+                self._remove(name)
+            self._stats["misses"] += 1
+
+        plaintext = self._encryption.decrypt(encrypted_value, key_id)
+
+        with self._lock:
+            if name in self._entries:
+                self._remove(name)
+            self._entries[name] = (
+                key_id, digest, now + self.ttl, bytearray(plaintext.encode("utf-8"))
+            )
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+        return plaintext
+
+    def _remove(self, name: str) -> None:
+        """移除条目并将明文覆写为零 (调用方需持有 _lock)"""
+        buffer = self._entries.pop(name)[3]
+        buffer[:] = bytes(len(buffer))
+
+    def invalidate(self, name: str) -> None:
+        """清除指定 Cookie 的缓存 (更新/删除/轮换时调用)"""
+        with self._lock:
+            if name in self._entries:
+                self._remove(name)
+                self._stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        """清空缓存并覆写全部明文 (应用关闭时调用)"""
+        with self._lock:
+            for name in list(self._entries):
+                self._remove(name)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计"""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            **self._stats,
+            "hit_rate": self._stats["hits"] / lookups if lookups else 0,
+        }
+
+
 # 创建单例实例
 cookie_encryption = CookieEncryption()
+decrypted_cookie_cache = DecryptedCookieCache(cookie_encryption)
 
 
 # ============ 便捷函数 ============
@@ -13,10 +13,33 @@
 
     logger = get_logger(__name__)
     logger.info("处理请求", extra={"request_id": "xxx"})
+
+异步日志 (可选):
+    设置 LOG_ASYNC=true 后，日志器通过有界队列把记录交给后台线程，
+    格式化、脱敏和写 stdout 都不在调用线程 (事件循环) 上执行。
+    队列满时丢弃记录并计数 (WARNING 及以上会短暂等待)，进程退出时自动刷新。
+    - LOG_QUEUE_SIZE: 队列容量 (默认 10000)
+
+采样与限流 (可选，只作用于 INFO 及以下级别):
+    规则键为 "日志器名" 或 "日志器名:事件"，事件取 extra={"event": ...}，
+    缺省为调用函数名；日志器名按前缀向上匹配。
+    - LOG_SAMPLE_RATES: 采样率，如
+      "media_crawler_api.services.crawler=0.1,media_crawler_api.routers.crawler:get_note_detail=0.2"
+      同一 request_id 的采样结果固定，被采中的请求保留全部日志行 (不再受限流)
+    - LOG_RATE_LIMITS: 每秒条数[/突发]，如 "media_crawler_api.services.crawler=20/50"
+    - LOG_SUPPRESSED_SUMMARY_INTERVAL: 后台线程输出被抑制条数汇总的间隔秒数 (默认 60)
 """
 
 import re
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+import time
+import zlib
 import json
 import sys
 from typing import Any, Dict, Tuple, List, Optional
@@ -78,6 +101,81 @@ SENSITIVE_KEYS = {
 }
 
 
+class LogSanitizer:
+    """
+    单遍脱敏引擎
+
+    将多条脱敏规则合并为一个交替正则，一次扫描完成全部替换，
+    匹配后按命中的规则展开对应的替换模板。
+
+    快速路径: 所有规则都以关键词开头并包含 '=' 或 ':'，
+    消息中不含这两个字符或不含任何关键词时直接返回原消息。
+    """
+
+    # 关键词提取: 规则开头的字面量或字面量分组，如 (token|access_token)
+    _KEYWORD_HEAD = re.compile(r'^\(?"?([\w\-|]+)\)?')
+
+    def __init__(self, patterns: List[Tuple[re.Pattern, str]]):
+        """
+        初始化脱敏引擎
+
+        Args:
+            patterns: (正则, 替换模板) 列表，语义与逐条 pattern.sub 一致
+        """
+        self.patterns = list(patterns)
+
+        combined = "|".join(
+            f"(?P<_p{i}>{pattern.pattern})" for i, (pattern, _) in enumerate(self.patterns)
+        )
+        flags = re.IGNORECASE if all(p.flags & re.IGNORECASE for p, _ in self.patterns) else 0
+        self._combined = re.compile(combined, flags)
+
+        # 将各规则替换模板中的 \N 改写为合并正则中的绝对分组号
+        self._templates: Dict[str, str] = {}
+        for i, (_, replacement) in enumerate(self.patterns):
+            offset = self._combined.groupindex[f"_p{i}"]
+            self._templates[f"_p{i}"] = re.sub(
+                r'\\(\d+)', lambda m, o=offset: f"\\g<{o + int(m.group(1))}>", replacement
+            )
+
+        self._keywords = self._extract_keywords()
+
+    def _extract_keywords(self) -> Optional[List[str]]:
+        """提取各规则的小写关键词，无法提取时返回 None (不使用关键词预过滤)"""
+        keywords = []
+        for pattern, _ in self.patterns:
+            match = self._KEYWORD_HEAD.match(pattern.pattern)
+            if not match:
+                return None
+            keywords.extend(k.lower() for k in match.group(1).split("|") if k)
+        # 去掉被更短关键词覆盖的关键词 (如 access_token 已被 token 覆盖)
+        return sorted(
+            {k for k in keywords if not any(o != k and o in k for o in keywords)},
+            key=len
+        )
+
+    def _replace(self, match: re.Match) -> str:
+        return match.expand(self._templates[match.lastgroup])
+
+    def has_candidate(self, message: str) -> bool:
+        """快速判断消息是否可能包含敏感信息"""
+        if "=" not in message and ":" not in message:
+            return False
+        if self._keywords is None:
+            return True
+        lowered = message.lower()
+        return any(keyword in lowered for keyword in self._keywords)
+
+    def sanitize(self, message: str) -> str:
+        """脱敏消息"""
+        if not self.has_candidate(message):
+            return message
+        return self._combined.sub(self._replace, message)
+
+
+_sanitizer = LogSanitizer(SENSITIVE_PATTERNS)
+
+
 def sanitize_log(message: str) -> str:
     """
     脱敏日志消息字符串
@@ -95,10 +193,7 @@ def sanitize_log(message: str) -> str:
     if not message:
         return message
 
-    result = str(message)
-    for pattern, replacement in SENSITIVE_PATTERNS:
-        result = pattern.sub(replacement, result)
-    return result
+    return _sanitizer.sanitize(str(message))
 
 
 def sanitize_dict(data: Dict[str, Any], max_depth: int = 10) -> Dict[str, Any]:
@@ -151,7 +246,7 @@ class SanitizedFormatter(logging.Formatter):
 
         # 脱敏消息
         if record.msg:
-            record.msg = sanitize_log(str(record.msg))
+            record.msg = sanitize_log(record.msg)
 
         # 脱敏参数
         if record.args:
@@ -181,6 +276,331 @@ class RequestIdFilter(logging.Filter):
         return True
 
 
+# ============ 异步日志管道 ============
+
+# 不可变类型的参数可以原样跨线程传递，其余参数在入队前合并进消息
+_IMMUTABLE_ARG_TYPES = (str, int, float, bool, type(None), bytes)
+
+
+def is_async_logging_enabled() -> bool:
+    """是否启用异步日志 (LOG_ASYNC)"""
+    return os.environ.get("LOG_ASYNC", "false").lower() in ("1", "true", "yes")
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    有界队列处理器
+
+    在调用线程只做最少的工作: 补全 request_id (上下文变量只能在调用线程读取)，
+    必要时合并可变参数，然后非阻塞入队。队列满时丢弃并计数。
+    """
+
+    # WARNING 及以上级别在队列满时最多等待的秒数
+    BLOCK_TIMEOUT_SECONDS = 0.1
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.enqueued = 0
+        self.dropped = 0
+        self._lock_counters = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if not getattr(record, 'request_id', None):
+            record.request_id = current_request_id.get()
+
+        # 可变参数可能在后台线程格式化前被修改，提前合并
+        if record.args and not (
+            isinstance(record.args, tuple)
+            and all(isinstance(arg, _IMMUTABLE_ARG_TYPES) for arg in record.args)
+        ):
+            record.msg = record.getMessage()
+            record.args = None
+
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if record.levelno >= logging.WARNING:
+                self.queue.put(record, timeout=self.BLOCK_TIMEOUT_SECONDS)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock_counters:
+                self.dropped += 1
+            return
+        with self._lock_counters:
+            self.enqueued += 1
+
+
+class _AsyncLogPipeline:
+    """单个输出格式的异步管道: 有界队列 + 后台监听线程 + stdout 处理器"""
+
+    def __init__(self, formatter: logging.Formatter, capacity: int):
+        self.capacity = capacity
+        self.queue: queue.Queue = queue.Queue(maxsize=capacity)
+        self.handler = BoundedQueueHandler(self.queue)
+
+        target = logging.StreamHandler(sys.stdout)
+        target.setFormatter(formatter)
+        self.listener = logging.handlers.QueueListener(
+            self.queue, target, respect_handler_level=True
+        )
+        self.listener.start()
+
+    def stop(self) -> None:
+        """停止监听线程 (会先处理完队列中剩余的记录)"""
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "queued": self.queue.qsize(),
+            "capacity": self.capacity,
+            "enqueued": self.handler.enqueued,
+            "dropped": self.handler.dropped,
+        }
+
+
+_async_pipelines: Dict[str, _AsyncLogPipeline] = {}
+_async_pipelines_lock = threading.Lock()
+
+
+def _get_async_handler(kind: str, formatter: logging.Formatter) -> logging.Handler:
+    """获取指定输出格式的异步队列处理器 (同一格式共享一个后台线程)"""
+    with _async_pipelines_lock:
+        pipeline = _async_pipelines.get(kind)
+        if pipeline is None:
+            capacity = int(os.environ.get("LOG_QUEUE_SIZE", 10000))
+            pipeline = _AsyncLogPipeline(formatter, capacity)
+            _async_pipelines[kind] = pipeline
+        return pipeline.handler
+
+
+def shutdown_async_logging() -> None:
+    """刷新并停止全部异步日志管道 (进程退出时自动调用)"""
+    with _async_pipelines_lock:
+        pipelines = list(_async_pipelines.items())
+        _async_pipelines.clear()
+
+    for kind, pipeline in pipelines:
+        pipeline.stop()
+        if pipeline.handler.dropped:
+            sys.stderr.write(
+                f"异步日志队列 {kind} 共丢弃 {pipeline.handler.dropped} 条记录\n"
+            )
+
+
+atexit.register(shutdown_async_logging)
+
+
+def get_logging_stats() -> Dict[str, Any]:
+    """获取日志统计 (异步队列长度/入队数/丢弃数，采样抑制数)"""
+    return {
+        "async": is_async_logging_enabled(),
+        "pipelines": {kind: p.get_stats() for kind, p in _async_pipelines.items()},
+        "sampling": get_sampling_filter().get_stats(),
+    }
+
+
+# ============ 采样与限流 ============
+
+# 汇总日志器名称 (自身不参与采样)
+SAMPLING_SUMMARY_LOGGER = "media_crawler_api.log_sampling"
+
+
+class _TokenBucket:
+    """令牌桶"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+
+def _parse_rules(value: str) -> Dict[str, str]:
+    """解析 "键=值,键=值" 格式的规则"""
+    rules = {}
+    for item in (value or "").split(","):
+        key, sep, rule = item.strip().rpartition("=")
+        if sep and key.strip() and rule.strip():
+            rules[key.strip()] = rule.strip()
+    return rules
+
+
+class LogSamplingFilter(logging.Filter):
+    """
+    日志采样与限流过滤器
+
+    挂在日志器上，在调用线程中尽早丢弃记录，省去格式化、脱敏和写入。
+    WARNING 及以上级别始终保留。首次抑制记录时启动后台线程，
+    按 summary_interval 定期输出被抑制条数汇总。
+    """
+
+    def __init__(
+        self,
+        sample_rates: Optional[Dict[str, float]] = None,
+        rate_limits: Optional[Dict[str, Tuple[float, float]]] = None,
+        summary_interval: float = 60.0
+    ):
+        """
+        初始化过滤器
+
+        Args:
+            sample_rates: 规则键 -> 采样率 (0-1)
+            rate_limits: 规则键 -> (每秒条数, 突发容量)
+            summary_interval: 输出被抑制条数汇总的间隔秒数
+        """
+        super().__init__()
+        self.sample_rates = sample_rates or {}
+        self.rate_limits = rate_limits or {}
+        self.summary_interval = summary_interval
+
+        self._buckets: Dict[str, _TokenBucket] = {
+            key: _TokenBucket(rate, burst) for key, (rate, burst) in self.rate_limits.items()
+        }
+        # (日志器名, 事件) -> (采样规则键, 采样率, 限流规则键)
+        self._resolved: Dict[Tuple[str, str], Tuple[Optional[str], Optional[float], Optional[str]]] = {}
+        self._suppressed: Dict[str, int] = {}
+        self._suppressed_total = 0
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._summary_thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls) -> "LogSamplingFilter":
+        """根据环境变量创建"""
+        sample_rates = {
+            key: float(rate) for key, rate in _parse_rules(os.environ.get("LOG_SAMPLE_RATES", "")).items()
+        }
+        rate_limits = {}
+        for key, rule in _parse_rules(os.environ.get("LOG_RATE_LIMITS", "")).items():
+            rate, _, burst = rule.partition("/")
+            rate_limits[key] = (float(rate), float(burst) if burst else max(float(rate), 1.0))
+        return cls(
+            sample_rates=sample_rates,
+            rate_limits=rate_limits,
+            summary_interval=float(os.environ.get("LOG_SUPPRESSED_SUMMARY_INTERVAL", 60))
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.sample_rates or self.rate_limits)
+
+    @staticmethod
+    def _match(table: Dict[str, Any], logger_name: str, event: str) -> Optional[str]:
+        """按 日志器:事件 -> 日志器 -> 上级日志器 的顺序查找规则键"""
+        name = logger_name
+        while name:
+            for key in (f"{name}:{event}", name):
+                if key in table:
+                    return key
+            name = name.rpartition(".")[0]
+        return None
+
+    def _resolve(self, logger_name: str, event: str):
+        resolved = self._resolved.get((logger_name, event))
+        if resolved is None:
+            sample_key = self._match(self.sample_rates, logger_name, event)
+            rate = self.sample_rates[sample_key] if sample_key else None
+            limit_key = self._match(self.rate_limits, logger_name, event)
+            resolved = (sample_key, rate, limit_key)
+            self._resolved[(logger_name, event)] = resolved
+        return resolved
+
+    @staticmethod
+    def _is_sampled(record: logging.LogRecord, rate: float) -> bool:
+        """同一 request_id 的采样结果固定 (按哈希值与采样率比较)"""
+        request_id = getattr(record, 'request_id', None) or current_request_id.get()
+        if not request_id or request_id == '-':
+            return random.random() < rate
+        return zlib.crc32(request_id.encode()) / 0xFFFFFFFF < rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if (
+            not self.enabled
+            or record.levelno >= logging.WARNING
+            or record.name == SAMPLING_SUMMARY_LOGGER
+        ):
+            return True
+
+        event = getattr(record, 'event', None) or record.funcName
+        sample_key, rate, limit_key = self._resolve(record.name, event)
+
+        keep = True
+        if rate is not None and rate < 1:
+            # 采样决定去留，被采中的请求保留全部日志行，不再经过限流
+            keep = self._is_sampled(record, rate)
+        elif limit_key is not None:
+            with self._lock:
+                keep = self._buckets[limit_key].take()
+
+        if not keep:
+            key = f"{record.name}:{event}"
+            with self._lock:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                self._suppressed_total += 1
+                if self._summary_thread is None and not self._closed.is_set():
+                    self._summary_thread = threading.Thread(
+                        target=self._summary_loop, name="log-sampling-summary", daemon=True
+                    )
+                    self._summary_thread.start()
+
+        return keep
+
+    def _summary_loop(self) -> None:
+        while not self._closed.wait(self.summary_interval):
+            self.emit_summary()
+
+    def emit_summary(self) -> None:
+        """输出并清空被抑制条数汇总 (后台线程按 summary_interval 定期调用)"""
+        with self._lock:
+            suppressed, self._suppressed = self._suppressed, {}
+
+        if suppressed:
+            get_logger(SAMPLING_SUMMARY_LOGGER).info(
+                f"日志采样/限流抑制统计 (近 {int(self.summary_interval)} 秒): "
+                f"total={sum(suppressed.values())}, detail={suppressed}"
+            )
+
+    def close(self) -> None:
+        """停止汇总线程并输出剩余的汇总 (进程退出时自动调用)"""
+        self._closed.set()
+        thread = self._summary_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.emit_summary()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "suppressed_total": self._suppressed_total,
+            "suppressed_pending": dict(self._suppressed),
+        }
+
+
+_sampling_filter: Optional[LogSamplingFilter] = None
+
+
+def get_sampling_filter() -> LogSamplingFilter:
+    """获取采样过滤器 (单例，配置来自环境变量)"""
+    global _sampling_filter
+    if _sampling_filter is None:
+        _sampling_filter = LogSamplingFilter.from_env()
+        # 晚于 shutdown_async_logging 注册，退出时先输出汇总再停止异步管道
+        atexit.register(_sampling_filter.close)
+    return _sampling_filter
+
+
 def get_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     """
     获取脱敏日志器
@@ -204,16 +624,22 @@ def get_logger(name: str, level: int = logging.INFO) -> logging.Logger:
 
     logger.setLevel(level)
     logger.propagate = False
-
-    # 创建控制台处理器
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(level)
+    logger.addFilter(get_sampling_filter())
 
     # 设置脱敏格式化器
     formatter = SanitizedFormatter(
         fmt='%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
+
+    if is_async_logging_enabled():
+        # 异步模式: 格式化和写入在后台线程执行
+        logger.addHandler(_get_async_handler("text", formatter))
+        return logger
+
+    # 创建控制台处理器
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setLevel(level)
     handler.setFormatter(formatter)
 
     # 添加请求 ID 过滤器
@@ -325,6 +751,11 @@ def get_json_logger(name: str, level: int = logging.INFO) -> logging.Logger:
 
     logger.setLevel(level)
     logger.propagate = False
+    logger.addFilter(get_sampling_filter())
+
+    if is_async_logging_enabled():
+        logger.addHandler(_get_async_handler("json", JSONFormatter()))
+        return logger
 
     handler = logging.StreamHandler(sys.stdout)
     handler.setLevel(level)
@@ -0,0 +1,438 @@
+"""
+指标注册表
+
+提供 Prometheus 风格的指标类型，并按 Prometheus 文本格式 (0.0.4) 输出:
+- Counter: 单调递增计数器
+- Gauge: 可增可减的瞬时值
+- Histogram: 固定分桶直方图 (记录时 O(log 桶数)，输出时累加)
+
+所有指标都支持标签，同一组标签值对应一个子指标，创建后缓存复用。
+
+内置应用指标:
+- mediacrawler_api_requests_total / mediacrawler_api_request_duration_seconds:
+  路由级请求数和延迟，按 route / status / error_code 区分
+  (同时写入滑动窗口统计，供 /health 和告警检查读取近期成功率)
+- mediacrawler_backend_requests_total / mediacrawler_backend_request_duration_seconds:
+  MediaCrawler 后端调用数和延迟，按 operation / status / error_code 区分
+- mediacrawler_cache_lookups_total:
+  缓存查询数，按 cache (note / search) 和 result (hits / misses / coalesced) 区分
+"""
+
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Optional, Dict, List, Tuple, Sequence, Iterator
+import math
+import threading
+
+from .sliding_window import get_request_window
+
+
+# Prometheus 文本格式的 Content-Type
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 默认延迟分桶 (秒)，覆盖缓存命中到后端超时的范围
+DEFAULT_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+
+def _format_value(value: float) -> str:
+    """格式化样本值"""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label_value(value: str) -> str:
+    """转义标签值中的反斜杠、双引号和换行"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """格式化标签集合，如 {route="search",status="success"}"""
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape_label_value(value)}"'
+        for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class _Metric(ABC):
+    """指标基类: 管理标签和子指标"""
+
+    TYPE = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """
+        初始化指标
+
+        Args:
+            name: 指标名
+            documentation: HELP 说明
+            labelnames: 标签名列表
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str, **kwargs: str):
+        """
+        获取一组标签值对应的子指标
+
+        Args:
+            values: 按 labelnames 顺序的标签值
+            kwargs: 按名称指定的标签值
+
+        Returns:
+            子指标
+        """
+        if kwargs:
+            if values:
+                raise ValueError("标签值不能同时按位置和名称指定")
+            try:
+                values = tuple(kwargs[name] for name in self.labelnames)
+            except KeyError as e:
+                raise ValueError(f"缺少标签: {e}")
+            if len(kwargs) != len(self.labelnames):
+                raise ValueError(f"标签不匹配: {sorted(kwargs)} != {list(self.labelnames)}")
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"标签数量不匹配: {len(values)} != {len(self.labelnames)}")
+
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._new_child()
+                    self._children[key] = child
+        return child
+
+    def _default_child(self):
+        """无标签指标直接操作的子指标"""
+        if self.labelnames:
+            raise ValueError(f"指标 {self.name} 有标签，需先调用 labels()")
+        return self.labels()
+
+    @abstractmethod
+    def _new_child(self):
+        """创建一个子指标"""
+
+    @abstractmethod
+    def _samples(self, key: Tuple[str, ...], child) -> Iterator[Tuple[str, str, float]]:
+        """生成 (样本名, 标签字符串, 值)"""
+
+    def clear(self) -> None:
+        """清空所有子指标"""
+        with self._lock:
+            self._children.clear()
+
+    def render(self) -> List[str]:
+        """输出 Prometheus 文本格式的行"""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.TYPE}",
+        ]
+        for key, child in sorted(self._children.items()):
+            for sample_name, labels, value in self._samples(key, child):
+                lines.append(f"{sample_name}{labels} {_format_value(value)}")
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("Counter 只能递增")
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    """单调递增计数器"""
+
+    TYPE = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """递增 (无标签指标)"""
+        self._default_child().inc(amount)
+
+    def _samples(self, key, child):
+        yield self.name, _format_labels(self.labelnames, key), child.value
+
+
+class _GaugeChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+
+class Gauge(_Metric):
+    """可增可减的瞬时值"""
+
+    TYPE = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        """设置值 (无标签指标)"""
+        self._default_child().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        """增加 (无标签指标)"""
+        self._default_child().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        """减少 (无标签指标)"""
+        self._default_child().dec(amount)
+
+    def _samples(self, key, child):
+        yield self.name, _format_labels(self.labelnames, key), child.value
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # 最后一个桶对应 +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+
+class Histogram(_Metric):
+    """
+    固定分桶直方图
+
+    每个桶只记录落入自身区间的次数，输出时再累加为 Prometheus 的 le 累计桶。
+    """
+
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ):
+        """
+        初始化直方图
+
+        Args:
+            name: 指标名
+            documentation: HELP 说明
+            labelnames: 标签名列表
+            buckets: 桶上界 (升序，不含 +Inf)
+        """
+        bounds = tuple(sorted(float(b) for b in buckets if not math.isinf(b)))
+        if not bounds:
+            raise ValueError("Histogram 至少需要一个有限桶")
+        if "le" in labelnames:
+            raise ValueError("Histogram 不能使用 le 作为标签名")
+        super().__init__(name, documentation, labelnames)
+        self.buckets = bounds
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """记录一次观测值 (无标签指标)"""
+        self._default_child().observe(value)
+
+    def _samples(self, key, child):
+        with child._lock:
+            counts = list(child.counts)
+            total_sum = child.sum
+            total_count = child.count
+
+        labelnames = self.labelnames + ("le",)
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), counts):
+            cumulative += count
+            yield (
+                f"{self.name}_bucket",
+                _format_labels(labelnames, key + (_format_value(bound),)),
+                cumulative
+            )
+        labels = _format_labels(self.labelnames, key)
+        yield f"{self.name}_sum", labels, total_sum
+        yield f"{self.name}_count", labels, total_count
+
+
+class MetricsRegistry:
+    """
+    指标注册表
+
+    同名指标只注册一次，重复获取返回同一实例。
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, documentation, labelnames, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"指标 {name} 已以不同类型或标签注册")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """注册或获取 Counter"""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """注册或获取 Gauge"""
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ) -> Histogram:
+        """注册或获取 Histogram"""
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        """按名称获取已注册的指标"""
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """输出 Prometheus 文本格式"""
+        lines: List[str] = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].render())
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        """清空所有指标的样本 (用于测试)"""
+        for metric in list(self._metrics.values()):
+            metric.clear()
+
+
+# 全局注册表
+metrics_registry = MetricsRegistry()
+
+
+# ============ 应用指标 ============
+
+API_REQUESTS = metrics_registry.counter(
+    "mediacrawler_api_requests_total",
+    "API 请求数",
+    ("route", "status", "error_code")
+)
+
+API_REQUEST_DURATION = metrics_registry.histogram(
+    "mediacrawler_api_request_duration_seconds",
+    "API 请求延迟 (秒)",
+    ("route", "status")
+)
+
+BACKEND_REQUESTS = metrics_registry.counter(
+    "mediacrawler_backend_requests_total",
+    "MediaCrawler 后端调用数",
+    ("operation", "status", "error_code")
+)
+
+BACKEND_REQUEST_DURATION = metrics_registry.histogram(
+    "mediacrawler_backend_request_duration_seconds",
+    "MediaCrawler 后端调用延迟 (秒)",
+    ("operation", "status")
+)
+
+CACHE_LOOKUPS = metrics_registry.counter(
+    "mediacrawler_cache_lookups_total",
+    "缓存查询数",
+    ("cache", "result")
+)
+
+
+def observe_api_request(route: str, success: bool, error_code: str, seconds: float) -> None:
+    """
+    记录一次 API 请求
+
+    Args:
+        route: 路由名 (如 search / note_detail / note)
+        success: 是否成功
+        error_code: 错误码，成功时为空字符串
+        seconds: 耗时 (秒)
+    """
+    status = "success" if success else "error"
+    API_REQUESTS.labels(route, status, error_code).inc()
+    API_REQUEST_DURATION.labels(route, status).observe(seconds)
+    get_request_window().record(success, seconds, error_code)
+
+
+def observe_backend_call(operation: str, status: str, error_code: str, seconds: float) -> None:
+    """
+    记录一次 MediaCrawler 后端调用
+
+    Args:
+        operation: 调用类型 (如 search / note / comments)
+        status: HTTP 状态码，或 timeout / network_error 等无响应状态
+        error_code: 错误码，成功时为空字符串
+        seconds: 耗时 (秒)
+    """
+    BACKEND_REQUESTS.labels(operation, status, error_code).inc()
+    BACKEND_REQUEST_DURATION.labels(operation, status).observe(seconds)
+
+
+def observe_cache_lookup(cache: str, result: str) -> None:
+    """
+    记录一次缓存查询
+
+    Args:
+        cache: 缓存名 (note / search)
+        result: 查询结果 (hits / misses / coalesced)
+    """
+    CACHE_LOOKUPS.labels(cache, result).inc()
+
+
+def render_prometheus() -> str:
+    """输出全局注册表的 Prometheus 文本格式"""
+    return metrics_registry.render()
@@ -0,0 +1,195 @@
+"""
+资源采样
+
+后台任务按固定间隔采样 CPU、内存和打开的文件描述符，健康检查和指标端点
+只读取最近一次快照，不在请求路径上调用阻塞的 psutil.cpu_percent(interval=...)。
+
+CPU 使用率用 interval=None 计算两次采样之间的平均值，采样本身在线程中执行。
+
+环境变量:
+- RESOURCE_SAMPLE_INTERVAL: 采样间隔 (秒)，默认 5
+"""
+
+from datetime import datetime
+from typing import Optional, Dict, Any
+import asyncio
+import os
+import time
+
+import psutil
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class ResourceSampler:
+    """
+    资源采样器
+
+    snapshot() 为 O(1) 读取；首次读取时若后台任务未启动则按需启动。
+    """
+
+    # 默认采样间隔 (秒)
+    DEFAULT_INTERVAL = 5.0
+
+    def __init__(self, interval: Optional[float] = None):
+        """
+        初始化采样器
+
+        Args:
+            interval: 采样间隔 (秒)，默认读取 RESOURCE_SAMPLE_INTERVAL
+        """
+        self.interval = interval or float(
+            os.environ.get("RESOURCE_SAMPLE_INTERVAL", self.DEFAULT_INTERVAL)
+        )
+        self._process = psutil.Process()
+        self._task: Optional[asyncio.Task] = None
+        self._snapshot: Dict[str, Any] = {}
+        self._sampled_at = 0.0
+        self._errors = 0
+
+        # 建立 CPU 基线: interval=None 的首次调用返回 0，之后返回距上次调用的平均值
+        try:
+            self._process.cpu_percent(interval=None)
+            psutil.cpu_percent(interval=None)
+        except Exception:
+            pass
+
+    def start(self) -> None:
+        """启动后台采样任务 (需在事件循环中调用)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"资源采样已启动: interval={self.interval}s")
+
+    async def close(self) -> None:
+        """停止后台采样任务"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def is_running(self) -> bool:
+        """后台采样任务是否在运行"""
+        return self._task is not None and not self._task.done()
+
+    async def _run(self) -> None:
+        if not self._snapshot:
+            await self.sample()
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.sample()
+
+    async def sample(self) -> Dict[str, Any]:
+        """立即采样一次 (在线程中执行 psutil 调用)"""
+        try:
+            snapshot = await asyncio.to_thread(self._collect)
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"资源采样失败: {e}")
+            return self._snapshot
+
+        self._snapshot = snapshot
+        self._sampled_at = time.monotonic()
+        return snapshot
+
+    def _collect(self) -> Dict[str, Any]:
+        """读取当前资源使用情况 (不阻塞等待)"""
+        process = self._process
+        memory_info = process.memory_info()
+        system_memory = psutil.virtual_memory()
+
+        open_fds = None
+        fd_limit = None
+        try:
+            if hasattr(process, "num_fds"):
+                open_fds = process.num_fds()
+                if hasattr(process, "rlimit"):
+                    fd_limit = process.rlimit(psutil.RLIMIT_NOFILE)[0]
+            else:
+                open_fds = process.num_handles()
+        except (psutil.Error, OSError, AttributeError):
+            pass
+
+        return {
+            "cpu_process_percent": round(process.cpu_percent(interval=None), 2),
+            "cpu_system_percent": round(psutil.cpu_percent(interval=None), 2),
+            "memory_rss_bytes": memory_info.rss,
+            "memory_system_percent": system_memory.percent,
+            "open_fds": open_fds,
+            # 无限制时 RLIM_INFINITY 为负数
+            "fd_limit": fd_limit if fd_limit and fd_limit > 0 else None,
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        获取最近一次采样结果
+
+        Returns:
+            资源快照，附带 age_seconds (距上次采样的秒数)；采样失败时为空字典
+        """
+        if not self.is_running():
+            try:
+                self.start()
+            except RuntimeError:
+                # 没有运行中的事件循环
+                pass
+
+        if not self._snapshot:
+            # 未调用 init_resource_sampler 时首次读取: 同步采样一次 (不含等待，开销为几次系统调用)
+            try:
+                self._snapshot = self._collect()
+                self._sampled_at = time.monotonic()
+            except Exception as e:
+                self._errors += 1
+                logger.warning(f"资源采样失败: {e}")
+                return {}
+        return {
+            **self._snapshot,
+            "age_seconds": round(time.monotonic() - self._sampled_at, 2),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取采样器状态"""
+        return {
+            "running": self.is_running(),
+            "interval_seconds": self.interval,
+            "errors": self._errors,
+        }
+
+
+# ============ 依赖注入 ============
+
+_resource_sampler: Optional[ResourceSampler] = None
+
+
+def get_resource_sampler() -> ResourceSampler:
+    """获取资源采样器实例 (单例)"""
+    global _resource_sampler
+    if _resource_sampler is None:
+        _resource_sampler = ResourceSampler()
+    return _resource_sampler
+
+
+async def init_resource_sampler() -> ResourceSampler:
+    """启动资源采样 (应用启动时调用)，返回前完成首次采样"""
+    sampler = get_resource_sampler()
+    await sampler.sample()
+    sampler.start()
+    return sampler
+
+
+async def close_resource_sampler() -> None:
+    """停止资源采样 (应用关闭时调用)"""
+    if _resource_sampler is not None:
+        await _resource_sampler.close()
+
+
+def reset_resource_sampler() -> None:
+    """重置资源采样器 (用于测试)"""
+    global _resource_sampler
+    _resource_sampler = None
@@ -0,0 +1,213 @@
+"""
+滑动窗口请求统计
+
+用环形缓冲区按固定时间槽记录请求结果，提供 1m / 5m / 15m 窗口的:
+- 成功率
+- p50 / p95 / p99 延迟 (按固定延迟分桶估算，桶内线性插值)
+- 错误码分布
+
+记录为 O(1): 定位当前时间槽，过期槽位在写入时就地复用。
+读取时聚合窗口内的槽位 (15m 窗口为 180 个槽)，只在 /health、/metrics 和告警检查时发生。
+"""
+
+from bisect import bisect_left
+from typing import Optional, Dict, Any, List
+import threading
+import time
+
+
+# 延迟分桶上界 (毫秒)，最后一个桶为 +Inf
+LATENCY_BOUNDS_MS = (
+    1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 200, 300, 500, 750,
+    1000, 1500, 2000, 3000, 5000, 7500, 10000, 15000, 20000, 30000, 60000
+)
+
+# 对外提供的窗口 (名称 -> 秒)
+WINDOWS = {
+    "1m": 60,
+    "5m": 300,
+    "15m": 900,
+}
+
+
+class _Slot:
+    """单个时间槽的聚合数据"""
+
+    __slots__ = ("epoch", "total", "success", "latency_counts", "max_latency_ms", "error_codes")
+
+    def __init__(self):
+        self.epoch = -1
+        self.total = 0
+        self.success = 0
+        self.latency_counts = [0] * (len(LATENCY_BOUNDS_MS) + 1)
+        self.max_latency_ms = 0.0
+        self.error_codes: Dict[str, int] = {}
+
+    def reset(self, epoch: int) -> None:
+        self.epoch = epoch
+        self.total = 0
+        self.success = 0
+        self.latency_counts = [0] * (len(LATENCY_BOUNDS_MS) + 1)
+        self.max_latency_ms = 0.0
+        self.error_codes = {}
+
+
+class SlidingWindowStats:
+    """
+    环形缓冲区滑动窗口统计
+
+    时间被切分为 slot_seconds 长的槽，缓冲区覆盖最长窗口 (15m)。
+    窗口边界精度为一个槽 (默认 5 秒)。
+    """
+
+    # 时间槽长度 (秒)
+    SLOT_SECONDS = 5
+
+    def __init__(self, slot_seconds: Optional[int] = None, horizon_seconds: Optional[int] = None):
+        """
+        初始化滑动窗口
+
+        Args:
+            slot_seconds: 时间槽长度 (秒)
+            horizon_seconds: 缓冲区覆盖的最长时间 (秒)，默认为最长窗口
+        """
+        self.slot_seconds = slot_seconds or self.SLOT_SECONDS
+        horizon = horizon_seconds or max(WINDOWS.values())
+        self._size = -(-horizon // self.slot_seconds)
+        self._slots: List[_Slot] = [_Slot() for _ in range(self._size)]
+        self._lock = threading.Lock()
+
+    def _epoch(self, now: Optional[float]) -> int:
+        return int((now if now is not None else time.time()) // self.slot_seconds)
+
+    def record(
+        self,
+        success: bool,
+        latency_seconds: float,
+        error_code: str = "",
+        now: Optional[float] = None
+    ) -> None:
+        """
+        记录一次请求
+
+        Args:
+            success: 是否成功
+            latency_seconds: 耗时 (秒)
+            error_code: 错误码 (失败时)
+            now: 当前时间戳 (用于测试)
+        """
+        epoch = self._epoch(now)
+        latency_ms = latency_seconds * 1000
+        bucket = bisect_left(LATENCY_BOUNDS_MS, latency_ms)
+
+        with self._lock:
+            slot = self._slots[epoch % self._size]
+            if slot.epoch != epoch:
+                slot.reset(epoch)
+            slot.total += 1
+            if success:
+                slot.success += 1
+            elif error_code:
+                slot.error_codes[error_code] = slot.error_codes.get(error_code, 0) + 1
+            slot.latency_counts[bucket] += 1
+            if latency_ms > slot.max_latency_ms:
+                slot.max_latency_ms = latency_ms
+
+    def snapshot(self, window_seconds: int, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        聚合最近 window_seconds 秒的统计
+
+        Args:
+            window_seconds: 窗口长度 (秒)，不超过缓冲区覆盖范围
+            now: 当前时间戳 (用于测试)
+
+        Returns:
+            total / success / error / success_rate / latency_ms / error_codes
+        """
+        current = self._epoch(now)
+        slots_needed = min(self._size, -(-window_seconds // self.slot_seconds))
+        oldest = current - slots_needed + 1
+
+        total = 0
+        success = 0
+        latency_counts = [0] * (len(LATENCY_BOUNDS_MS) + 1)
+        max_latency_ms = 0.0
+        error_codes: Dict[str, int] = {}
+
+        with self._lock:
+            for slot in self._slots:
+                if slot.epoch < oldest or slot.epoch > current or not slot.total:
+                    continue
+                total += slot.total
+                success += slot.success
+                for i, count in enumerate(slot.latency_counts):
+                    latency_counts[i] += count
+                max_latency_ms = max(max_latency_ms, slot.max_latency_ms)
+                for code, count in slot.error_codes.items():
+                    error_codes[code] = error_codes.get(code, 0) + count
+
+        return {
+            "window_seconds": window_seconds,
+            "total": total,
+            "success": success,
+            "error": total - success,
+            # 无请求时视为正常，避免空闲期误报
+            "success_rate": round(success / total, 4) if total else 1.0,
+            "latency_ms": {
+                "p50": _percentile(latency_counts, total, 0.50, max_latency_ms),
+                "p95": _percentile(latency_counts, total, 0.95, max_latency_ms),
+                "p99": _percentile(latency_counts, total, 0.99, max_latency_ms),
+                "max": round(max_latency_ms, 1),
+            },
+            "error_codes": dict(sorted(error_codes.items(), key=lambda kv: -kv[1])),
+        }
+
+    def get_stats(self, now: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """获取所有预设窗口 (1m / 5m / 15m) 的统计"""
+        return {name: self.snapshot(seconds, now) for name, seconds in WINDOWS.items()}
+
+    def clear(self) -> None:
+        """清空所有时间槽"""
+        with self._lock:
+            for slot in self._slots:
+                slot.reset(-1)
+
+
+def _percentile(counts: List[int], total: int, q: float, max_latency_ms: float) -> float:
+    """按分桶计数估算百分位 (毫秒)，桶内线性插值"""
+    if not total:
+        return 0.0
+
+    rank = q * total
+    cumulative = 0
+    for i, count in enumerate(counts):
+        if not count:
+            continue
+        if cumulative + count >= rank:
+            lower = LATENCY_BOUNDS_MS[i - 1] if i > 0 else 0
+            # +Inf 桶以观测到的最大值作为上界
+            upper = LATENCY_BOUNDS_MS[i] if i < len(LATENCY_BOUNDS_MS) else max_latency_ms
+            upper = min(upper, max_latency_ms)
+            value = lower + (upper - lower) * (rank - cumulative) / count
+            return round(max(value, 0.0), 1)
+        cumulative += count
+    return round(max_latency_ms, 1)
+
+
+# ============ 依赖注入 ============
+
+_request_window: Optional[SlidingWindowStats] = None
+
+
+def get_request_window() -> SlidingWindowStats:
+    """获取 API 请求滑动窗口统计实例 (单例)"""
+    global _request_window
+    if _request_window is None:
+        _request_window = SlidingWindowStats()
+    return _request_window
+
+
+def reset_request_window() -> None:
+    """重置 API 请求滑动窗口统计 (用于测试)"""
+    global _request_window
+    _request_window = None
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Cookie 选择性能基准
+
+对比 CookieManager 堆索引实现与原线性扫描实现在不同 Cookie 规模下的
+acquire + mark_used 延迟，并模拟部分 Cookie 处于冷却状态。
+
+使用方式:
+    python scripts/bench_cookie_acquire.py
+    python scripts/bench_cookie_acquire.py --sizes 10 1000 10000 --iterations 2000
+"""
+
+import sys
+import time
+import random
+import asyncio
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from media_crawler_api.services.cookie import (  # noqa: E402
+    Cookie,
+    CookieManager,
+    CookieStatus,
+)
+
+
+def build_manager(size: int, cooling_ratio: float) -> CookieManager:
+    """构造包含 size 个 Cookie 的管理器 (跳过加密，直接写入索引)"""
+    manager = CookieManager()
+    manager.MAX_CONSECUTIVE_ERRORS = 10 ** 9
+    rng = random.Random(size)
+    future = datetime.utcnow() + timedelta(hours=1)
+
+    for i in range(size):
+        cookie = Cookie(
+            name=f"bench_{i}",
+            priority=rng.randint(1, 5),
+            daily_used=rng.randint(0, 50),
+            daily_limit=10 ** 9,
+        )
+        if rng.random() < cooling_ratio:
+            cookie.status = CookieStatus.COOLING
+            cookie.cooling_until = future
+        manager._cookies[cookie.name] = cookie
+        manager._index(cookie)
+
+    return manager
+
+
+async def linear_acquire(manager: CookieManager, platform: str = "xhs") -> Optional[Cookie]:
+    """原实现: 全量扫描冷却恢复 + 过滤排序"""
+    async with manager._lock:
+        for cookie in manager._cookies.values():
+            if cookie.is_cooling_expired():
+                cookie.status = CookieStatus.ACTIVE
+                cookie.cooling_until = None
+        candidates = [
+            c for c in manager._cookies.values()
+            if c.platform == platform and c.is_available()
+        ]
+        if not candidates:
+            return None
+        candidates.sort(key=lambda c: (-c.priority, c.daily_used))
+        return candidates[0]
+
+
+async def run_case(size: int, iterations: int, cooling_ratio: float, linear: bool) -> List[float]:
+    """执行一组 acquire + mark_used，返回每次耗时 (微秒)"""
+    manager = build_manager(size, cooling_ratio)
+    acquire = (lambda: linear_acquire(manager)) if linear else manager.acquire
+    samples = []
+
+    for _ in range(iterations):
+        start = time.perf_counter()
+        cookie = await acquire()
+        if cookie is not None:
+            await manager.mark_used(cookie.name, success_count=1)
+        samples.append((time.perf_counter() - start) * 1e6)
+
+    return samples
+
+
+def percentile(samples: List[float], p: float) -> float:
+    """计算百分位"""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(len(ordered) * p))
+    return ordered[index]
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    print(f"{'cookies':>8} {'impl':>7} {'p50(us)':>10} {'p99(us)':>10} {'mean(us)':>10}")
+    for size in args.sizes:
+        for linear in (True, False):
+            samples = await run_case(size, args.iterations, args.cooling_ratio, linear)
+            print(
+                f"{size:>8} {'linear' if linear else 'heap':>7} "
+                f"{percentile(samples, 0.5):>10.1f} "
+                f"{percentile(samples, 0.99):>10.1f} "
+                f"{sum(samples) / len(samples):>10.1f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cookie 选择性能基准')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 10000],
+                        help='Cookie 数量')
+    parser.add_argument('--iterations', type=int, default=1000, help='每组迭代次数')
+    parser.add_argument('--cooling-ratio', type=float, default=0.2,
+                        help='处于冷却状态的 Cookie 比例')
+    args = parser.parse_args()
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == '__main__':
+    main()
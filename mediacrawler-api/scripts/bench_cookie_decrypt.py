@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Cookie 解密开销基准
+
+对比每次请求直接 Fernet 解密与经过解密结果缓存 (DecryptedCookieCache)
+时 Cookie.get_decrypted_value 的单次耗时。
+
+使用方式:
+    COOKIE_MASTER_KEY=... python scripts/bench_cookie_decrypt.py
+    python scripts/bench_cookie_decrypt.py --cookies 50 --iterations 20000
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("COOKIE_MASTER_KEY", "bench-master-key-" + "x" * 32)
+
+from media_crawler_api.services.cookie import Cookie  # noqa: E402
+from media_crawler_api.utils.crypto import (  # noqa: E402
+    cookie_encryption,
+    decrypted_cookie_cache,
+)
+
+
+def build_cookies(count: int, value_size: int) -> list:
+    """构造已加密的 Cookie"""
+    cookies = []
+    for i in range(count):
+        plaintext = f"web_session={'a' * value_size}; a1=bench{i}"
+        encrypted, key_id = cookie_encryption.encrypt(plaintext)
+        cookies.append(Cookie(name=f"bench_{i}", encrypted_value=encrypted, encryption_key_id=key_id))
+    return cookies
+
+
+def run(cookies: list, iterations: int, cached: bool) -> float:
+    """返回单次获取明文的平均耗时 (微秒)"""
+    decrypted_cookie_cache.clear()
+    start = time.perf_counter()
+    for i in range(iterations):
+        cookie = cookies[i % len(cookies)]
+        if cached:
+            cookie.get_decrypted_value()
+        else:
+            cookie_encryption.decrypt(cookie.encrypted_value, cookie.encryption_key_id)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cookie 解密开销基准')
+    parser.add_argument('--cookies', type=int, default=20, help='Cookie 数量')
+    parser.add_argument('--iterations', type=int, default=10000, help='迭代次数')
+    parser.add_argument('--value-size', type=int, default=1500, help='Cookie 明文长度')
+    args = parser.parse_args()
+
+    cookies = build_cookies(args.cookies, args.value_size)
+
+    direct = run(cookies, args.iterations, cached=False)
+    cached = run(cookies, args.iterations, cached=True)
+
+    print(f"cookies={args.cookies} iterations={args.iterations} value_size={args.value_size}")
+    print(f"  直接解密: {direct:8.2f} us/次")
+    print(f"  缓存解密: {cached:8.2f} us/次  (x{direct / cached:.1f})")
+    print(f"  缓存统计: {decrypted_cookie_cache.get_stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+搜索缓存并发合并测试
+
+模拟 /api/search/crawl 流式采集提前结束时取消未完成的分页任务，
+验证共享同一分页键的普通 /api/search 请求不受影响；
+并直接驱动 crawl_search 的流式响应，验证跨页去重和客户端断开时取消分页任务。
+"""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+from starlette.requests import Request
+
+from media_crawler_api.models.request import CrawlTaskRequest
+from media_crawler_api.services.cache import MemoryCacheBackend, SearchResultCache
+
+
+def _make_cache() -> SearchResultCache:
+    return SearchResultCache(backend=MemoryCacheBackend(), ttl=60)
+
+
+def test_crawl_stop_does_not_cancel_coalesced_search():
+    async def scenario():
+        cache = _make_cache()
+        calls = {}
+
+        def search_page(page: int):
+            async def _do_search():
+                calls[page] = calls.get(page, 0) + 1
+                await asyncio.sleep(0.05 * page)
+                return {"items": [f"note_{page}"], "has_more": True}
+            return _do_search
+
+        keys = {page: cache.make_key(keyword="咖啡", page=page) for page in (1, 2, 3)}
+
+        # 流式采集: 并发请求 1~3 页
+        crawl_tasks = {
+            page: asyncio.create_task(cache.fetch(keys[page], search_page(page)))
+            for page in (1, 2, 3)
+        }
+        await asyncio.sleep(0.01)
+
+        # 普通搜索请求与采集的第 2 页参数相同，合并到同一次调用
+        plain = asyncio.create_task(cache.fetch(keys[2], search_page(2)))
+        await asyncio.sleep(0.01)
+
+        # 第 1 页返回后采集达到上限，取消剩余分页任务 (与 crawl_search 的 stop 分支一致)
+        await crawl_tasks[1]
+        for page in (2, 3):
+            crawl_tasks[page].cancel()
+
+        result, source, _ = await plain
+        assert result == {"items": ["note_2"], "has_more": True}
+        assert source == "coalesced"
+        assert calls[2] == 1
+        assert crawl_tasks[2].cancelled()
+
+        # 无其他等待者的第 3 页随采集取消，后续相同请求重新执行
+        await asyncio.sleep(0.2)
+        result, source, _ = await cache.fetch(keys[3], search_page(3))
+        assert source == "miss"
+        assert calls[3] == 2
+        assert cache.get_stats()["inflight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_coalesced_search_shares_exception():
+    async def scenario():
+        cache = _make_cache()
+        key = cache.make_key(keyword="咖啡", page=1)
+
+        async def failing():
+            await asyncio.sleep(0.02)
+            raise RuntimeError("backend down")
+
+        results = await asyncio.gather(
+            cache.fetch(key, failing),
+            cache.fetch(key, failing),
+            return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert cache.get_stats()["inflight"] == 0
+
+    asyncio.run(scenario())
+
+
+class _FakeCrawler:
+    """只实现 crawl_search 用到的 search / search_cache"""
+
+    def __init__(self, pages, blocked=()):
+        self.search_cache = _make_cache()
+        self.pages = pages
+        self.blocked = set(blocked)
+        self.calls = []
+        self.cancelled = []
+
+    async def search(self, platform, keyword, cookie, page, **kwargs):
+        self.calls.append(page)
+        if page in self.blocked:
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                self.cancelled.append(page)
+                raise
+        return self.pages[page]
+
+
+class _FakeCookieManager:
+    @asynccontextmanager
+    async def lease(self, platform="xhs", cookie_name=None):
+        class _Lease:
+            cookie = "a1=x"
+            name = "cookie_1"
+        yield _Lease()
+
+
+def _crawl_request() -> Request:
+    return Request({"type": "http", "method": "POST", "headers": [], "path": "/api/search/crawl"})
+
+
+def _import_crawl_search():
+    return pytest.importorskip("media_crawler_api.routers.crawler").crawl_search
+
+
+def test_crawl_stream_dedupes_notes_across_pages():
+    crawl_search = _import_crawl_search()
+
+    async def scenario():
+        crawler = _FakeCrawler({
+            1: {"items": [{"note_id": "a"}, {"note_id": "b"}], "has_more": True},
+            2: {"items": [{"note_id": "b"}, {"note_id": "c"}], "has_more": True},
+            3: {"items": [{"note_id": "c"}, {"note_id": "d"}, {}], "has_more": False},
+        })
+        body = CrawlTaskRequest(keyword="咖啡", concurrency=1)
+        response = await crawl_search(_crawl_request(), body, crawler, _FakeCookieManager())
+        return crawler, [json.loads(line) async for line in response.body_iterator]
+
+    crawler, events = asyncio.run(scenario())
+    notes = [e["data"]["note_id"] for e in events if e["type"] == "note"]
+    assert notes == ["a", "b", "c", "d"]
+    assert events[-1]["type"] == "end"
+    assert events[-1]["count"] == 4
+    assert events[-1]["pages"] == 3
+    assert crawler.calls == [1, 2, 3]
+
+
+def test_crawl_stream_cancels_pending_pages_on_disconnect():
+    crawl_search = _import_crawl_search()
+
+    async def scenario():
+        crawler = _FakeCrawler(
+            {1: {"items": [{"note_id": "a"}, {"note_id": "b"}], "has_more": True}},
+            blocked=(2, 3)
+        )
+        body = CrawlTaskRequest(keyword="咖啡", concurrency=3)
+        response = await crawl_search(_crawl_request(), body, crawler, _FakeCookieManager())
+
+        events = response.body_iterator
+        first = json.loads(await events.__anext__())
+        assert first["type"] == "note"
+
+        # 客户端断开: StreamingResponse 关闭事件生成器
+        await events.aclose()
+        await asyncio.sleep(0.05)
+
+        # 需在事件循环结束前检查，asyncio.run 退出时会取消所有残留任务
+        assert sorted(crawler.calls) == [1, 2, 3]
+        assert sorted(crawler.cancelled) == [2, 3]
+        assert crawler.search_cache.get_stats()["inflight"] == 0
+
+    asyncio.run(scenario())
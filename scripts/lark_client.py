@@ -2,26 +2,49 @@
 # -*- coding: utf-8 -*-
 """
 飞书多维表格通用客户端
-功能：Token 管理、批量创建记录、查询记录
+功能：Token 管理、批量创建记录、查询记录、缓冲批量写入执行日志
 用于 N8N 工作流 / Python 脚本联动
+异步版本 (连接池、限流重试、预取分页) 见 lark_client_async.AsyncLarkClient
 
 使用示例:
     from lark_client import LarkClient
 
     client = LarkClient()
 
-    # 创建记录
+    # 创建记录 (超过 500 条自动分批并行写入)
     records = [{"title": "测试", "status": "DRAFT"}]
     result = client.create_records("tblContentRecords", records)
+    failed = [r for r in result['results'] if not r['success']]
+
+批量写入 (create_records / update_records / delete_records) 的返回约定:
+    - 全部失败时抛出异常 (与单次请求失败一致)
+    - 部分失败时不抛出: code != 0，failed > 0，失败明细见 results (按输入顺序，含 error)
+    - data.records 只包含成功的记录 (按输入顺序)
+    - batch_create 每个分批携带 client_token，超时后重发不会重复创建记录
 
     # 查询记录
     records = client.query_records("tblContentRecords", filter="status='DRAFT'")
+
+    # 写入执行日志 (进入缓冲区，按条数/时间批量写入，进程退出时自动刷新)
+    client.log_event("WORKFLOW_START", "INFO", "工作流启动", workflow_id="content_generator_v1")
+
+环境变量 (执行日志):
+    LARK_TABLE_LOGS: 日志表 ID，默认 tblExecutionLogs
+    LARK_LOG_BATCH_SIZE: 缓冲条数达到该值时立即写入，默认 50
+    LARK_LOG_FLUSH_INTERVAL: 最长缓冲时间 (秒)，默认 5
+    LARK_LOG_SPILL_DIR: 飞书不可用时的本地落盘目录，默认 data
 """
 
 import os
 import time
 import json
+import atexit
+import signal
+import sys
 import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 
@@ -32,6 +55,110 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(me
 logger = logging.getLogger(__name__)
 
 
+# ==================== 批量写入 ====================
+
+# 飞书批量接口单次最多 500 条
+BATCH_LIMIT = 500
+
+# 批量写入默认并发数
+DEFAULT_BATCH_CONCURRENCY = 4
+
+# 失败分批的重试轮数 (单次请求内的限流重试之外)
+DEFAULT_CHUNK_RETRIES = 2
+
+# 批量操作: 接口后缀 + 请求体构造
+BULK_OPERATIONS: Dict[str, tuple] = {
+    "create": ("batch_create", lambda items: {"records": [{"fields": r} for r in items]}),
+    "update": ("batch_update", lambda items: {
+        "records": [{"record_id": r["record_id"], "fields": r["fields"]} for r in items]
+    }),
+    "delete": ("batch_delete", lambda items: {"records": list(items)}),
+}
+
+
+def chunk_params(operation: str, chunks: List[range]) -> Dict[int, Optional[Dict[str, str]]]:
+    """
+    每个分批的查询参数 (按分批起始下标索引)
+
+    batch_create 携带固定的 client_token: 同一分批的重发 (含超时后服务端已写入的情况)
+    由飞书按幂等处理，不会重复创建记录。
+    """
+    if operation != "create":
+        return {indices.start: None for indices in chunks}
+    return {indices.start: {"client_token": str(uuid.uuid4())} for indices in chunks}
+
+
+def chunk_ranges(total: int, chunk_size: int = BATCH_LIMIT) -> List[range]:
+    """按接口上限切分下标区间"""
+    chunk_size = max(1, min(chunk_size, BATCH_LIMIT))
+    return [range(start, min(start + chunk_size, total)) for start in range(0, total, chunk_size)]
+
+
+def chunk_results(operation: str, indices: range, response: Dict) -> List[Dict]:
+    """
+    把一个分批的 API 响应映射为逐条结果
+
+    飞书批量接口按请求顺序返回 records，整批要么成功要么失败。
+    """
+    records = response.get('data', {}).get('records') or []
+    results = []
+    for offset, index in enumerate(indices):
+        record = records[offset] if offset < len(records) else None
+        if operation == "delete":
+            success = bool(record and record.get('deleted'))
+        else:
+            success = record is not None
+        results.append({
+            "index": index,
+            "success": success,
+            "record_id": record.get('record_id') if record else None,
+            "record": record,
+            "error": None if success else "响应中缺少该记录",
+        })
+    return results
+
+
+def failed_results(indices: range, error: Exception) -> List[Dict]:
+    """分批请求失败时的逐条结果"""
+    return [
+        {
+            "index": index,
+            "success": False,
+            "record_id": None,
+            "record": None,
+            "error": str(error),
+            "code": getattr(error, 'code', None),
+        }
+        for index in indices
+    ]
+
+
+def summarize_bulk(operation: str, results: List[Dict]) -> Dict:
+    """
+    汇总逐条结果
+
+    Returns:
+        与单次 API 响应兼容的结构 (code / msg / data.records，data.records 只含成功的记录)，另含:
+        results: 按输入顺序的逐条结果 {index, success, record_id, error}
+        total / succeeded / failed: 计数
+    """
+    failed = [r for r in results if not r["success"]]
+    if failed:
+        logger.error(f"批量{operation}部分失败: {len(failed)}/{len(results)}")
+    else:
+        logger.info(f"批量{operation} {len(results)} 条记录成功")
+
+    return {
+        "code": 0 if not failed else (failed[0].get("code") or -1),
+        "msg": "success" if not failed else f"{len(failed)}/{len(results)} 条记录失败",
+        "data": {"records": [r["record"] for r in results if r["success"]]},
+        "results": [{k: v for k, v in r.items() if k != "record"} for r in results],
+        "total": len(results),
+        "succeeded": len(results) - len(failed),
+        "failed": len(failed),
+    }
+
+
 class LarkClient:
     """飞书多维表格 API 客户端"""
 
@@ -60,6 +187,10 @@ class LarkClient:
 
         self._token: Optional[str] = None
         self._token_expires: float = 0
+        self._log_buffers: Dict[str, "ExecutionLogBuffer"] = {}
+        self._log_buffers_lock = threading.Lock()
+        # 复用连接 (requests.Session 可在批量写入的线程间共享)
+        self._session = requests.Session()
 
     def _get_token(self) -> str:
         """获取或刷新 tenant_access_token"""
@@ -73,7 +204,7 @@ class LarkClient:
             "app_secret": self.app_secret
         }
 
-        response = requests.post(url, json=payload, timeout=10)
+        response = self._session.post(url, json=payload, timeout=10)
         data = response.json()
 
         if data.get('code') != 0:
@@ -99,7 +230,7 @@ class LarkClient:
             "Content-Type": "application/json"
         }
 
-        response = requests.request(
+        response = self._session.request(
             method=method,
             url=url,
             headers=headers,
@@ -118,22 +249,97 @@ class LarkClient:
 
     # ==================== 记录操作 ====================
 
+    def _bulk(
+        self,
+        operation: str,
+        table_id: str,
+        items: List[Any],
+        app_token: Optional[str] = None,
+        chunk_size: int = BATCH_LIMIT,
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        chunk_retries: int = DEFAULT_CHUNK_RETRIES
+    ) -> Dict:
+        """
+        分批并行执行批量操作
+
+        输入按 chunk_size (不超过 500) 切分，线程池并行提交；
+        失败的分批在下一轮重试，成功的分批不会重复提交。
+
+        Raises:
+            Exception: 全部记录失败
+        """
+        app_token = app_token or self.app_token
+        suffix, build_payload = BULK_OPERATIONS[operation]
+        endpoint = f"/bitable/v1/apps/{app_token}/tables/{table_id}/records/{suffix}"
+
+        results: List[Optional[Dict]] = [None] * len(items)
+        pending = chunk_ranges(len(items), chunk_size)
+        params = chunk_params(operation, pending)
+
+        def run_chunk(indices: range) -> List[Dict]:
+            try:
+                payload = build_payload(items[indices.start:indices.stop])
+                response = self._request("POST", endpoint, data=payload, params=params[indices.start])
+                return chunk_results(operation, indices, response)
+            except Exception as e:
+                return failed_results(indices, e)
+
+        # 单个分批或不要求并发时在当前线程执行 (解释器退出阶段无法再创建线程池)
+        workers = min(max(1, concurrency), len(pending))
+        executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+
+        try:
+            for attempt in range(chunk_retries + 1):
+                if attempt > 0:
+                    logger.warning(f"重试 {len(pending)} 个失败分批 ({attempt}/{chunk_retries})")
+                    time.sleep(min(2 ** attempt, 10))
+
+                chunks = executor.map(run_chunk, pending) if executor else map(run_chunk, pending)
+                failed_chunks = []
+                for indices, chunk in zip(pending, chunks):
+                    for result in chunk:
+                        results[result["index"]] = result
+                    if not all(r["success"] for r in chunk):
+                        failed_chunks.append(indices)
+
+                pending = failed_chunks
+                if not pending:
+                    break
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        summary = summarize_bulk(operation, results)
+        if summary["total"] and not summary["succeeded"]:
+            raise Exception(f"飞书 API 错误: 批量{operation}全部失败: {results[0]['error']}")
+        return summary
+
     def create_records(
         self,
         table_id: str,
         records: List[Dict[str, Any]],
-        app_token: Optional[str] = None
+        app_token: Optional[str] = None,
+        chunk_size: int = BATCH_LIMIT,
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY
     ) -> Dict:
         """
         批量创建记录
 
+        超过 500 条时自动分批，并行上传，只重试失败的分批。
+
         Args:
             table_id: 表格 ID
             records: 记录列表，每条记录是字段名到值的映射
             app_token: 可选，覆盖默认的 app_token
+            chunk_size: 每批记录数（最大 500）
+            concurrency: 并行上传的分批数
 
         Returns:
-            API 响应结果
+            汇总结果: data.records 为成功创建的记录 (按输入顺序)，
+            results 为逐条 {index, success, record_id, error}；部分失败时 code != 0
+
+        Raises:
+            Exception: 全部记录创建失败
 
         Example:
             records = [
@@ -142,17 +348,53 @@ class LarkClient:
             ]
             result = client.create_records("tblXXX", records)
         """
-        app_token = app_token or self.app_token
-        endpoint = f"/bitable/v1/apps/{app_token}/tables/{table_id}/records/batch_create"
+        return self._bulk("create", table_id, records, app_token, chunk_size, concurrency)
 
-        payload = {
-            "records": [{"fields": record} for record in records]
-        }
+    def update_records(
+        self,
+        table_id: str,
+        records: List[Dict[str, Any]],
+        app_token: Optional[str] = None,
+        chunk_size: int = BATCH_LIMIT,
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY
+    ) -> Dict:
+        """
+        批量更新记录 (自动分批并行)
 
-        result = self._request("POST", endpoint, data=payload)
-        logger.info(f"创建 {len(records)} 条记录成功")
+        Args:
+            table_id: 表格 ID
+            records: [{"record_id": "recXXX", "fields": {...}}, ...]
+            app_token: 可选，覆盖默认的 app_token
+            chunk_size: 每批记录数（最大 500）
+            concurrency: 并行上传的分批数
 
-        return result
+        Returns:
+            汇总结果，结构同 create_records
+        """
+        return self._bulk("update", table_id, records, app_token, chunk_size, concurrency)
+
+    def delete_records(
+        self,
+        table_id: str,
+        record_ids: List[str],
+        app_token: Optional[str] = None,
+        chunk_size: int = BATCH_LIMIT,
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY
+    ) -> Dict:
+        """
+        批量删除记录 (自动分批并行)
+
+        Args:
+            table_id: 表格 ID
+            record_ids: 记录 ID 列表
+            app_token: 可选，覆盖默认的 app_token
+            chunk_size: 每批记录数（最大 500）
+            concurrency: 并行上传的分批数
+
+        Returns:
+            汇总结果，结构同 create_records
+        """
+        return self._bulk("delete", table_id, record_ids, app_token, chunk_size, concurrency)
 
     def create_record(
         self,
@@ -333,6 +575,26 @@ class LarkClient:
         logger.info(f"共获取 {len(all_records)} 条记录")
         return all_records
 
+    def log_buffer(self, table_id: Optional[str] = None) -> "ExecutionLogBuffer":
+        """
+        获取日志表对应的缓冲写入器 (每个表一个，按需创建)
+
+        Args:
+            table_id: 日志表 ID，默认从环境变量 LARK_TABLE_LOGS 读取
+        """
+        table_id = table_id or os.environ.get('LARK_TABLE_LOGS', 'tblExecutionLogs')
+        with self._log_buffers_lock:
+            buffer = self._log_buffers.get(table_id)
+            if buffer is None:
+                buffer = ExecutionLogBuffer(self, table_id)
+                self._log_buffers[table_id] = buffer
+            return buffer
+
+    def flush_logs(self) -> None:
+        """立即写入所有缓冲中的执行日志"""
+        for buffer in list(self._log_buffers.values()):
+            buffer.flush()
+
     def log_event(
         self,
         event_type: str,
@@ -348,6 +610,9 @@ class LarkClient:
         """
         写入执行日志（便捷方法）
 
+        日志先进入缓冲区，由 ExecutionLogBuffer 按条数或时间阈值批量写入，
+        调用方不等待网络请求；需要立即落库时调用 flush_logs()。
+
         Args:
             event_type: 事件类型（见枚举）
             level: 日志级别（DEBUG/INFO/WARN/ERROR/FATAL）
@@ -360,10 +625,8 @@ class LarkClient:
             table_id: 日志表 ID，默认从环境变量读取
 
         Returns:
-            API 响应结果
+            {"code": 0, "msg": "buffered", "pending": 缓冲中的条数}
         """
-        table_id = table_id or os.environ.get('LARK_TABLE_LOGS', 'tblExecutionLogs')
-
         record = {
             "timestamp": datetime.utcnow().isoformat() + "Z",
             "level": level,
@@ -376,7 +639,322 @@ class LarkClient:
             "error": json.dumps(error, ensure_ascii=False) if error else ""
         }
 
-        return self.create_record(table_id, record)
+        pending = self.log_buffer(table_id).append(record)
+        return {"code": 0, "msg": "buffered", "pending": pending}
+
+
+# ==================== 执行日志缓冲 ====================
+
+class ExecutionLogBuffer:
+    """
+    执行日志缓冲写入器
+
+    - 日志先写入内存，条数达到 batch_size 或最早一条等待超过 flush_interval 秒时，
+      由后台线程通过 batch_create 批量写入
+    - 写入失败的记录追加到本地 JSONL 文件，飞书恢复后下次刷新时先补写
+    - 进程退出 (正常结束 / SIGTERM) 时通过 atexit 刷新剩余日志
+    """
+
+    DEFAULT_BATCH_SIZE = 50
+    DEFAULT_FLUSH_INTERVAL = 5.0
+
+    # 内存中最多缓冲的条数，超出时直接落盘
+    MAX_BUFFERED = 10000
+
+    # 写入失败后暂停补写的时间 (秒)，避免飞书不可用时每次刷新都读写落盘文件
+    REPLAY_BACKOFF = 30.0
+
+    def __init__(
+        self,
+        client: LarkClient,
+        table_id: str,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        spill_path: Optional[str] = None
+    ):
+        """
+        初始化缓冲写入器
+
+        Args:
+            client: 飞书客户端
+            table_id: 日志表 ID
+            batch_size: 触发写入的条数，默认从环境变量 LARK_LOG_BATCH_SIZE 读取
+            flush_interval: 最长缓冲时间 (秒)，默认从环境变量 LARK_LOG_FLUSH_INTERVAL 读取
+            spill_path: 落盘文件路径，默认 {LARK_LOG_SPILL_DIR}/lark_logs_{table_id}.jsonl
+        """
+        self.client = client
+        self.table_id = table_id
+        self.batch_size = max(1, min(
+            batch_size or int(os.environ.get('LARK_LOG_BATCH_SIZE', self.DEFAULT_BATCH_SIZE)),
+            BATCH_LIMIT
+        ))
+        self.flush_interval = flush_interval or float(
+            os.environ.get('LARK_LOG_FLUSH_INTERVAL', self.DEFAULT_FLUSH_INTERVAL)
+        )
+        self.spill_path = spill_path or os.path.join(
+            os.environ.get('LARK_LOG_SPILL_DIR', 'data'), f"lark_logs_{table_id}.jsonl"
+        )
+
+        self._buffer: List[Dict[str, Any]] = []
+        self._first_buffered_at = 0.0
+        self._lock = threading.Lock()          # 保护 _buffer
+        self._flush_lock = threading.Lock()    # 串行化刷新 (后台线程 / 手动 / 退出)
+        self._spill_lock = threading.Lock()    # 保护落盘文件
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._replay_after = 0.0
+        # 启动后首次刷新时检查已退出进程遗留的补写文件
+        self._replay_pending = True
+        self.stats = {"buffered": 0, "written": 0, "spilled": 0, "replayed": 0, "flushes": 0}
+
+        atexit.register(self.close)
+        _install_sigterm_handler()
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """
+        追加一条日志 (不发起网络请求)
+
+        Args:
+            record: 日志字段
+
+        Returns:
+            缓冲中的条数
+        """
+        if self._closed:
+            # 退出阶段之后的日志直接写入，保证不丢失
+            self._write([record])
+            return 0
+
+        overflow: List[Dict[str, Any]] = []
+        with self._lock:
+            if not self._buffer:
+                self._first_buffered_at = time.monotonic()
+            self._buffer.append(record)
+            self.stats["buffered"] += 1
+            if len(self._buffer) > self.MAX_BUFFERED:
+                overflow, self._buffer = self._buffer, []
+            pending = len(self._buffer)
+
+        if overflow:
+            self._spill(overflow)
+        if pending >= self.batch_size:
+            self._wakeup.set()
+        self._ensure_thread()
+        return pending
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name=f"lark-log-{self.table_id}", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        """后台刷新线程: 达到条数阈值时被唤醒，否则按最早一条的等待时间定时刷新"""
+        while not self._closed:
+            with self._lock:
+                if self._buffer:
+                    timeout = max(0.0, self._first_buffered_at + self.flush_interval - time.monotonic())
+                else:
+                    timeout = self.flush_interval
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+            if self._closed:
+                break
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"执行日志刷新失败: {e}")
+
+    def flush(self) -> None:
+        """写入缓冲中的日志；飞书可用时先补写落盘文件"""
+        with self._flush_lock:
+            with self._lock:
+                records, self._buffer = self._buffer, []
+
+            if time.monotonic() >= self._replay_after and (
+                self._replay_pending or os.path.exists(self.spill_path)
+            ):
+                self._replay()
+
+            if records:
+                self.stats["flushes"] += 1
+                if time.monotonic() < self._replay_after:
+                    # 最近一次写入失败，直接落盘，等退避结束后随补写一起发送
+                    self._spill(records)
+                else:
+                    self._write(records)
+
+    def _send(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """批量写入，返回写入失败的记录"""
+        try:
+            result = self.client._bulk(
+                "create", self.table_id, records,
+                chunk_size=self.batch_size, concurrency=1, chunk_retries=0
+            )
+            failed = [records[r["index"]] for r in result["results"] if not r["success"]]
+        except Exception as e:
+            logger.error(f"执行日志写入失败: {e}")
+            failed = records
+
+        self.stats["written"] += len(records) - len(failed)
+        if failed:
+            self._replay_after = time.monotonic() + self.REPLAY_BACKOFF
+        return failed
+
+    def _write(self, records: List[Dict[str, Any]]) -> bool:
+        """批量写入，失败的记录落盘；全部成功返回 True"""
+        failed = self._send(records)
+        if failed:
+            self._spill(failed)
+            return False
+        return True
+
+    def _spill(self, records: List[Dict[str, Any]]) -> bool:
+        """追加到本地 JSONL 文件，成功返回 True"""
+        try:
+            with self._spill_lock:
+                directory = os.path.dirname(self.spill_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.spill_path, 'a', encoding='utf-8') as f:
+                    for record in records:
+                        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.stats["spilled"] += len(records)
+            logger.warning(f"{len(records)} 条执行日志已暂存到 {self.spill_path}")
+            return True
+        except OSError as e:
+            logger.error(f"执行日志落盘失败，丢弃 {len(records)} 条: {e}")
+            return False
+
+    def _replay_files(self) -> List[str]:
+        """本进程或已退出进程遗留的补写文件 ({spill_path}.replay-<pid>)"""
+        directory = os.path.dirname(self.spill_path) or "."
+        prefix = os.path.basename(self.spill_path) + ".replay-"
+        try:
+            names = sorted(os.listdir(directory))
+        except FileNotFoundError:
+            return []
+
+        paths = []
+        for name in names:
+            if not name.startswith(prefix):
+                continue
+            try:
+                pid = int(name[len(prefix):])
+            except ValueError:
+                continue
+            # 仍在运行的其他进程正在补写，不抢占
+            if pid == os.getpid() or not _pid_alive(pid):
+                paths.append(os.path.join(directory, name))
+        return paths
+
+    def _replay(self) -> None:
+        """
+        补写落盘文件
+
+        先把文件改名为 {spill_path}.replay-<pid> 再读取，写入成功或失败记录已重新落盘后才删除；
+        补写中途进程崩溃时文件保留，由下次启动的进程接管 (可能重复写入，不会丢失)。
+        """
+        self._replay_pending = False
+        replay_path = f"{self.spill_path}.replay-{os.getpid()}"
+
+        for path in self._replay_files():
+            if path != replay_path:
+                try:
+                    os.replace(path, replay_path)
+                except FileNotFoundError:
+                    # 已被其他进程接管
+                    continue
+            if not self._replay_file(replay_path):
+                return
+
+        with self._spill_lock:
+            try:
+                os.replace(self.spill_path, replay_path)
+            except FileNotFoundError:
+                return
+        self._replay_file(replay_path)
+
+    def _replay_file(self, path: str) -> bool:
+        """补写单个文件，全部写入成功返回 True；失败记录无法重新落盘时保留文件"""
+        records = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning(f"跳过无法解析的暂存日志: {line[:100]}")
+
+        failed: List[Dict[str, Any]] = []
+        if records:
+            logger.info(f"补写 {len(records)} 条暂存的执行日志")
+            failed = self._send(records)
+            if failed and not self._spill(failed):
+                self._replay_pending = True
+                logger.error(f"补写失败且无法重新落盘，保留 {path}")
+                return False
+
+        os.remove(path)
+        self.stats["replayed"] += len(records) - len(failed)
+        return not failed
+
+    def replay(self) -> None:
+        """立即补写落盘文件 (忽略失败退避)"""
+        with self._flush_lock:
+            self._replay()
+
+    def close(self) -> None:
+        """停止后台线程并写入剩余日志 (进程退出时由 atexit 调用)"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=self.flush_interval + 35)
+        self.flush()
+        atexit.unregister(self.close)
+
+    def pending(self) -> int:
+        """缓冲中的条数"""
+        with self._lock:
+            return len(self._buffer)
+
+
+def _pid_alive(pid: int) -> bool:
+    """进程是否仍在运行 (Windows 上无法安全探测，视为运行中)"""
+    if os.name == 'nt':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+_sigterm_installed = False
+
+
+def _install_sigterm_handler() -> None:
+    """
+    SIGTERM 默认直接终止进程，不会执行 atexit；
+    未设置其他处理函数时改为抛出 SystemExit，使缓冲日志在 docker stop 等场景下也能刷新
+    """
+    global _sigterm_installed
+    if _sigterm_installed or threading.current_thread() is not threading.main_thread():
+        return
+    _sigterm_installed = True
+    try:
+        if signal.getsignal(signal.SIGTERM) is signal.SIG_DFL:
+            signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+    except (ValueError, AttributeError):
+        pass
 
 
 # ==================== 使用示例 ====================
@@ -0,0 +1,628 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+飞书多维表格异步客户端
+功能：与 LarkClient 相同的记录操作，基于 asyncio + aiohttp
+- 所有请求复用同一个连接池 (aiohttp.ClientSession)
+- 限流错误 (HTTP 429 / 99991400 等) 按带抖动的指数退避重试
+- 客户端令牌桶限流，请求速率不超过飞书 QPS 配额
+- iter_records 流式遍历记录，处理当前页时预取下一页
+- create_records / update_records / delete_records 自动分批 (≤500) 并发写入，
+  返回与输入顺序一致的逐条结果，只重试失败的分批；全部失败时抛出 LarkAPIError，
+  部分失败时返回 code != 0 的汇总 (约定同 LarkClient，见 lark_client 模块说明)
+
+使用示例:
+    import asyncio
+    from lark_client_async import AsyncLarkClient
+
+    async def main():
+        async with AsyncLarkClient() as client:
+            async for record in client.iter_records("tblContentRecords"):
+                print(record['record_id'])
+
+    asyncio.run(main())
+
+环境变量:
+    LARK_APP_ID / LARK_APP_SECRET / LARK_APP_TOKEN: 凭证 (同 LarkClient)
+    LARK_BASE_URL: 开放平台地址，默认 https://open.feishu.cn/open-apis (可指向本地替身测试)
+    LARK_QPS: 客户端限流速率 (次/秒)，默认 10
+    LARK_MAX_RETRIES: 最大重试次数，默认 5
+"""
+
+import os
+import time
+import random
+import asyncio
+import logging
+from typing import List, Dict, Optional, Any, AsyncIterator
+
+import aiohttp
+
+from lark_client import (
+    BATCH_LIMIT,
+    BULK_OPERATIONS,
+    DEFAULT_BATCH_CONCURRENCY,
+    DEFAULT_CHUNK_RETRIES,
+    chunk_params,
+    chunk_ranges,
+    chunk_results,
+    failed_results,
+    summarize_bulk,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class LarkAPIError(Exception):
+    """飞书 API 错误"""
+
+    def __init__(self, message: str, code: Optional[int] = None, status: Optional[int] = None):
+        super().__init__(message)
+        self.code = code
+        self.status = status
+
+
+class TokenBucket:
+    """
+    令牌桶限流器
+
+    以 rate 个/秒的速率补充令牌，最多积累 capacity 个；
+    令牌不足时等待到下一个令牌补充为止。
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数
+            capacity: 桶容量 (允许的突发请求数)，默认等于 rate
+        """
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """取得一个令牌，不足时等待"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class AsyncLarkClient:
+    """飞书多维表格 API 异步客户端"""
+
+    BASE_URL = "https://open.feishu.cn/open-apis"
+
+    # 可重试的飞书错误码: 频率限制 / 多维表格限流 / 写冲突
+    RETRYABLE_CODES = {99991400, 1254290, 1254291}
+
+    # token 失效，刷新后重试
+    TOKEN_INVALID_CODES = {99991663, 99991668}
+
+    # 可重试的 HTTP 状态码
+    RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+    DEFAULT_QPS = 10
+    DEFAULT_MAX_RETRIES = 5
+    RETRY_BASE_DELAY = 0.5      # 首次重试基准等待 (秒)
+    RETRY_MAX_DELAY = 10.0      # 单次重试最长等待 (秒)
+
+    def __init__(
+        self,
+        app_id: Optional[str] = None,
+        app_secret: Optional[str] = None,
+        app_token: Optional[str] = None,
+        base_url: Optional[str] = None,
+        qps: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        max_connections: int = 20
+    ):
+        """
+        初始化客户端
+
+        Args:
+            app_id: 飞书应用 ID，默认从环境变量 LARK_APP_ID 读取
+            app_secret: 飞书应用密钥，默认从环境变量 LARK_APP_SECRET 读取
+            app_token: 多维表格 App Token，默认从环境变量 LARK_APP_TOKEN 读取
+            base_url: 开放平台地址，默认从环境变量 LARK_BASE_URL 读取
+            qps: 客户端限流速率 (次/秒)，默认从环境变量 LARK_QPS 读取
+            max_retries: 最大重试次数，默认从环境变量 LARK_MAX_RETRIES 读取
+            max_connections: 连接池连接数上限
+        """
+        self.app_id = app_id or os.environ.get('LARK_APP_ID')
+        self.app_secret = app_secret or os.environ.get('LARK_APP_SECRET')
+        self.app_token = app_token or os.environ.get('LARK_APP_TOKEN')
+
+        if not all([self.app_id, self.app_secret, self.app_token]):
+            raise ValueError("Missing required credentials. Set LARK_APP_ID, LARK_APP_SECRET, LARK_APP_TOKEN")
+
+        self.base_url = (base_url or os.environ.get('LARK_BASE_URL') or self.BASE_URL).rstrip('/')
+        self.max_retries = max_retries if max_retries is not None else int(
+            os.environ.get('LARK_MAX_RETRIES', self.DEFAULT_MAX_RETRIES)
+        )
+        self.max_connections = max_connections
+        self.limiter = TokenBucket(qps or float(os.environ.get('LARK_QPS', self.DEFAULT_QPS)))
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._token: Optional[str] = None
+        self._token_expires: float = 0
+        self._token_lock = asyncio.Lock()
+        self.stats = {"requests": 0, "retries": 0, "rate_limited": 0}
+
+    async def __aenter__(self) -> "AsyncLarkClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """获取共享 Session (按需创建)"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """关闭连接池"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _get_token(self, force_refresh: bool = False) -> str:
+        """获取或刷新 tenant_access_token (并发请求只刷新一次)"""
+        async with self._token_lock:
+            # 检查缓存的 token 是否有效（提前 60 秒刷新）
+            if not force_refresh and self._token and time.time() < self._token_expires - 60:
+                return self._token
+
+            url = f"{self.base_url}/auth/v3/tenant_access_token/internal"
+            payload = {
+                "app_id": self.app_id,
+                "app_secret": self.app_secret
+            }
+
+            async with self._get_session().post(url, json=payload, timeout=aiohttp.ClientTimeout(total=10)) as resp:
+                if resp.status in self.RETRYABLE_STATUS:
+                    # 抛出 ClientResponseError，由 _request 按退避重试
+                    resp.raise_for_status()
+                data = await resp.json(content_type=None)
+
+            if data.get('code') != 0:
+                raise LarkAPIError(f"获取飞书 Token 失败: {data}", code=data.get('code'))
+
+            self._token = data['tenant_access_token']
+            self._token_expires = time.time() + data['expire']
+            logger.debug("Token 刷新成功")
+
+            return self._token
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """计算重试等待: 优先使用服务端给出的等待时间，否则指数退避 + 全抖动"""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.RETRY_MAX_DELAY)
+            except ValueError:
+                pass
+        ceiling = min(self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * (2 ** attempt))
+        return random.uniform(ceiling / 2, ceiling)
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict] = None,
+        params: Optional[Dict] = None
+    ) -> Dict:
+        """发送 API 请求 (限流 + 重试)"""
+        url = f"{self.base_url}{endpoint}"
+        token_refreshed = False
+        force_refresh = False
+        attempt = 0
+
+        while True:
+            await self.limiter.acquire()
+            self.stats["requests"] += 1
+
+            retry_after = None
+            try:
+                # 获取 token 的网络错误与业务请求一样按退避重试
+                headers = {
+                    "Authorization": f"Bearer {await self._get_token(force_refresh)}",
+                    "Content-Type": "application/json"
+                }
+                force_refresh = False
+                async with self._get_session().request(
+                    method, url, headers=headers, json=data, params=params
+                ) as resp:
+                    status = resp.status
+                    retry_after = resp.headers.get('Retry-After') or resp.headers.get('x-ogw-ratelimit-reset')
+                    try:
+                        result = await resp.json(content_type=None)
+                    except ValueError:
+                        result = {}
+                error = None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status, result, error = None, {}, e
+
+            code = result.get('code')
+            if error is None and status == 200 and code == 0:
+                return result
+
+            if code in self.TOKEN_INVALID_CODES and not token_refreshed:
+                token_refreshed = True
+                force_refresh = True
+                continue
+
+            retryable = (
+                error is not None
+                or status in self.RETRYABLE_STATUS
+                or code in self.RETRYABLE_CODES
+            )
+            if status == 429 or code == 99991400:
+                self.stats["rate_limited"] += 1
+
+            if not retryable or attempt >= self.max_retries:
+                if error is not None:
+                    raise LarkAPIError(f"飞书 API 请求失败: {error}") from error
+                logger.error(f"API 请求失败: HTTP {status}, {result}")
+                raise LarkAPIError(
+                    f"飞书 API 错误: {result.get('msg', 'Unknown error')}",
+                    code=code,
+                    status=status
+                )
+
+            delay = self._retry_delay(attempt, retry_after)
+            attempt += 1
+            self.stats["retries"] += 1
+            logger.warning(
+                f"飞书 API 限流或暂时失败，{delay:.2f}s 后重试 ({attempt}/{self.max_retries}): "
+                f"HTTP {status}, code={code}{f', {error}' if error else ''}"
+            )
+            await asyncio.sleep(delay)
+
+    # ==================== 记录操作 ====================
+
+    async def _bulk(
+        self,
+        operation: str,
+        table_id: str,
+        items: List[Any],
+        app_token: Optional[str] = None,
+        chunk_size: int = BATCH_LIMIT,
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        chunk_retries: int = DEFAULT_CHUNK_RETRIES
+    ) -> Dict:
+        """
+        分批并发执行批量操作
+
+        输入按 chunk_size (不超过 500) 切分，最多 concurrency 个分批同时提交
+        (仍受令牌桶限流)；失败的分批在下一轮重试，成功的分批不会重复提交。
+        返回约定同 LarkClient.create_records。
+
+        Raises:
+            LarkAPIError: 全部记录失败
+        """
+        app_token = app_token or self.app_token
+        suffix, build_payload = BULK_OPERATIONS[operation]
+        endpoint = f"/bitable/v1/apps/{app_token}/tables/{table_id}/records/{suffix}"
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        results: List[Optional[Dict]] = [None] * len(items)
+        pending = chunk_ranges(len(items), chunk_size)
+        # batch_create 的 client_token 在分批重发和 _request 内部重试间保持不变
+        params = chunk_params(operation, pending)
+
+        async def run_chunk(indices: range) -> List[Dict]:
+            async with semaphore:
+                try:
+                    payload = build_payload(items[indices.start:indices.stop])
+                    response = await self._request(
+                        "POST", endpoint, data=payload, params=params[indices.start]
+                    )
+                    return chunk_results(operation, indices, response)
+                except Exception as e:
+                    # 任何错误都只记为本分批失败，保留其他分批已写入的逐条结果
+                    return failed_results(indices, e)
+
+        for attempt in range(chunk_retries + 1):
+            if attempt > 0:
+                logger.warning(f"重试 {len(pending)} 个失败分批 ({attempt}/{chunk_retries})")
+                await asyncio.sleep(self._retry_delay(attempt))
+
+            chunks = await asyncio.gather(*(run_chunk(indices) for indices in pending))
+
+            failed_chunks = []
+            for indices, chunk in zip(pending, chunks):
+                for result in chunk:
+                    results[result["index"]] = result
+                if not all(r["success"] for r in chunk):
+                    failed_chunks.append(indices)
+
+            pending = failed_chunks
+            if not pending:
+                break
+
+        summary = summarize_bulk(operation, results)
+        if summary["total"] and not summary["succeeded"]:
+            raise LarkAPIError(
+                f"飞书 API 错误: 批量{operation}全部失败: {results[0]['error']}",
+                code=results[0].get("code")
+            )
+        return summary
+
+    async def create_records(
+        self,
+        table_id: str,
+        records: List[Dict[str, Any]],
+        app_token: Optional[str] = None,
+        chunk_size: int = BATCH_LIMIT,
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY
+    ) -> Dict:
+        """
+        批量创建记录 (自动分批并发)
+
+        Args:
+            table_id: 表格 ID
+            records: 记录列表，每条记录是字段名到值的映射
+            app_token: 可选，覆盖默认的 app_token
+            chunk_size: 每批记录数（最大 500）
+            concurrency: 并发上传的分批数
+
+        Returns:
+            汇总结果，结构同 LarkClient.create_records
+        """
+        return await self._bulk("create", table_id, records, app_token, chunk_size, concurrency)
+
+    async def update_records(
+        self,
+        table_id: str,
+        records: List[Dict[str, Any]],
+        app_token: Optional[str] = None,
+        chunk_size: int = BATCH_LIMIT,
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY
+    ) -> Dict:
+        """
+        批量更新记录 (自动分批并发)
+
+        Args:
+            table_id: 表格 ID
+            records: [{"record_id": "recXXX", "fields": {...}}, ...]
+            app_token: 可选，覆盖默认的 app_token
+            chunk_size: 每批记录数（最大 500）
+            concurrency: 并发上传的分批数
+
+        Returns:
+            汇总结果，结构同 LarkClient.create_records
+        """
+        return await self._bulk("update", table_id, records, app_token, chunk_size, concurrency)
+
+    async def delete_records(
+        self,
+        table_id: str,
+        record_ids: List[str],
+        app_token: Optional[str] = None,
+        chunk_size: int = BATCH_LIMIT,
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY
+    ) -> Dict:
+        """
+        批量删除记录 (自动分批并发)
+
+        Args:
+            table_id: 表格 ID
+            record_ids: 记录 ID 列表
+            app_token: 可选，覆盖默认的 app_token
+            chunk_size: 每批记录数（最大 500）
+            concurrency: 并发上传的分批数
+
+        Returns:
+            汇总结果，结构同 LarkClient.create_records
+        """
+        return await self._bulk("delete", table_id, record_ids, app_token, chunk_size, concurrency)
+
+    async def create_record(
+        self,
+        table_id: str,
+        record: Dict[str, Any],
+        app_token: Optional[str] = None
+    ) -> Dict:
+        """
+        创建单条记录
+
+        Args:
+            table_id: 表格 ID
+            record: 字段名到值的映射
+            app_token: 可选，覆盖默认的 app_token
+
+        Returns:
+            API 响应结果
+        """
+        app_token = app_token or self.app_token
+        endpoint = f"/bitable/v1/apps/{app_token}/tables/{table_id}/records"
+
+        result = await self._request("POST", endpoint, data={"fields": record})
+        logger.info(f"创建记录成功: {result.get('data', {}).get('record', {}).get('record_id')}")
+
+        return result
+
+    async def query_records(
+        self,
+        table_id: str,
+        filter: Optional[str] = None,
+        sort: Optional[List[Dict]] = None,
+        page_size: int = 100,
+        page_token: Optional[str] = None,
+        app_token: Optional[str] = None
+    ) -> Dict:
+        """
+        查询一页记录
+
+        Args:
+            table_id: 表格 ID
+            filter: 筛选条件 (原样传给 search 接口，同 LarkClient.query_records)
+            sort: 排序规则，如 [{"field_name": "created_at", "desc": True}]
+            page_size: 每页数量（最大 500）
+            page_token: 分页标记
+            app_token: 可选，覆盖默认的 app_token
+
+        Returns:
+            API 响应结果，包含 items 和 page_token
+        """
+        app_token = app_token or self.app_token
+        endpoint = f"/bitable/v1/apps/{app_token}/tables/{table_id}/records/search"
+
+        payload: Dict[str, Any] = {
+            "page_size": min(page_size, 500)
+        }
+
+        if filter:
+            payload["filter"] = filter
+
+        if sort:
+            payload["sort"] = sort
+
+        if page_token:
+            payload["page_token"] = page_token
+
+        result = await self._request("POST", endpoint, data=payload)
+        items = result.get('data', {}).get('items', [])
+        logger.debug(f"查询到 {len(items)} 条记录")
+
+        return result
+
+    async def update_record(
+        self,
+        table_id: str,
+        record_id: str,
+        fields: Dict[str, Any],
+        app_token: Optional[str] = None
+    ) -> Dict:
+        """
+        更新单条记录
+
+        Args:
+            table_id: 表格 ID
+            record_id: 记录 ID
+            fields: 要更新的字段
+            app_token: 可选，覆盖默认的 app_token
+
+        Returns:
+            API 响应结果
+        """
+        app_token = app_token or self.app_token
+        endpoint = f"/bitable/v1/apps/{app_token}/tables/{table_id}/records/{record_id}"
+
+        result = await self._request("PUT", endpoint, data={"fields": fields})
+        logger.info(f"更新记录成功: {record_id}")
+
+        return result
+
+    async def delete_record(
+        self,
+        table_id: str,
+        record_id: str,
+        app_token: Optional[str] = None
+    ) -> Dict:
+        """
+        删除单条记录
+
+        Args:
+            table_id: 表格 ID
+            record_id: 记录 ID
+            app_token: 可选，覆盖默认的 app_token
+
+        Returns:
+            API 响应结果
+        """
+        app_token = app_token or self.app_token
+        endpoint = f"/bitable/v1/apps/{app_token}/tables/{table_id}/records/{record_id}"
+
+        result = await self._request("DELETE", endpoint)
+        logger.info(f"删除记录成功: {record_id}")
+
+        return result
+
+    # ==================== 便捷方法 ====================
+
+    async def iter_records(
+        self,
+        table_id: str,
+        filter: Optional[str] = None,
+        sort: Optional[List[Dict]] = None,
+        page_size: int = 500,
+        app_token: Optional[str] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        流式遍历所有记录（自动分页）
+
+        飞书分页依赖上一页返回的 page_token，无法并行拉取多页；
+        这里在调用方处理当前页时后台预取下一页，隐藏一次请求延迟。
+
+        Args:
+            table_id: 表格 ID
+            filter: 筛选条件
+            sort: 排序规则
+            page_size: 每页数量（最大 500）
+            app_token: 可选，覆盖默认的 app_token
+
+        Yields:
+            单条记录
+        """
+        def fetch(page_token: Optional[str]) -> asyncio.Task:
+            return asyncio.ensure_future(self.query_records(
+                table_id=table_id,
+                filter=filter,
+                sort=sort,
+                page_size=page_size,
+                page_token=page_token,
+                app_token=app_token
+            ))
+
+        next_page = fetch(None)
+        try:
+            while next_page is not None:
+                result = await next_page
+                data = result.get('data', {})
+
+                page_token = data.get('page_token')
+                next_page = fetch(page_token) if data.get('has_more', bool(page_token)) and page_token else None
+
+                for item in data.get('items') or []:
+                    yield item
+        finally:
+            # 调用方提前结束遍历时取消预取
+            if next_page is not None and not next_page.done():
+                next_page.cancel()
+
+    async def get_all_records(
+        self,
+        table_id: str,
+        filter: Optional[str] = None,
+        app_token: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        获取所有记录（自动分页）
+
+        Args:
+            table_id: 表格 ID
+            filter: 筛选条件
+            app_token: 可选，覆盖默认的 app_token
+
+        Returns:
+            所有记录列表
+        """
+        all_records = [
+            record async for record in self.iter_records(table_id, filter=filter, app_token=app_token)
+        ]
+        logger.info(f"共获取 {len(all_records)} 条记录")
+        return all_records